@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import os
-import subprocess
 from ctypes import CDLL
 import gi
 
@@ -15,10 +14,15 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Gdk', '4.0')
 gi.require_version('Gio', '2.0')
 gi.require_version('Gtk4LayerShell', '1.0')
-from gi.repository import Gtk, Gdk, Gio, GLib, Gtk4LayerShell as LayerShell
+from gi.repository import Gtk, Gdk, GLib, Gtk4LayerShell as LayerShell
 
 from config import PINNED_APPS, APP_CONFIG
 from window_manager import get_windows
+from window_state import WindowStore
+from hypr_ipc import HyprIPCError, EventReader, connect_event_socket
+from update_coalescer import UpdateCoalescer
+from icon_cache import get_icon_cache
+from launcher import get_launcher
 
 # ─── Konfigurierbare Größen ────────────────────────────────────────────────────
 ICON_SIZE               = 22    # Breite/Höhe des Icons oder Fallback-Labels
@@ -30,20 +34,15 @@ INDICATOR_HEIGHT        = 3     # Höhe des Indikators
 INDICATOR_WIDTH         = 14    # Breite des Indikators
 # ────────────────────────────────────────────────────────────────────────────────
 
-display    = Gdk.Display.get_default()
-icon_theme = Gtk.IconTheme.get_for_display(display)
-running_procs: dict[str, subprocess.Popen] = {}
+icon_cache = get_icon_cache()
+launcher = get_launcher()
 
 
 def on_app_button_clicked(button, exec_cmd: str):
     key = exec_cmd.split()[0].lower()
-    proc = running_procs.get(key)
-    if proc and proc.poll() is None:
+    if launcher.is_running(key):
         return
-    try:
-        running_procs[key] = subprocess.Popen(exec_cmd.split())
-    except Exception as e:
-        print(f"❌ Fehler beim Start von {key}: {e}")
+    launcher.spawn(exec_cmd, key=key)
 
 
 def on_shutdown_clicked(button):
@@ -72,19 +71,15 @@ def create_app_button(app_name: str, is_running: bool = False) -> Gtk.Widget:
     vbox.set_vexpand(False)
 
     # Icon oder Fallback-Label
-    icon_path = cfg.get("icon", "")
-    if icon_path and os.path.isfile(icon_path):
-        icon_widget = Gtk.Image.new_from_file(icon_path)
-        icon_widget.set_pixel_size(ICON_SIZE)
-    else:
-        icon_widget = None
-        for key in (name, exec_cmd.split()[0].lower()):
-            if icon_theme.has_icon(key):
-                icon_widget = Gtk.Image.new_from_gicon(Gio.ThemedIcon.new(key))
-                icon_widget.set_pixel_size(ICON_SIZE)
-                break
-        if icon_widget is None:
-            icon_widget = Gtk.Label(label=name[:2].upper())
+    icon_widget = None
+    for key in (cfg.get("icon", ""), name, exec_cmd.split()[0].lower()):
+        texture = icon_cache.lookup(key, ICON_SIZE)
+        if texture is not None:
+            icon_widget = Gtk.Image.new_from_paintable(texture)
+            icon_widget.set_pixel_size(ICON_SIZE)
+            break
+    if icon_widget is None:
+        icon_widget = Gtk.Label(label=name[:2].upper())
 
     icon_widget.set_size_request(ICON_SIZE, ICON_SIZE)
     icon_widget.set_halign(Gtk.Align.CENTER)
@@ -103,24 +98,83 @@ def create_app_button(app_name: str, is_running: bool = False) -> Gtk.Widget:
 
     button.set_child(vbox)
     button.connect("clicked", on_app_button_clicked, exec_cmd)
+    button.indicator = indicator
     return button
 
 
-def build_taskbar_box() -> Gtk.Box:
-    hbox    = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-    running = {w['class'].lower() for w in get_windows()}
-
-    for name in PINNED_APPS:
-        btn = create_app_button(name, name.lower() in running)
-        hbox.append(btn)
-
-    pinned = {n.lower() for n in PINNED_APPS}
-    seen   = set()
-    for w in get_windows():
-        cls = w.get('class', '').lower()
-        if cls and cls not in pinned and cls not in seen:
-            seen.add(cls)
-            hbox.append(create_app_button(cls, True))
+class TaskbarReconciler:
+    """
+    Hält genau einen Button pro App-Klasse in der Box und gleicht bei jedem
+    Durchlauf nur die Unterschiede ab: Buttons hinzufügen/entfernen und
+    Laufend-/Fokus-Indikatoren umschalten, wenn sie sich geändert haben.
+    """
+
+    def __init__(self, hbox: Gtk.Box):
+        self.hbox    = hbox
+        self.buttons: dict[str, Gtk.Button] = {}
+        self.order:   list[str] = []
+        self.state:   dict[str, tuple[bool, bool]] = {}
+        # Zähler für Diagnose (KARPBAR_STATS=1)
+        self.passes          = 0
+        self.widgets_created = 0
+        self.updates         = 0
+
+    def reconcile(self, running: set, focused):
+        self.passes += 1
+        pinned  = [n.lower() for n in PINNED_APPS]
+        pinset  = set(pinned)
+        others  = [c for c in self.order if c in running and c not in pinset]
+        others += sorted(c for c in running if c not in pinset and c not in self.buttons)
+        desired = pinned + others
+        wanted  = set(desired)
+
+        for name in [n for n in self.order if n not in wanted]:
+            self.hbox.remove(self.buttons.pop(name))
+            self.state.pop(name, None)
+            self.updates += 1
+
+        prev = None
+        for name in desired:
+            btn = self.buttons.get(name)
+            if btn is None:
+                btn = create_app_button(name)
+                self.buttons[name] = btn
+                self.widgets_created += 1
+                if prev is None:
+                    self.hbox.prepend(btn)
+                else:
+                    self.hbox.insert_child_after(btn, prev)
+            prev = btn
+
+            state = (name in running, name == focused)
+            if self.state.get(name) != state:
+                self.state[name] = state
+                self._apply_state(btn, *state)
+                self.updates += 1
+
+        self.order = desired
+
+    @staticmethod
+    def _apply_state(btn: Gtk.Button, is_running: bool, is_focused: bool):
+        if is_running:
+            btn.indicator.add_css_class("active")
+        else:
+            btn.indicator.remove_css_class("active")
+        if is_focused:
+            btn.add_css_class("focused")
+        else:
+            btn.remove_css_class("focused")
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "widgets_created": self.widgets_created,
+            "updates": self.updates,
+        }
+
+
+def build_taskbar_box() -> tuple[Gtk.Box, TaskbarReconciler]:
+    hbox = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
 
     spacer = Gtk.Box(); spacer.set_hexpand(True); hbox.append(spacer)
 
@@ -132,7 +186,7 @@ def build_taskbar_box() -> Gtk.Box:
     power_btn.connect("clicked", on_shutdown_clicked)
     hbox.append(power_btn)
 
-    return hbox
+    return hbox, TaskbarReconciler(hbox)
 
 
 def on_activate(app: Gtk.Application):
@@ -150,6 +204,7 @@ def on_activate(app: Gtk.Application):
         button { border: none; margin: 0; padding: 0; }
         .indicator { background-color: rgba(128,128,128,0.5); border-radius: 1px; }
         .indicator.active { background-color: rgba(0,160,0,0.8); }
+        button.focused { background-color: rgba(255,255,255,0.15); }
     """)
     Gtk.StyleContext.add_provider_for_display(
         Gdk.Display.get_default(),
@@ -157,9 +212,35 @@ def on_activate(app: Gtk.Application):
         Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
     )
 
-    win.set_child(build_taskbar_box())
+    hbox, reconciler = build_taskbar_box()
+    store = WindowStore()
+    store.load(get_windows())
+    reconciler.reconcile(store.classes(), store.focused_class())
+    win.set_child(hbox)
     win.present()
-    GLib.timeout_add(1000, lambda: (win.set_child(build_taskbar_box()), True))
+
+    def refresh(_changed=None):
+        reconciler.reconcile(store.classes(), store.focused_class())
+
+    # Event-getrieben: im Leerlauf keine Wakeups. Nur ohne socket2 wird gepollt.
+    try:
+        sock = connect_event_socket()
+    except HyprIPCError as e:
+        print(f"⚠️ {e} – falle auf Polling zurück")
+
+        def poll():
+            store.load(get_windows())
+            refresh()
+            return True
+        GLib.timeout_add(1000, poll)
+    else:
+        coalescer = UpdateCoalescer(refresh, hbox)
+        reader = EventReader(sock, lambda ev, args: coalescer.push(store.apply_event(ev, args)),
+                             events=WindowStore.EVENTS)
+        GLib.io_add_watch(sock, GLib.IO_IN, lambda *_: reader.read())
+
+    if os.environ.get("KARPBAR_STATS"):
+        app.connect("shutdown", lambda _: print(f"Reconciler-Statistik: {reconciler.stats()}"))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Konstruktionszeit, Widget-Anzahl und Speicher pro AppButton.
+
+Braucht ein Display (Wayland/X11), Icons werden nicht geladen.
+
+    python bench/bench_app_button.py [--buttons 200]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gi
+gi.require_version("Gtk", "4.0")
+
+from widgets.app_button import AppButton
+from task_model import TaskItem
+
+
+def count_widgets(widget):
+    """Zählt ein Widget samt aller Kinder (inkl. angehängter Popover)."""
+    count = 1
+    child = widget.get_first_child()
+    while child is not None:
+        count += count_widgets(child)
+        child = child.get_next_sibling()
+    return count
+
+
+def make_button(cls):
+    button = AppButton(config={})
+    button.bind(TaskItem(app_class=cls, exec_cmd="true", icon_name=cls))
+    return button
+
+
+def rss_kib():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buttons", type=int, default=200)
+    opts = parser.parse_args()
+
+    # Einmal aufwärmen (Typ-Registrierung, CSS)
+    make_button("warmup")
+
+    rss_before = rss_kib()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    buttons = [make_button(f"bench-app-{i}") for i in range(opts.buttons)]
+    elapsed = time.perf_counter() - t0
+    py_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = rss_kib()
+
+    n = len(buttons)
+    print(f"Buttons:               {n}")
+    print(f"Konstruktion:          {elapsed / n * 1e6:8.1f} µs/Button")
+    print(f"Widgets pro Button:    {count_widgets(buttons[0]):8d}")
+    print(f"Python-Heap:           {py_bytes / n / 1024:8.2f} KiB/Button")
+    print(f"RSS-Zuwachs:           {(rss_after - rss_before) / n:8.2f} KiB/Button")
+
+
+if __name__ == "__main__":
+    main()
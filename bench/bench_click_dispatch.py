@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Wie lange blockiert ein Klick den Main-Loop, und wie lange dauert
+es bis zur Dispatch-Antwort? Vergleicht den blockierenden HyprClient.dispatch
+mit dispatch_batch_async.
+
+Startet einen Fake-Request-Socket, der nach ``--delay`` ms mit "ok"
+antwortet. Mit ``--delay`` über dem Zeitlimit (``--timeout``) lässt sich ein
+hängender Compositor nachstellen. Braucht PyGObject, aber weder Display noch
+Hyprland.
+
+    python bench/bench_click_dispatch.py [--clicks 200] [--delay 0] [--timeout 1.0]
+"""
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from gi.repository import GLib
+
+from hypr_ipc import HyprClient
+
+
+def serve(path, delay):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(64)
+
+    def handle(conn):
+        with conn:
+            conn.recv(4096)
+            if delay:
+                time.sleep(delay)
+            try:
+                conn.sendall(b"ok")
+            except OSError:
+                pass
+
+    def loop():
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    threading.Thread(target=loop, daemon=True).start()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(label, blocked, latency):
+    print(f"{label:10s} blockiert p50 {percentile(blocked, 0.5) * 1000:8.3f} ms  "
+          f"max {max(blocked) * 1000:8.3f} ms   "
+          f"bis Antwort p50 {percentile(latency, 0.5) * 1000:8.3f} ms  "
+          f"p95 {percentile(latency, 0.95) * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clicks", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.0, help="Antwortverzögerung in ms")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    opts = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="karpbar-ipc-"), ".socket.sock")
+    serve(path, opts.delay / 1000)
+    client = HyprClient(socket_path=path, timeout=opts.timeout)
+
+    blocked, latency = [], []
+    for _ in range(opts.clicks):
+        t0 = time.perf_counter()
+        client.dispatch("focuswindow", "address:0x1")
+        blocked.append(time.perf_counter() - t0)
+        latency.append(blocked[-1])
+    report("sync", blocked, latency)
+
+    loop = GLib.MainLoop()
+    blocked, latency = [], []
+
+    def click(remaining):
+        t0 = time.perf_counter()
+
+        def on_done(results):
+            latency.append(time.perf_counter() - t0)
+            if remaining > 1:
+                GLib.idle_add(click, remaining - 1)
+            else:
+                loop.quit()
+        client.dispatch_batch_async(["focuswindow address:0x1"], on_done)
+        blocked.append(time.perf_counter() - t0)
+        return GLib.SOURCE_REMOVE
+
+    GLib.idle_add(click, opts.clicks)
+    loop.run()
+    report("async", blocked, latency)
+
+
+if __name__ == "__main__":
+    main()
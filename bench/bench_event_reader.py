@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: socket2-Framing mit EventReader vs. altem recv(4096).splitlines().
+
+Schickt einen synthetischen Burst von Events in zufälligen Chunk-Größen über
+ein socketpair und zählt, wie viele Events korrekt ankommen.
+
+    python bench/bench_event_reader.py [--events 100000]
+"""
+import argparse
+import os
+import random
+import selectors
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from hypr_ipc import EventReader
+from window_state import WindowStore
+
+
+def make_burst(count):
+    events = []
+    for i in range(count):
+        addr = f"{0x55d0000 + i:x}"
+        kind = i % 5
+        if kind == 0:
+            events.append(f"openwindow>>{addr},{i % 10},kitty,Terminal {i} – ~/src")
+        elif kind == 1:
+            events.append(f"activewindowv2>>{addr}")
+        elif kind == 2:
+            events.append(f"windowtitlev2>>{addr},nvim {i}.py")
+        elif kind == 3:
+            events.append(f"workspace>>{i % 10}")
+        else:
+            events.append(f"closewindow>>{addr}")
+    return events
+
+
+def send_burst(sock, payload):
+    rnd = random.Random(1)
+    pos = 0
+    while pos < len(payload):
+        n = rnd.randint(1, 8192)
+        sock.sendall(payload[pos:pos + n])
+        pos += n
+    sock.shutdown(socket.SHUT_WR)
+
+
+def run(reader_factory, payload):
+    a, b = socket.socketpair()
+    a.setblocking(False)
+    received = []
+    reader = reader_factory(a, lambda name, args: received.append((name, args)))
+    sender = threading.Thread(target=send_burst, args=(b, payload))
+    sel = selectors.DefaultSelector()
+    sel.register(a, selectors.EVENT_READ)
+    t0 = time.perf_counter()
+    sender.start()
+    while True:
+        sel.select()
+        if not reader.read():
+            break
+    elapsed = time.perf_counter() - t0
+    sender.join()
+    a.close()
+    b.close()
+    return received, elapsed
+
+
+class LegacyReader:
+    """Nachbau von Taskbar._on_ipc_event vor dem Umbau."""
+
+    def __init__(self, sock, handler):
+        self.sock = sock
+        self.handler = handler
+
+    def read(self):
+        try:
+            data = self.sock.recv(4096)
+        except BlockingIOError:
+            return True
+        if not data:
+            return False
+        for line in data.decode(errors="replace").splitlines():
+            if ">>" not in line:
+                continue
+            event, args = line.split(">>", 1)
+            self.handler(event, args.strip())
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000)
+    opts = parser.parse_args()
+
+    lines = make_burst(opts.events)
+    payload = ("\n".join(lines) + "\n").encode()
+    wanted = WindowStore.EVENTS
+    expected = [tuple(l.split(">>", 1)) for l in lines if l.split(">>", 1)[0] in wanted]
+
+    for label, factory in (
+        ("legacy recv(4096)", LegacyReader),
+        ("EventReader", lambda s, h: EventReader(s, h, events=wanted)),
+    ):
+        received, elapsed = run(factory, payload)
+        received = [r for r in received if r[0] in wanted]
+        ok = sum((Counter(received) & Counter(expected)).values())
+        lost = len(expected) - ok
+        print(f"{label:20s} {elapsed * 1000:8.1f} ms  "
+              f"{len(lines) / elapsed / 1000:8.1f} kEvents/s  "
+              f"korrekt {ok}/{len(expected)}  verloren/kaputt {lost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HyprClient gegen einen lokalen Fake-Server statt Hyprland.
+
+Der Server verhält sich wie .socket.sock: eine Antwort pro Verbindung,
+``j/clients`` liefert JSON, ``dispatch`` antwortet "ok" (bzw. einen Fehler
+für unbekannte Dispatcher), ``[[BATCH]]`` trennt die Einzelantworten mit
+BATCH_DELIMITER. Zuerst wird geprüft, dass request_json, dispatch und
+dispatch_batch (mit Fehler einzelner Einträge) stimmen, danach die Latenz
+pro Round-Trip gemessen. Zum Vergleich kann ``--hyprctl`` den Start eines
+Prozesses pro Request (wie früher hyprctl) messen.
+
+    python bench/bench_hypr_ipc.py [--requests 2000] [--hyprctl]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from hypr_ipc import HyprClient, BATCH_DELIMITER
+
+CLIENTS = [
+    {"address": f"0x{0x55d0000 + i:x}", "class": "kitty", "title": f"Terminal {i}",
+     "pid": 1000 + i, "workspace": {"id": 1, "name": "1"}, "focusHistoryID": i}
+    for i in range(20)
+]
+
+KNOWN_DISPATCHERS = ("focuswindow", "closewindow", "workspace", "exec")
+
+
+def answer(command):
+    if command.startswith("j/clients"):
+        return json.dumps(CLIENTS)
+    if command.startswith("dispatch "):
+        name = command[len("dispatch "):].split(" ", 1)[0]
+        return "ok" if name in KNOWN_DISPATCHERS else "Invalid dispatcher"
+    return "unknown request"
+
+
+def reply_for(request):
+    if request.startswith("[[BATCH]]"):
+        return BATCH_DELIMITER.join(answer(c) for c in request[len("[[BATCH]]"):].split(";"))
+    return answer(request)
+
+
+def serve(server):
+    while True:
+        try:
+            conn, _ = server.accept()
+        except OSError:
+            return
+        with conn:
+            request = conn.recv(65536).decode()
+            conn.sendall(reply_for(request).encode())
+
+
+def check(client):
+    assert client.request_json("clients") == CLIENTS, "request_json"
+    assert client.dispatch("focuswindow", "address:0x1") is True, "dispatch"
+    assert client.dispatch("gibtsnicht", "x") is False, "dispatch mit Fehler"
+    results = client.dispatch_batch(["focuswindow address:0x1", "gibtsnicht",
+                                     "closewindow address:0x2"])
+    assert results == [True, False, True], f"dispatch_batch: {results}"
+    assert client.dispatch_batch([]) == [], "leerer Batch"
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(label, samples):
+    print(f"{label:24s} p50 {percentile(samples, 0.5) * 1e6:9.1f} us  "
+          f"p95 {percentile(samples, 0.95) * 1e6:9.1f} us")
+
+
+def measure(fn, count):
+    samples = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hyprctl", action="store_true",
+                        help="zum Vergleich pro Request einen Prozess starten")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ".socket.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(64)
+        threading.Thread(target=serve, args=(server,), daemon=True).start()
+
+        client = HyprClient(socket_path=path)
+        check(client)
+        print("Fake-Server: request_json, dispatch, dispatch_batch korrekt")
+
+        n = opts.requests
+        report("dispatch", measure(lambda: client.dispatch("focuswindow", "address:0x1"), n))
+        report("dispatch_batch (3)", measure(lambda: client.dispatch_batch(
+            ["focuswindow address:0x1"] * 3), n))
+        report("request_json clients", measure(lambda: client.request_json("clients"), n))
+        if opts.hyprctl:
+            report("Prozess pro Request", measure(
+                lambda: subprocess.run(["true"], check=False), min(n, 200)))
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
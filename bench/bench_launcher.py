@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Wie lange blockiert ein App-Start den aufrufenden Prozess?
+Vergleicht subprocess.Popen mit launcher.spawn_process (posix_spawnp).
+
+Ein GTK-Prozess ist groß; mit ``--ballast`` MiB belegtem Speicher lässt
+sich das nachstellen (fork() muss dessen Seitentabellen kopieren, vfork-
+basiertes posix_spawn nicht). Gestartet wird ``--command``, die Kinder
+werden nach jeder Messung eingesammelt. Braucht weder GTK noch Hyprland.
+
+    python bench/bench_launcher.py [--launches 200] [--ballast 300] [--command true]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from launcher import spawn_process, split_command
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(label, samples):
+    print(f"{label:12s} p50 {percentile(samples, 0.5) * 1000:8.3f} ms  "
+          f"p95 {percentile(samples, 0.95) * 1000:8.3f} ms  "
+          f"max {max(samples) * 1000:8.3f} ms")
+
+
+def bench_popen(argv, launches):
+    samples = []
+    for _ in range(launches):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(argv, stdin=subprocess.DEVNULL, start_new_session=True)
+        samples.append(time.perf_counter() - t0)
+        proc.wait()
+    return samples
+
+
+def bench_spawn(argv, launches):
+    samples = []
+    for _ in range(launches):
+        t0 = time.perf_counter()
+        pid = spawn_process(argv)
+        samples.append(time.perf_counter() - t0)
+        os.waitpid(pid, 0)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--launches", type=int, default=200)
+    parser.add_argument("--ballast", type=int, default=300, help="belegter Speicher in MiB")
+    parser.add_argument("--command", default="true")
+    opts = parser.parse_args()
+
+    # Speicher wirklich anfassen, damit die Seiten gemappt sind
+    ballast = bytearray(opts.ballast * 1024 * 1024)
+    for i in range(0, len(ballast), 4096):
+        ballast[i] = 1
+    argv = split_command(opts.command)
+
+    print(f"{opts.launches} Starts von {opts.command!r}, {opts.ballast} MiB Ballast")
+    report("Popen", bench_popen(argv, opts.launches))
+    report("posix_spawn", bench_spawn(argv, opts.launches))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Startzeit-Benchmark: Importzeit (-X importtime) und Zeit bis present()/erster
+Frame. Bricht mit Exit-Code 1 ab, wenn eine Schwelle überschritten wird.
+
+Braucht eine laufende Wayland-Session (wie die Leiste selbst). Mit
+``--cold`` wird vor jedem Lauf der Warmstart-Snapshot entfernt (und am Ende
+wiederhergestellt); so lässt sich der erste Frame mit und ohne Snapshot
+vergleichen.
+
+Die Standard-Schwellen (150 ms Import, 400 ms erster Frame) sind Schätzwerte
+und wurden noch nicht an einer echten Messung ausgerichtet; nach dem ersten
+Lauf auf der Zielmaschine per Option anpassen.
+
+    python bench/bench_startup.py [--runs 5] [--cold] [--max-import-ms 150] [--max-first-frame-ms 400]
+"""
+import argparse
+import os
+import re
+import statistics
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from snapshot import snapshot_path
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+_TIMING_LINE = re.compile(r"Karpbar: (present\(\)|erster Frame) nach ([\d.]+) ms")
+
+
+def run_once():
+    env = dict(os.environ,
+               KARPBAR_TIMING="1",
+               KARPBAR_EXIT_AFTER_FIRST_FRAME="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py")],
+        env=env, capture_output=True, text=True, timeout=30)
+    imports = {}
+    total_us = 0
+    timings = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            cumulative, indent, name = int(m.group(2)), m.group(3), m.group(4)
+            # Nur Top-Level-Imports (eine Ebene Einrückung) summieren
+            if len(indent) <= 1:
+                total_us += cumulative
+                imports[name] = cumulative
+            continue
+        m = _TIMING_LINE.search(line)
+        if m:
+            timings[m.group(1)] = float(m.group(2))
+    if "erster Frame" not in timings:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        raise SystemExit("Kein erster Frame gemessen – läuft eine Wayland-Session?")
+    return total_us / 1000, timings, imports
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=150.0)
+    parser.add_argument("--max-first-frame-ms", type=float, default=400.0)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--cold", action="store_true", help="ohne Warmstart-Snapshot starten")
+    opts = parser.parse_args()
+
+    path = snapshot_path()
+    backup = path + ".bench"
+    if opts.cold and os.path.exists(path):
+        shutil.copy2(path, backup)
+    try:
+        measure(opts)
+    finally:
+        if os.path.exists(backup):
+            os.replace(backup, path)
+
+
+def measure(opts):
+    import_ms, present_ms, frame_ms = [], [], []
+    imports = {}
+    for _ in range(opts.runs):
+        if opts.cold and os.path.exists(snapshot_path()):
+            os.remove(snapshot_path())
+        imp, timings, imports = run_once()
+        import_ms.append(imp)
+        present_ms.append(timings.get("present()", float("nan")))
+        frame_ms.append(timings["erster Frame"])
+
+    med_import = statistics.median(import_ms)
+    med_frame = statistics.median(frame_ms)
+    print("Kaltstart (ohne Snapshot)" if opts.cold else "Warmstart (mit Snapshot)")
+    print(f"Importzeit (Median):    {med_import:7.1f} ms")
+    print(f"present() (Median):     {statistics.median(present_ms):7.1f} ms")
+    print(f"Erster Frame (Median):  {med_frame:7.1f} ms")
+    print("\nTeuerste Top-Level-Imports (letzter Lauf):")
+    for name, us in sorted(imports.items(), key=lambda kv: -kv[1])[:opts.top]:
+        print(f"  {us / 1000:7.1f} ms  {name}")
+
+    failed = False
+    if med_import > opts.max_import_ms:
+        print(f"\n❌ Importzeit {med_import:.1f} ms > {opts.max_import_ms:.1f} ms")
+        failed = True
+    if med_frame > opts.max_first_frame_ms:
+        print(f"\n❌ Erster Frame {med_frame:.1f} ms > {opts.max_first_frame_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
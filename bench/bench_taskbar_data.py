@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: generate_taskbar_data mit Klassen-Index vs. alter any()-Suche
+pro gepinnter App.
+
+Braucht weder Display noch Hyprland; die Fenster sind synthetisch.
+
+    python bench/bench_taskbar_data.py [--windows 1000] [--pinned 10]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config_loader import ConfigModel
+from taskbar_data import generate_taskbar_data
+from window_state import Window
+
+
+def make_clients(count, classes):
+    return [{
+        "address": f"0x{0x55d0000 + i:x}",
+        "class": f"App-{i % classes}",
+        "title": f"Fenster {i}",
+        "focusHistoryID": i,
+        "workspace": {"id": i % 10, "name": str(i % 10)},
+        "monitor": 0,
+        "pid": 1000 + i,
+    } for i in range(count)]
+
+
+def legacy_taskbar_data(windows, pinned, app_config):
+    # Alte Implementierung auf rohen clients-Dicts: O(gepinnte Apps × Fenster)
+    running_classes = {w["class"].lower() for w in windows}
+    tasks = []
+    for name in pinned:
+        lower = name.lower()
+        cfg = app_config.get(lower, {})
+        tasks.append({
+            "name": name,
+            "icon": cfg.get("icon", ""),
+            "exec": cfg.get("exec", lower),
+            "running": lower in running_classes,
+            "focused": any(w for w in windows
+                           if w["class"].lower() == lower and w["focusHistoryID"] == 0),
+        })
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, default=1000)
+    parser.add_argument("--classes", type=int, default=100)
+    parser.add_argument("--pinned", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    opts = parser.parse_args()
+
+    clients = make_clients(opts.windows, opts.classes)
+    windows = [Window.from_client(c) for c in clients]
+    pinned = [f"App-{i * 3}" for i in range(opts.pinned)]
+    overrides = {"app-0": {"exec": "app0 --new"}}
+    model = ConfigModel.from_dict({"pinned_apps": pinned, "app_overrides": overrides})
+
+    old = legacy_taskbar_data(clients, pinned, overrides)
+    new = generate_taskbar_data(windows, model)
+    for a, b in zip(old, new):
+        b = dict(b)
+        del b["count"]
+        b["icon"] = b["icon"] or ""
+        assert a == b, (a, b)
+
+    for label, fn in (
+        ("any()-Suche (alt)", lambda: legacy_taskbar_data(clients, pinned, overrides)),
+        ("Klassen-Index", lambda: generate_taskbar_data(windows, model)),
+    ):
+        best = min(timeit.repeat(fn, number=opts.repeat, repeat=5)) / opts.repeat
+        print(f"{label:20s} {best * 1e6:9.1f} µs pro Aufruf "
+              f"({opts.windows} Fenster, {opts.pinned} gepinnt)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Speicher und Parse-Zeit für ``j/clients`` als rohe Dicts vs.
+Window-Datensätze mit __slots__ (parse_clients).
+
+Braucht weder Display noch Hyprland; die Antwort ist synthetisch, hat aber
+alle Felder einer echten Hyprland-Antwort.
+
+    python bench/bench_window_records.py [--windows 500]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from window_state import parse_clients
+
+CLASSES = ["kitty", "firefox", "code-oss", "thunar", "mpv", "discord", "steam", "gimp"]
+
+
+def make_reply(count):
+    clients = []
+    for i in range(count):
+        cls = CLASSES[i % len(CLASSES)]
+        clients.append({
+            "address": f"0x{0x55d0000 + i:x}",
+            "mapped": True,
+            "hidden": False,
+            "at": [i % 1920, 40],
+            "size": [960, 1040],
+            "workspace": {"id": i % 10 + 1, "name": str(i % 10 + 1)},
+            "floating": False,
+            "pseudo": False,
+            "monitor": i % 2,
+            "class": cls,
+            "title": f"{cls} – Fenster {i}",
+            "initialClass": cls,
+            "initialTitle": cls,
+            "pid": 10000 + i,
+            "xwayland": False,
+            "pinned": False,
+            "fullscreen": 0,
+            "fullscreenClient": 0,
+            "grouped": [],
+            "tags": [],
+            "swallowing": "0x0",
+            "focusHistoryID": i,
+            "inhibitingIdle": False,
+            "xdgTag": "",
+            "xdgDescription": "",
+        })
+    return json.dumps(clients)
+
+
+def measure(label, parse, reply, repeat):
+    gc.collect()
+    tracemalloc.start()
+    data = parse(reply)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        parse(reply)
+    elapsed = (time.perf_counter() - t0) / repeat
+
+    n = len(data)
+    print(f"{label:24s} {retained / 1024:8.1f} KiB gesamt  "
+          f"{retained / n:7.0f} B/Fenster  {elapsed * 1000:6.2f} ms/Parse")
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--windows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    opts = parser.parse_args()
+
+    reply = make_reply(opts.windows)
+    print(f"{opts.windows} Fenster, Antwort {len(reply) / 1024:.1f} KiB\n")
+    raw = measure("json.loads (Dicts)", json.loads, reply, opts.repeat)
+    records = measure("Window (__slots__)",
+                      lambda r: parse_clients(json.loads(r)),
+                      reply, opts.repeat)
+    # Gleiche Klassen teilen sich denselben String
+    shared = len({id(w.app_class) for w in records})
+    print(f"\nVerschiedene Klassen-Strings: Dicts {len({id(w['class']) for w in raw})}, "
+          f"Window {shared}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Prüft das Zusammenspiel von save_config (verzögertes Schreiben) und
+reload_config (ConfigWatcher) an einer temporären Konfigurationsdatei:
+
+- eigener Schreibvorgang landet, ein neuerer lokaler Stand ist noch
+  ausstehend, dann meldet der Watcher den älteren eigenen Stand
+- externe Änderung vor dem verzögerten Schreiben
+- externe Änderung, die vor dem Schreiben neu geladen wird
+
+Braucht weder GTK noch Hyprland. Exit-Code 1 bei einem Fehler.
+
+    python bench/check_config_writer.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import config_loader as cl
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def on_disk(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_external(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def pins():
+    return cl.pinned_classes(cl.config_data.get("pinned_apps", []))
+
+
+def main():
+    tmp = tempfile.mkdtemp(prefix="karpbar-config-")
+    path = os.path.join(tmp, "config.json")
+    shutil.copy(os.path.join(ROOT, "config.json"), path)
+    # Lange Wartezeit: Schreiben nur per flush_config, also deterministisch
+    cl._writer.delay = 60
+    failures = []
+
+    def check(label, ok):
+        print(f"{'✅' if ok else '❌'} {label}")
+        if not ok:
+            failures.append(label)
+
+    try:
+        cl.load_config(path)
+        cl.config_data["pinned_apps"] = ["a"]
+
+        # Eigener Stand A landet, B ist noch ausstehend, Watcher meldet A
+        cl.save_config(path)
+        cl.flush_config()
+        cl.config_data["pinned_apps"] = ["a", "b"]
+        cl.save_config(path)
+        result = cl.reload_config(path)
+        check("eigener älterer Stand wird nicht als externe Änderung geladen", result is None)
+        check("lokaler Stand bleibt erhalten", pins() == ["a", "b"])
+        cl.flush_config()
+        check("ausstehender Stand wird geschrieben",
+              cl.pinned_classes(on_disk(path)["pinned_apps"]) == ["a", "b"])
+        check("Watcher meldet den eigenen Stand B nicht", cl.reload_config(path) is None)
+
+        # Externe Änderung vor dem verzögerten Schreiben
+        cl.config_data["pinned_apps"] = ["a", "b", "c"]
+        cl.save_config(path)
+        external = on_disk(path)
+        external["pinned_apps"] = ["x"]
+        write_external(path, external)
+        cl.flush_config()
+        check("externe Änderung wird nicht überschrieben",
+              on_disk(path)["pinned_apps"] == ["x"])
+        result = cl.reload_config(path)
+        check("externe Änderung wird geladen", result is not None and pins() == ["x"])
+
+        # Externe Änderung, die vor dem Schreiben geladen wird
+        cl.config_data["pinned_apps"] = ["x", "y"]
+        cl.save_config(path)
+        external["pinned_apps"] = ["z"]
+        write_external(path, external)
+        result = cl.reload_config(path)
+        cl.flush_config()
+        check("ausstehender Stand wird bei externer Änderung verworfen",
+              result is not None and on_disk(path)["pinned_apps"] == ["z"] and pins() == ["z"])
+
+        # Danach wird wieder normal gespeichert
+        cl.config_data["pinned_apps"] = ["z", "w"]
+        cl.save_config(path)
+        cl.flush_config()
+        check("späteres Speichern funktioniert", on_disk(path)["pinned_apps"] == ["z", "w"])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Soak-Test: spielt viele openwindow/closewindow-Events gegen eine Taskbar ab
+und prüft, dass RSS und Anzahl lebender GObjects nicht wachsen.
+
+Das Fenster wird angezeigt und pro Runde (alle Klassen öffnen, zeichnen,
+alle schließen, zeichnen) so lange der Main-Loop gepumpt, bis die ListView
+die Zeilen gebunden hat. Geprüft wird auch, dass AppButtons wirklich
+gebunden, wieder gelöst und recycelt werden (Anzahl der erzeugten Buttons
+wächst nicht mit den Runden).
+
+Braucht ein Display (Wayland/X11), aber keinen Hyprland-Compositor.
+
+    python bench/soak_app_buttons.py [--events 100000] [--classes 40]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Kein Warmstart-Snapshot / Desktop-Index aus dem echten Cache
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp(prefix="karpbar-soak-")
+
+import gi
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, GLib, GObject
+
+from widgets.app_button import AppButton
+from widgets.taskbar import Taskbar
+from state_engine import StateEngine
+
+# Zeit, die pro Runde auf das Binden/Lösen der Zeilen gewartet wird (s)
+SETTLE_TIMEOUT = 1.0
+
+counts = {"bind": 0, "unbind": 0}
+
+
+def count_calls(name):
+    original = getattr(AppButton, name)
+
+    def wrapper(self, *args):
+        counts[name] += 1
+        return original(self, *args)
+    setattr(AppButton, name, wrapper)
+
+
+def rss_kib():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def live_gobjects():
+    gc.collect()
+    return sum(1 for o in gc.get_objects() if isinstance(o, GObject.Object))
+
+
+def pump():
+    ctx = GLib.MainContext.default()
+    while ctx.iteration(False):
+        pass
+
+
+def settle(done):
+    """Pumpt den Main-Loop (inkl. Frames), bis ``done()`` gilt oder die Zeit abläuft."""
+    ctx = GLib.MainContext.default()
+    deadline = GLib.get_monotonic_time() + int(SETTLE_TIMEOUT * 1e6)
+    while not done() and GLib.get_monotonic_time() < deadline:
+        if not ctx.iteration(False):
+            GLib.usleep(1000)
+    pump()
+    return done()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--max-rss-growth-kib", type=int, default=2048)
+    parser.add_argument("--max-object-growth", type=int, default=16)
+    opts = parser.parse_args()
+
+    count_calls("bind")
+    count_calls("unbind")
+
+    engine = StateEngine()
+    taskbar = Taskbar(engine, {"pinned_apps": [], "app_overrides": {}})
+    window = Gtk.Window()
+    window.set_default_size(1200, 48)
+    window.set_child(taskbar.widget)
+    window.present()
+    if not settle(lambda: window.get_mapped()):
+        sys.exit("❌ Fenster wurde nicht angezeigt")
+
+    rounds = max(1, opts.events // (2 * opts.classes))
+    checkpoints = max(1, rounds // 10)
+    baseline = None
+    buttons_first = None
+    unbound_rounds = 0
+    serial = 0
+    for r in range(rounds):
+        binds = counts["bind"]
+        addresses = []
+        for c in range(opts.classes):
+            addr = f"{0x5000 + serial:x}"
+            serial += 1
+            addresses.append(addr)
+            engine._handle_event("openwindow", f"{addr},1,soak-app-{c},Fenster {serial}")
+        taskbar.coalescer.flush()
+        if not settle(lambda: counts["bind"] > binds):
+            unbound_rounds += 1
+        unbinds = counts["unbind"]
+        for addr in addresses:
+            engine._handle_event("closewindow", addr)
+        taskbar.coalescer.flush()
+        settle(lambda: counts["unbind"] > unbinds and len(taskbar.view_model) == 0)
+        if buttons_first is None:
+            buttons_first = len(taskbar._buttons)
+        if (r + 1) % checkpoints == 0:
+            sample = (rss_kib(), live_gobjects())
+            if baseline is None:
+                baseline = sample
+            print(f"{serial * 2:8d} Events  RSS {sample[0]:8d} KiB  "
+                  f"GObjects {sample[1]:6d}  AppButtons {len(taskbar._buttons):4d}  "
+                  f"gebunden {counts['bind']:7d}  gelöst {counts['unbind']:7d}")
+
+    rss_growth = sample[0] - baseline[0]
+    obj_growth = sample[1] - baseline[1]
+    print(f"\nZuwachs seit erstem Messpunkt: RSS {rss_growth} KiB, GObjects {obj_growth}")
+    print(f"Statistik: {taskbar.stats()}")
+    failed = False
+    if unbound_rounds:
+        print(f"❌ In {unbound_rounds} von {rounds} Runden wurde keine Zeile gebunden")
+        failed = True
+    if counts["bind"] < rounds or counts["unbind"] < rounds:
+        print(f"❌ Zu wenige Bind/Unbind-Aufrufe: {counts['bind']}/{counts['unbind']} "
+              f"bei {rounds} Runden")
+        failed = True
+    if counts["bind"] - counts["unbind"] != 0:
+        print(f"❌ {counts['bind'] - counts['unbind']} AppButtons nach dem Schließen noch gebunden")
+        failed = True
+    if len(taskbar._buttons) > buttons_first:
+        print(f"❌ AppButtons werden nicht recycelt: {buttons_first} → {len(taskbar._buttons)}")
+        failed = True
+    if rss_growth > opts.max_rss_growth_kib or obj_growth > opts.max_object_growth:
+        print("❌ Speicher wächst – Buttons werden nicht sauber recycelt")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Zeilen gebunden und recycelt, RSS und GObject-Anzahl stabil")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,16 @@
 # config.py
+#
+# Kompatibilität für ältere Skripte (Karpbar.py, test_icon_window.py).
+# Einzige Quelle ist config.json; die Werte kommen aus dem ConfigModel
+# von config_loader, Klassen sind klein geschrieben.
+
+from config_loader import get_config_model
+
+_model = get_config_model()
 
 # Liste aller gepinnten Apps (nur Namen)
-PINNED_APPS = [
-    "kitty",
-    "firefox",
-    "code-oss",
-    "mousepad",
-    "nonexist"
-]
+PINNED_APPS = _model.pinned_classes
 
 # Globale Overrides für **beliebige** Apps (nicht nur gepinnt)
 # key = app-Name (window class), value = Dict mit optionalen Icon- und Exec-Overrides
-APP_CONFIG = {
-    "code-oss": {
-        "icon": "/usr/share/pixmaps/com.visualstudio.code.oss.png",
-        "exec": "code",
-    },
-    "nonexist": {
-        "icon": "/usr/share/pixmaps/com.visualstudio.code.oss.png",
-        "exec": "code",
-    },
-}
+APP_CONFIG = _model.overrides_as_dicts()
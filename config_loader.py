@@ -1,26 +1,502 @@
 import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
 
 # Globale Konfigurationsdaten
 config_data = {}
 
+# Wartezeit (Sekunden), in der weitere Änderungen zu einem Schreibvorgang
+# zusammengefasst werden
+SAVE_DELAY = 0.5
+# Wartezeit (ms) nach einer Dateiänderung, bevor neu geladen wird
+RELOAD_DELAY_MS = 50
+
+# Schlüssel, deren Änderung nur Größen betrifft
+SIZE_KEYS = ("icon_size", "indicator_width", "indicator_height")
+TASK_VIEWS = ("buttons", "strip")
+
+# Zuletzt geladener oder gespeicherter Dateiinhalt; eine Änderung mit genau
+# diesem Inhalt (z.B. unser eigener Schreibvorgang) wird nicht neu geladen.
+_known_text = None
+_watcher = None
+# Aus config_data abgeleitetes ConfigModel (bei jeder Änderung verworfen)
+_model = None
+
+def default_config_path():
+    return os.path.join(os.path.dirname(__file__), "config.json")
+
+def file_stamp(stat):
+    """Kennung eines Dateistands aus os.stat/os.fstat (Inode, mtime, Größe)."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _stat_stamp(path):
+    try:
+        return file_stamp(os.stat(path))
+    except OSError:
+        return None
+
+def write_atomic(path, text):
+    """
+    Schreibt ``text`` so nach ``path``, dass die Datei nie halb geschrieben
+    ist: temporäre Datei im selben Verzeichnis, fsync, rename, fsync des
+    Verzeichnisses.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+class ConfigWriter:
+    """
+    Schreibt die Konfiguration in einem Hintergrund-Thread.
+
+    schedule() merkt sich nur den neuesten Inhalt; geschrieben wird, wenn
+    ``delay`` Sekunden lang keine weitere Änderung kam. Mehrere schnelle
+    Änderungen (Drag & Drop, Pin-Toggles) ergeben so einen Schreibvorgang.
+
+    ``known_stamp`` ist der zuletzt gelesene oder geschriebene Dateistand.
+    Wurde die Datei seitdem von außen geändert, wird nicht geschrieben: die
+    externe Änderung gewinnt und wird vom ConfigWatcher geladen. Die zuletzt
+    geschriebenen Inhalte werden gemerkt, damit der ConfigWatcher einen
+    eigenen, inzwischen überholten Schreibvorgang nicht für eine externe
+    Änderung hält (siehe ``is_own``).
+    """
+
+    def __init__(self, delay=SAVE_DELAY):
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending = None
+        self._due = 0.0
+        self._busy = False
+        self._thread = None
+        self.known_stamp = None
+        # Zuletzt geschriebene Inhalte (vom Watcher evtl. noch nicht gesehen)
+        self._written = deque(maxlen=8)
+        self.requests = 0
+        self.writes = 0
+        self.skipped = 0
+
+    def schedule(self, path, text):
+        with self._cond:
+            self._pending = (path, text)
+            self._due = time.monotonic() + self.delay
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="karpbar-config",
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def set_known(self, stamp):
+        with self._cond:
+            self.known_stamp = stamp
+
+    def is_own(self, stamp, text):
+        """True, wenn die Datei mit ``stamp``/``text`` von uns stammt oder unverändert ist."""
+        with self._cond:
+            return stamp == self.known_stamp or text in self._written
+
+    def cancel(self):
+        """Verwirft einen noch nicht geschriebenen Inhalt. Rückgabe: ob es einen gab."""
+        with self._cond:
+            pending, self._pending = self._pending, None
+            self._cond.notify_all()
+            return pending is not None
+
+    def flush(self, timeout=None):
+        """
+        Schreibt Ausstehendes sofort und wartet, bis es auf der Platte ist.
+        Rückgabe: False, wenn ``timeout`` vorher abgelaufen ist.
+        """
+        with self._cond:
+            if self._pending is not None:
+                self._due = 0.0
+                self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: self._pending is None and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                remaining = self._due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                path, text = self._pending
+                self._pending = None
+                self._busy = True
+                known = self.known_stamp
+            stamp = None
+            current = _stat_stamp(path)
+            if known is not None and current is not None and current != known:
+                print("⚠️ Konfigurationsdatei wurde extern geändert – "
+                      "lokale Änderung wird nicht gespeichert.", file=sys.stderr)
+            else:
+                with self._cond:
+                    self._written.append(text)
+                try:
+                    write_atomic(path, text)
+                    stamp = _stat_stamp(path)
+                except Exception as e:
+                    print(f"Fehler beim Speichern der Konfigurationsdatei: {e}", file=sys.stderr)
+            with self._cond:
+                self._busy = False
+                if stamp is not None:
+                    self.known_stamp = stamp
+                    self.writes += 1
+                else:
+                    self.skipped += 1
+                self._cond.notify_all()
+
+_writer = ConfigWriter()
+
 def load_config(path=None):
     """
     Lädt die Konfigurationsdatei (JSON) und stellt die Daten in config_data bereit.
     Falls kein Pfad angegeben, wird 'config.json' im Modul-Verzeichnis verwendet.
     """
-    global config_data
+    global config_data, _known_text, _model
     if path is None:
-        base_dir = os.path.dirname(__file__)
-        path = os.path.join(base_dir, "config.json")
+        path = default_config_path()
     try:
         with open(path, 'r') as f:
-            config_data = json.load(f)
+            text = f.read()
+            stamp = file_stamp(os.fstat(f.fileno()))
+        data = json.loads(text)
+        validate_config(data)
     except Exception as e:
         raise RuntimeError(f"Konfigurationsdatei konnte nicht geladen werden: {e}")
+    config_data = data
+    _known_text = text
+    _writer.set_known(stamp)
+    _model = None
     return config_data
 
+def validate_config(data):
+    """
+    Prüft Typen und Wertebereiche der Konfiguration.
+    Wirft ValueError mit einer Beschreibung des ersten Fehlers.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Konfiguration muss ein JSON-Objekt sein")
+    for key in SIZE_KEYS:
+        value = data.get(key, 1)
+        if not isinstance(value, int) or isinstance(value, bool) or not 0 < value <= 512:
+            raise ValueError(f"'{key}' muss eine Ganzzahl zwischen 1 und 512 sein")
+    pinned = data.get("pinned_apps", [])
+    if not isinstance(pinned, list):
+        raise ValueError("'pinned_apps' muss eine Liste sein")
+    for entry in pinned:
+        if isinstance(entry, str):
+            continue
+        if not isinstance(entry, dict) or not isinstance(entry.get("class"), str):
+            raise ValueError(f"Ungültiger Eintrag in 'pinned_apps': {entry!r}")
+        if _blank_exec(entry):
+            raise ValueError(f"Leeres 'exec' in 'pinned_apps': {entry!r}")
+    overrides = data.get("app_overrides", {})
+    if not isinstance(overrides, dict):
+        raise ValueError("'app_overrides' muss ein Objekt sein")
+    for cls, ovr in overrides.items():
+        if not isinstance(ovr, dict) or any(
+                ovr.get(key) is not None and not isinstance(ovr[key], str)
+                for key in ("exec", "icon")):
+            raise ValueError(f"Ungültiger Eintrag in 'app_overrides': {cls!r}")
+        if _blank_exec(ovr):
+            raise ValueError(f"Leeres 'exec' in 'app_overrides': {cls!r}")
+    if data.get("task_view", "buttons") not in TASK_VIEWS:
+        raise ValueError(f"'task_view' muss einer von {', '.join(TASK_VIEWS)} sein")
+    for key, default in (("monitor_only", False), ("workspace_only", False),
+                         ("show_workspaces", True)):
+        if not isinstance(data.get(key, default), bool):
+            raise ValueError(f"'{key}' muss true oder false sein")
+
+def _blank_exec(entry):
+    """True, wenn ``exec`` angegeben, aber leer oder nur Leerzeichen ist."""
+    value = entry.get("exec")
+    return isinstance(value, str) and not value.strip()
+
+def pinned_class(entry):
+    """App-Klasse (klein geschrieben) eines 'pinned_apps'-Eintrags (String oder Dict)."""
+    cls = entry if isinstance(entry, str) else entry.get("class") or ""
+    return cls.lower()
+
+def pinned_classes(entries):
+    """App-Klassen (klein geschrieben) aus 'pinned_apps', leere Einträge ausgelassen."""
+    return [cls for cls in map(pinned_class, entries) if cls]
+
+@dataclass(frozen=True)
+class AppOverride:
+    exec: str = None
+    icon: str = None
+
+@dataclass(frozen=True)
+class PinnedApp:
+    name: str           # wie in der Konfiguration geschrieben
+    app_class: str      # klein geschrieben
+    exec: str = None
+    icon: str = None
+
+@dataclass(frozen=True)
+class ConfigModel:
+    """
+    Typisierte Sicht auf die Konfiguration.
+
+    Pins dürfen in der Datei Strings oder Dicts mit "class"/"exec"/"icon"
+    sein; hier sind beide Formen zu PinnedApp vereinheitlicht. Alle
+    Nachschlage-Tabellen sind klein geschrieben und vorab berechnet.
+    """
+    icon_size: int = 32
+    indicator_width: int = 8
+    indicator_height: int = 3
+    task_view: str = "buttons"
+    # Leisten zeigen nur die Fenster ihres Monitors
+    monitor_only: bool = False
+    # Nur gepinnte Apps und Apps mit Fenstern auf dem aktiven Workspace zeigen
+    workspace_only: bool = False
+    # Workspace-Anzeige links neben den Tasks
+    show_workspaces: bool = True
+    pinned: tuple = ()
+    overrides: dict = field(default_factory=dict)
+    pinned_set: frozenset = frozenset()
+
+    @classmethod
+    def from_dict(cls, data):
+        overrides = {
+            key.lower(): AppOverride(ovr.get("exec"), ovr.get("icon"))
+            for key, ovr in data.get("app_overrides", {}).items()
+        }
+        pinned = []
+        seen = set()
+        for entry in data.get("pinned_apps", []):
+            app_class = pinned_class(entry)
+            if not app_class or app_class in seen:
+                continue
+            seen.add(app_class)
+            if isinstance(entry, str):
+                pinned.append(PinnedApp(entry, app_class))
+            else:
+                pin = PinnedApp(entry["class"], app_class, entry.get("exec"), entry.get("icon"))
+                pinned.append(pin)
+                if pin.exec or pin.icon:
+                    overrides.setdefault(app_class, AppOverride(pin.exec, pin.icon))
+        return cls(
+            icon_size=data.get("icon_size", 32),
+            indicator_width=data.get("indicator_width", 8),
+            indicator_height=data.get("indicator_height", 3),
+            task_view=data.get("task_view", "buttons"),
+            monitor_only=data.get("monitor_only", False),
+            workspace_only=data.get("workspace_only", False),
+            show_workspaces=data.get("show_workspaces", True),
+            pinned=tuple(pinned),
+            overrides=overrides,
+            pinned_set=frozenset(seen),
+        )
+
+    @property
+    def pinned_classes(self):
+        return [app.app_class for app in self.pinned]
+
+    def is_pinned(self, app_class):
+        return app_class in self.pinned_set
+
+    def override_for(self, app_class):
+        """
+        Override für eine (klein geschriebene) Klasse oder None. Exec/Icon
+        aus einem Pin-Eintrag gelten als Override, app_overrides hat Vorrang.
+        """
+        return self.overrides.get(app_class)
+
+    def overrides_as_dicts(self):
+        """Overrides im alten Format {klasse: {"exec": ..., "icon": ...}}."""
+        return {
+            cls: {key: value for key, value in (("exec", ovr.exec), ("icon", ovr.icon))
+                  if value is not None}
+            for cls, ovr in self.overrides.items()
+        }
+
+def get_config_model():
+    """ConfigModel zur aktuellen config_data (zwischengespeichert)."""
+    global _model
+    if _model is None:
+        _model = ConfigModel.from_dict(get_config())
+    return _model
+
+def diff_config(old, new):
+    """
+    Vergleicht zwei Konfigurationen. Rückgabe: Dict mit
+      pins_added / pins_removed: Listen von Klassen
+      pin_order: neue Pin-Reihenfolge, falls sich die Pins geändert haben, sonst None
+      overrides: Menge der Klassen mit geänderten Overrides (app_overrides
+                 oder Exec/Icon eines Pin-Eintrags)
+      sizes: True, wenn sich Icon- oder Indikatorgrößen geändert haben
+      other: Menge sonstiger geänderter Schlüssel
+    """
+    old_pins = pinned_classes(old.get("pinned_apps", []))
+    new_pins = pinned_classes(new.get("pinned_apps", []))
+    old_set, new_set = set(old_pins), set(new_pins)
+    # Wirksame Overrides: app_overrides plus Exec/Icon aus Pin-Einträgen
+    old_ovr = ConfigModel.from_dict(old).overrides
+    new_ovr = ConfigModel.from_dict(new).overrides
+    handled = {"pinned_apps", "app_overrides", *SIZE_KEYS}
+    return {
+        "pins_added": [cls for cls in new_pins if cls not in old_set],
+        "pins_removed": [cls for cls in old_pins if cls not in new_set],
+        "pin_order": new_pins if new_pins != old_pins else None,
+        "overrides": {cls for cls in old_ovr.keys() | new_ovr.keys()
+                      if old_ovr.get(cls) != new_ovr.get(cls)},
+        "sizes": any(old.get(key) != new.get(key) for key in SIZE_KEYS),
+        "other": {key for key in old.keys() | new.keys()
+                  if key not in handled and old.get(key) != new.get(key)},
+    }
+
+def describe_diff(diff):
+    """Kurzbeschreibung eines Diffs für die Ausgabe."""
+    parts = []
+    if diff["pins_added"]:
+        parts.append("gepinnt: " + ", ".join(diff["pins_added"]))
+    if diff["pins_removed"]:
+        parts.append("entpinnt: " + ", ".join(diff["pins_removed"]))
+    if diff["overrides"]:
+        parts.append("Overrides: " + ", ".join(sorted(diff["overrides"])))
+    if diff["sizes"]:
+        parts.append("Größen")
+    if diff["other"]:
+        parts.append("sonstiges: " + ", ".join(sorted(diff["other"])))
+    return "; ".join(parts) or "keine wirksamen Änderungen"
+
+def reload_config(path=None):
+    """
+    Liest die Konfigurationsdatei neu, prüft sie und übernimmt sie in
+    config_data. config_data bleibt dasselbe Dict-Objekt, damit alle, die
+    es halten, die neuen Werte sehen.
+    Rückgabe: (alte Konfiguration, Diff) oder None, wenn die Datei unverändert
+    oder ungültig ist (dann bleibt die alte Konfiguration aktiv).
+    """
+    global _known_text, _model
+    if path is None:
+        path = default_config_path()
+    try:
+        with open(path, 'r') as f:
+            text = f.read()
+            stamp = file_stamp(os.fstat(f.fileno()))
+    except OSError as e:
+        print(f"⚠️ Konfigurationsdatei nicht lesbar: {e}", file=sys.stderr)
+        return None
+    if text == _known_text:
+        _writer.set_known(stamp)
+        return None
+    if _writer.is_own(stamp, text):
+        # Eigener, älterer Schreibvorgang; ein neuerer Stand ist schon
+        # übernommen und wird noch geschrieben – nichts zurücksetzen
+        return None
+    try:
+        new = json.loads(text)
+        validate_config(new)
+    except ValueError as e:
+        print(f"⚠️ Neue Konfiguration ignoriert: {e}", file=sys.stderr)
+        return None
+    _known_text = text
+    _model = None
+    # Externe Änderung gewinnt gegen einen noch ausstehenden eigenen Stand
+    _writer.set_known(stamp)
+    if _writer.cancel():
+        print("⚠️ Konfigurationsdatei wurde extern geändert – "
+              "lokale Änderung wird nicht gespeichert.", file=sys.stderr)
+    old = dict(config_data)
+    config_data.clear()
+    config_data.update(new)
+    return old, diff_config(old, new)
+
+class ConfigWatcher:
+    """
+    Überwacht die Konfigurationsdatei per Gio.FileMonitor, lädt sie bei
+    Änderungen neu und ruft ``callback(old, diff)`` auf. Die Zeit von der
+    ersten Dateiänderung bis zum Ende von ``callback`` wird ausgegeben.
+    """
+
+    def __init__(self, callback, path=None, delay_ms=RELOAD_DELAY_MS):
+        from gi.repository import Gio
+        self.path = path or default_config_path()
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self.last_latency_ms = None
+        self._timer = None
+        self._first_event = None
+        self.monitor = Gio.File.new_for_path(self.path).monitor_file(
+            Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self.monitor.connect("changed", self._on_changed)
+
+    def _on_changed(self, monitor, file, other_file, event_type):
+        from gi.repository import Gio, GLib
+        if event_type not in (Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                              Gio.FileMonitorEvent.CREATED,
+                              Gio.FileMonitorEvent.MOVED_IN,
+                              Gio.FileMonitorEvent.RENAMED):
+            return
+        # Editoren erzeugen mehrere Events pro Speichern: kurz sammeln
+        if self._first_event is None:
+            self._first_event = time.perf_counter()
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+        self._timer = GLib.timeout_add(self.delay_ms, self._reload)
+
+    def _reload(self):
+        from gi.repository import GLib
+        self._timer = None
+        started, self._first_event = self._first_event, None
+        result = reload_config(self.path)
+        if result is not None:
+            old, diff = result
+            self.callback(old, diff)
+            self.last_latency_ms = (time.perf_counter() - started) * 1000
+            print(f"🔄 Konfiguration neu geladen in {self.last_latency_ms:.1f} ms "
+                  f"({describe_diff(diff)})", file=sys.stderr)
+        return GLib.SOURCE_REMOVE
+
+    def notify_local(self, old):
+        """
+        Meldet eine Änderung aus Karpbar selbst (save_config) wie ein
+        Neuladen, damit alle Leisten sie übernehmen – auch die, in der sie
+        nicht ausgelöst wurde.
+        """
+        from gi.repository import GLib
+
+        def notify():
+            diff = diff_config(old, config_data)
+            if any(diff.values()):
+                self.callback(old, diff)
+            return GLib.SOURCE_REMOVE
+        GLib.idle_add(notify)
+
+def watch_config(callback, path=None):
+    """Startet die Überwachung der Konfigurationsdatei (einmalig)."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ConfigWatcher(callback, path)
+    return _watcher
+
 def get_config():
     """
     Gibt die geladene Konfiguration zurück. Lädt sie bei Bedarf nach.
@@ -32,16 +508,32 @@ def get_config():
 def save_config(path=None):
     """
     Speichert die aktuelle config_data zurück in die JSON-Datei.
+
+    Kehrt sofort zurück: Der Inhalt wird hier serialisiert (konsistenter
+    Stand), geschrieben wird verzögert und atomar im Hintergrund.
     """
-    global config_data
+    global _known_text, _model
     if path is None:
-        base_dir = os.path.dirname(__file__)
-        path = os.path.join(base_dir, "config.json")
+        path = default_config_path()
     try:
-        with open(path, 'w') as f:
-            json.dump(config_data, f, indent=4)
-    except Exception as e:
+        text = json.dumps(config_data, indent=4)
+    except (TypeError, ValueError) as e:
         print(f"Fehler beim Speichern der Konfigurationsdatei: {e}", file=sys.stderr)
+        return
+    # Der eigene Schreibvorgang soll kein Neuladen auslösen
+    previous, _known_text = _known_text, text
+    _model = None
+    _writer.schedule(path, text)
+    if _watcher is not None and previous is not None:
+        _watcher.notify_local(json.loads(previous))
+
+def flush_config(timeout=2.0):
+    """
+    Schreibt ausstehende Änderungen sofort. Beim Beenden aufrufen, damit
+    keine Änderung in der Wartezeit verloren geht.
+    """
+    if not _writer.flush(timeout):
+        print("⚠️ Konfiguration konnte nicht rechtzeitig gespeichert werden.", file=sys.stderr)
 
 def get_pinned_apps():
     """
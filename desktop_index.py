@@ -0,0 +1,285 @@
+"""
+Index über alle XDG ``applications/*.desktop``-Dateien.
+
+Bildet Fensterklassen (``StartupWMClass``), Desktop-IDs und deren letzten
+Namensteil auf Exec-Befehl und Icon ab. Der Index wird kompakt als JSON im
+Cache-Verzeichnis abgelegt, zusammen mit der mtime jeder Datei. Beim Start
+werden die Verzeichnisse (samt Unterverzeichnissen) nur per stat geprüft
+und nur neue oder geänderte Dateien neu eingelesen. Zur Laufzeit halten
+``Gio.FileMonitor`` auf allen Verzeichnissen den Index aktuell; Events
+werden gesammelt und einmal pro Schub abgeglichen und gespeichert.
+"""
+import json
+import os
+import re
+import time
+
+CACHE_VERSION = 2
+
+# Wartezeit nach dem letzten Datei-Event bis zum Abgleich (ms)
+RESCAN_DELAY_MS = 500
+
+# Feldcodes laut Desktop Entry Spec, die im Exec-Befehl entfernt werden
+_FIELD_CODES = re.compile(r"%[fFuUdDnNickvm]")
+
+
+def _cache_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "karpbar", "desktop_index.json")
+
+
+def application_dirs():
+    """Alle XDG-Anwendungsverzeichnisse in Prioritätsreihenfolge."""
+    data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = [data_home] + [d for d in data_dirs.split(":") if d]
+    result = []
+    for d in dirs:
+        path = os.path.join(d, "applications")
+        if path not in result:
+            result.append(path)
+    return result
+
+
+def clean_exec(exec_line):
+    """Entfernt Feldcodes (%U, %f, ...) aus einer Exec-Zeile."""
+    cmd = _FIELD_CODES.sub("", exec_line).replace("%%", "%")
+    return " ".join(cmd.split())
+
+
+def parse_desktop_file(path):
+    """
+    Liest die [Desktop Entry]-Gruppe einer .desktop-Datei.
+    Rückgabe: [exec, icon, wm_class] oder None, wenn keine Anwendung.
+    """
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    in_entry = False
+    fields = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("["):
+            if in_entry:
+                break
+            in_entry = line == "[Desktop Entry]"
+            continue
+        if not in_entry:
+            continue
+        key, sep, value = line.partition("=")
+        if sep:
+            fields[key.strip()] = value.strip()
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("Hidden", "false").lower() == "true":
+        return None
+    return [clean_exec(fields.get("Exec", "")),
+            fields.get("Icon", ""),
+            fields.get("StartupWMClass", "")]
+
+
+def _scan_dir(path, known=None):
+    """
+    Liest alle .desktop-Dateien eines Verzeichnisses (rekursiv). Dateien,
+    deren mtime zu ``known`` passt, werden nicht neu eingelesen.
+    Rückgabe: ({desktop_id: [mtime, eintrag oder None]}, geändert)
+    """
+    known = known or {}
+    files = {}
+    changed = False
+    for root, _dirs, names in os.walk(path):
+        for name in names:
+            if not name.endswith(".desktop"):
+                continue
+            full = os.path.join(root, name)
+            try:
+                mtime = os.stat(full).st_mtime_ns
+            except OSError:
+                continue
+            desktop_id = os.path.relpath(full, path).replace(os.sep, "-")
+            cached = known.get(desktop_id)
+            if cached is not None and cached[0] == mtime:
+                files[desktop_id] = cached
+            else:
+                files[desktop_id] = [mtime, parse_desktop_file(full)]
+                changed = True
+    return files, changed or known.keys() != files.keys()
+
+
+class DesktopIndex:
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or _cache_path()
+        # Verzeichnis -> {desktop_id: [mtime, [exec, icon, wm_class] oder None]}
+        self._dirs = {}
+        self._lookup = {}
+        # Überwachtes (Unter-)Verzeichnis -> Gio.FileMonitor
+        self._monitors = {}
+        # Anwendungsverzeichnisse mit Events seit dem letzten Abgleich
+        self._pending = set()
+        self._timer = None
+        self.load_time_ms = 0.0
+
+    def load(self):
+        """
+        Lädt den Index aus dem Cache und liest nur neue oder geänderte
+        Dateien neu ein.
+        """
+        t0 = time.perf_counter()
+        cached = {}
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+            if data.get("v") == CACHE_VERSION:
+                cached = data.get("dirs", {})
+        except (OSError, ValueError):
+            pass
+
+        dirty = False
+        self._dirs = {}
+        for path in application_dirs():
+            if not os.path.isdir(path):
+                dirty |= path in cached
+                continue
+            files, changed = _scan_dir(path, cached.get(path))
+            self._dirs[path] = files
+            dirty |= changed
+        self._rebuild_lookup()
+        if dirty:
+            self.save()
+        self.load_time_ms = (time.perf_counter() - t0) * 1000
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"v": CACHE_VERSION, "dirs": self._dirs}, f,
+                          separators=(",", ":"))
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"Fehler beim Speichern des Desktop-Index: {e}")
+
+    def _rebuild_lookup(self):
+        """
+        Baut die Lookup-Tabelle neu auf. Verzeichnisse mit höherer Priorität
+        gewinnen (XDG_DATA_HOME vor XDG_DATA_DIRS).
+        """
+        lookup = {}
+        by_id = {}
+        for path in application_dirs():
+            for desktop_id, (_mtime, entry) in self._dirs.get(path, {}).items():
+                if entry is not None:
+                    by_id.setdefault(desktop_id, entry)
+        # Schwächere Schlüssel zuerst, stärkere überschreiben
+        for desktop_id, entry in by_id.items():
+            stem = desktop_id[:-len(".desktop")].lower()
+            lookup.setdefault(stem.rsplit(".", 1)[-1], entry)
+        for desktop_id, entry in by_id.items():
+            lookup[desktop_id[:-len(".desktop")].lower()] = entry
+        for entry in by_id.values():
+            if entry[2]:
+                lookup[entry[2].lower()] = entry
+        self._lookup = lookup
+
+    def lookup(self, app_class):
+        """
+        Liefert (exec, icon) für eine Fensterklasse oder None.
+        """
+        entry = self._lookup.get(app_class.lower())
+        if entry is None:
+            return None
+        return entry[0] or None, entry[1] or None
+
+    def watch(self):
+        """Überwacht alle Anwendungsverzeichnisse samt Unterverzeichnissen."""
+        for path in application_dirs():
+            if os.path.isdir(path):
+                self._watch_tree(path)
+
+    def _watch_tree(self, path):
+        """Hängt Gio.FileMonitor an alle noch nicht überwachten Verzeichnisse."""
+        from gi.repository import Gio
+        for root, _dirs, _files in os.walk(path):
+            if root in self._monitors:
+                continue
+            monitor = Gio.File.new_for_path(root).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None)
+            monitor.connect("changed", self._on_dir_changed, path)
+            self._monitors[root] = monitor
+
+    def _on_dir_changed(self, monitor, file, other_file, event_type, path):
+        from gi.repository import Gio, GLib
+        if event_type not in (Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                              Gio.FileMonitorEvent.DELETED,
+                              Gio.FileMonitorEvent.CREATED,
+                              Gio.FileMonitorEvent.MOVED_IN,
+                              Gio.FileMonitorEvent.MOVED_OUT,
+                              Gio.FileMonitorEvent.RENAMED):
+            return
+        # Paket-Installationen ändern viele Dateien auf einmal: kurz sammeln
+        self._pending.add(path)
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+        self._timer = GLib.timeout_add(RESCAN_DELAY_MS, self._rescan)
+
+    def _rescan(self):
+        """Gleicht die betroffenen Verzeichnisse ab und speichert einmal."""
+        from gi.repository import GLib
+        self._timer = None
+        pending, self._pending = self._pending, set()
+        dirty = False
+        for path in pending:
+            if not os.path.isdir(path):
+                dirty |= self._dirs.pop(path, None) is not None
+                continue
+            files, changed = _scan_dir(path, self._dirs.get(path))
+            self._dirs[path] = files
+            dirty |= changed
+            self._watch_tree(path)
+        # Überwachung entfernter Unterverzeichnisse beenden
+        for root in [r for r in self._monitors if not os.path.isdir(r)]:
+            self._monitors.pop(root).cancel()
+        if dirty:
+            self._rebuild_lookup()
+            self.save()
+        return GLib.SOURCE_REMOVE
+
+
+_index = None
+
+
+def get_desktop_index():
+    """Liefert den prozessweiten Desktop-Index (beim ersten Aufruf geladen)."""
+    global _index
+    if _index is None:
+        _index = DesktopIndex().load()
+    return _index
+
+
+def resolve_app(app_class, overrides=None):
+    """
+    Ermittelt (exec, icon) für eine App-Klasse.
+    Reihenfolge: Overrides aus der Konfiguration (ConfigModel.overrides),
+    Desktop-Index, Klasse selbst.
+    """
+    app_class = app_class.lower()
+    ovr = (overrides or {}).get(app_class)
+    exec_cmd = ovr.exec if ovr else None
+    icon = ovr.icon if ovr else None
+    if exec_cmd is None or icon is None:
+        found = get_desktop_index().lookup(app_class)
+        if found is not None:
+            exec_cmd = exec_cmd or found[0]
+            icon = icon or found[1]
+    return exec_cmd or app_class, icon
+
+
+if __name__ == "__main__":
+    index = DesktopIndex().load()
+    print(f"Desktop-Index geladen in {index.load_time_ms:.1f} ms "
+          f"({len(index._lookup)} Schlüssel)")
@@ -0,0 +1,432 @@
+"""
+Direkter Zugriff auf die Hyprland-IPC-Sockets, ohne hyprctl zu starten.
+
+- ``.socket.sock``  : Request/Reply (``j/clients``, ``dispatch ...``)
+- ``.socket2.sock`` : Event-Stream (``openwindow>>...``)
+
+Requests gibt es blockierend (``request``) und als GIO-Variante mit
+Callback, Zeitlimit und Gio.Cancellable (``request_async``), die den
+GTK-Main-Loop nie anhält.
+"""
+import json
+import os
+import socket
+
+# Trenner zwischen den Einzelantworten eines [[BATCH]]-Requests
+BATCH_DELIMITER = "\n\n\n"
+
+
+class HyprIPCError(Exception):
+    pass
+
+
+def hypr_instance_dir():
+    """
+    Liefert das Socket-Verzeichnis der laufenden Hyprland-Instanz.
+    Bevorzugt HYPRLAND_INSTANCE_SIGNATURE, sonst das erste gefundene Verzeichnis.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR", "")
+    hypr_root = os.path.join(runtime, "hypr")
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if signature:
+        return os.path.join(hypr_root, signature)
+    try:
+        sig_dirs = [d for d in os.listdir(hypr_root)
+                    if os.path.isdir(os.path.join(hypr_root, d))]
+    except OSError as e:
+        raise HyprIPCError(f"Hyprland-Socketverzeichnis nicht gefunden: {e}")
+    if not sig_dirs:
+        raise HyprIPCError("Keine laufende Hyprland-Instanz gefunden")
+    return os.path.join(hypr_root, sig_dirs[0])
+
+
+def request_socket_path():
+    return os.path.join(hypr_instance_dir(), ".socket.sock")
+
+
+def event_socket_path():
+    return os.path.join(hypr_instance_dir(), ".socket2.sock")
+
+
+class HyprClient:
+    """
+    Client für den Request-Socket von Hyprland.
+
+    Hyprland beantwortet genau einen Request pro Verbindung und schließt sie
+    danach. Der Client hält deshalb den aufgelösten Socket-Pfad und baut pro
+    Request eine Unix-Socket-Verbindung auf (Mikrosekunden statt fork/exec).
+    Mehrere Befehle gehen per ``[[BATCH]]`` in einem Round-Trip raus.
+    """
+
+    def __init__(self, socket_path=None, timeout=1.0):
+        self._socket_path = socket_path
+        self.timeout = timeout
+
+    @property
+    def socket_path(self):
+        if self._socket_path is None:
+            self._socket_path = request_socket_path()
+        return self._socket_path
+
+    def request(self, command):
+        """Sendet einen Rohbefehl und gibt die Antwort als String zurück."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(command.encode())
+            chunks = []
+            # Puffer pro Request: der Warmstart fragt aus einem Hintergrund-
+            # Thread parallel zum Main-Loop an
+            view = memoryview(bytearray(65536))
+            while True:
+                n = sock.recv_into(view)
+                if n == 0:
+                    break
+                chunks.append(bytes(view[:n]))
+        except OSError as e:
+            raise HyprIPCError(f"Hyprland-Request '{command}' fehlgeschlagen: {e}")
+        finally:
+            sock.close()
+        return b"".join(chunks).decode(errors="replace")
+
+    def request_json(self, command):
+        """
+        Führt ``j/<command>`` aus und gibt das geparste JSON zurück.
+        Bei Fehlern wird None zurückgegeben.
+        """
+        try:
+            reply = self.request(f"j/{command}")
+        except HyprIPCError as e:
+            print(e)
+            return None
+        try:
+            return json.loads(reply)
+        except json.JSONDecodeError:
+            return None
+
+    def request_json_batch(self, commands):
+        """
+        Führt mehrere ``j/<command>`` in einem Round-Trip aus.
+        Rückgabe: Liste der geparsten Antworten (None je Fehler).
+        """
+        try:
+            reply = self.request(_json_batch(commands))
+        except HyprIPCError as e:
+            print(e)
+            return [None] * len(commands)
+        return _parse_json_replies(commands, reply)
+
+    def request_async(self, command, callback, cancellable=None, timeout=None):
+        """
+        Wie ``request``, aber über den GLib-Main-Loop: kehrt sofort zurück und
+        ruft ``callback(reply)`` auf, ``reply`` ist None bei Fehler,
+        Zeitüberschreitung oder Abbruch. Rückgabe: das Gio.Cancellable.
+        """
+        try:
+            path = self.socket_path
+        except HyprIPCError as e:
+            from gi.repository import GLib
+            print(e)
+            GLib.idle_add(lambda: callback(None))
+            return None
+        request = _AsyncRequest(path, command, callback, cancellable,
+                                self.timeout if timeout is None else timeout)
+        return request.cancellable
+
+    def request_json_async(self, command, callback, cancellable=None, timeout=None):
+        """Wie ``request_json``, Ergebnis (oder None) geht an ``callback``."""
+        def on_reply(reply):
+            data = None
+            if reply is not None:
+                try:
+                    data = json.loads(reply)
+                except json.JSONDecodeError:
+                    pass
+            callback(data)
+        return self.request_async(f"j/{command}", on_reply, cancellable, timeout)
+
+    def request_json_batch_async(self, commands, callback, cancellable=None, timeout=None):
+        """Wie ``request_json_batch``, die Liste der Antworten geht an ``callback``."""
+        def on_reply(reply):
+            if reply is None:
+                callback([None] * len(commands))
+            else:
+                callback(_parse_json_replies(commands, reply))
+        return self.request_async(_json_batch(commands), on_reply, cancellable, timeout)
+
+    def dispatch_batch_async(self, dispatches, callback=None, cancellable=None, timeout=None):
+        """Wie ``dispatch_batch``, die Liste von bools geht an ``callback``."""
+        commands = [f"dispatch {d}" for d in dispatches]
+        if not commands:
+            if callback is not None:
+                callback([])
+            return None
+        command = commands[0] if len(commands) == 1 else "[[BATCH]]" + ";".join(commands)
+
+        def on_reply(reply):
+            if reply is None:
+                results = [False] * len(commands)
+            else:
+                results = _split_replies(commands, reply)
+            if callback is not None:
+                callback(results)
+        return self.request_async(command, on_reply, cancellable, timeout)
+
+    def dispatch(self, *args):
+        """Führt einen Dispatcher aus, z.B. ``dispatch("focuswindow", "address:0x...")``."""
+        return self.dispatch_batch([" ".join(args)])[0]
+
+    def dispatch_batch(self, dispatches):
+        """
+        Führt mehrere Dispatcher in einem Round-Trip aus.
+        Rückgabe: Liste von bools (Erfolg je Dispatcher).
+        """
+        if not dispatches:
+            return []
+        commands = [f"dispatch {d}" for d in dispatches]
+        if len(commands) == 1:
+            command = commands[0]
+        else:
+            command = "[[BATCH]]" + ";".join(commands)
+        try:
+            reply = self.request(command)
+        except HyprIPCError as e:
+            print(e)
+            return [False] * len(commands)
+        return _split_replies(commands, reply)
+
+
+def _json_batch(commands):
+    if len(commands) == 1:
+        return f"j/{commands[0]}"
+    return "[[BATCH]]" + ";".join(f"j/{c}" for c in commands)
+
+
+def _parse_json_replies(commands, reply):
+    replies = reply.split(BATCH_DELIMITER) if len(commands) > 1 else [reply]
+    results = []
+    for idx in range(len(commands)):
+        try:
+            results.append(json.loads(replies[idx]))
+        except (IndexError, json.JSONDecodeError):
+            results.append(None)
+    return results
+
+
+def _split_replies(commands, reply):
+    replies = reply.split(BATCH_DELIMITER) if len(commands) > 1 else [reply]
+    results = []
+    for idx, cmd in enumerate(commands):
+        answer = replies[idx].strip() if idx < len(replies) else ""
+        results.append(_check_reply(cmd, answer))
+    return results
+
+
+class _AsyncRequest:
+    """
+    Ein Request über Gio: verbinden, Befehl schreiben, bis EOF lesen.
+    Alle Schritte laufen als GIO-Async-Operationen im Main-Loop; das
+    Zeitlimit bricht sie über das gemeinsame Cancellable ab.
+    """
+
+    def __init__(self, path, command, callback, cancellable, timeout):
+        from gi.repository import Gio, GLib
+        self.command = command
+        self.callback = callback
+        self.cancellable = cancellable or Gio.Cancellable()
+        self.chunks = []
+        self.conn = None
+        self.timed_out = False
+        self._done = False
+        self._timeout_id = None
+        if timeout:
+            self._timeout_id = GLib.timeout_add(int(timeout * 1000), self._on_timeout)
+        client = Gio.SocketClient()
+        client.connect_async(Gio.UnixSocketAddress.new(path), self.cancellable,
+                             self._on_connected)
+
+    def _on_connected(self, client, result):
+        from gi.repository import GLib
+        try:
+            self.conn = client.connect_finish(result)
+            self.conn.get_output_stream().write_all_async(
+                self.command.encode(), GLib.PRIORITY_DEFAULT, self.cancellable,
+                self._on_written)
+        except GLib.Error as e:
+            self._finish(e)
+
+    def _on_written(self, stream, result):
+        from gi.repository import GLib
+        try:
+            stream.write_all_finish(result)
+            self._read_more()
+        except GLib.Error as e:
+            self._finish(e)
+
+    def _read_more(self):
+        from gi.repository import GLib
+        self.conn.get_input_stream().read_bytes_async(
+            65536, GLib.PRIORITY_DEFAULT, self.cancellable, self._on_read)
+
+    def _on_read(self, stream, result):
+        from gi.repository import GLib
+        try:
+            data = stream.read_bytes_finish(result)
+        except GLib.Error as e:
+            self._finish(e)
+            return
+        if data.get_size() == 0:
+            self._finish(None)
+            return
+        self.chunks.append(data.get_data())
+        self._read_more()
+
+    def _on_timeout(self):
+        from gi.repository import GLib
+        self._timeout_id = None
+        self.timed_out = True
+        self.cancellable.cancel()
+        return GLib.SOURCE_REMOVE
+
+    def _finish(self, error):
+        from gi.repository import Gio, GLib
+        if self._done:
+            return
+        self._done = True
+        if self._timeout_id is not None:
+            GLib.source_remove(self._timeout_id)
+            self._timeout_id = None
+        if self.conn is not None:
+            self.conn.close_async(GLib.PRIORITY_DEFAULT, None, None)
+        reply = None
+        if self.timed_out:
+            print(f"Hyprland-Request '{self.command}' fehlgeschlagen: Zeitüberschreitung")
+        elif error is not None:
+            # Vom Aufrufer abgebrochen: keine Fehlermeldung
+            if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                print(f"Hyprland-Request '{self.command}' fehlgeschlagen: {error.message}")
+        else:
+            reply = b"".join(self.chunks).decode(errors="replace")
+        self.callback(reply)
+
+
+def _check_reply(command, answer):
+    if answer == "ok":
+        return True
+    print(f"Fehler bei '{command}': {answer or 'keine Antwort'}")
+    return False
+
+
+def connect_event_socket(path=None):
+    """
+    Verbindet sich mit dem Event-Socket (socket2) und gibt einen
+    nicht-blockierenden Socket zurück.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path or event_socket_path())
+    except OSError as e:
+        sock.close()
+        raise HyprIPCError(f"Verbindung zu socket2 fehlgeschlagen: {e}")
+    sock.setblocking(False)
+    return sock
+
+
+class EventReader:
+    """
+    Zerlegt den socket2-Stream (``EVENT>>ARGS\\n``) in einzelne Events.
+
+    Gelesen wird per ``recv_into`` in einen wiederverwendeten Puffer; eine
+    unvollständige Zeile am Ende eines Reads bleibt im Puffer und wird beim
+    nächsten Read vervollständigt. Der Bereich mit vollständigen Zeilen wird
+    einmal als bytes kopiert und in C zerlegt (schneller als ein Zerlegen
+    Zeile für Zeile direkt im Puffer). Der Name wird per Lookup auf die
+    gewünschten ``events`` geprüft; nur bei Treffern werden die Argumente
+    dekodiert, und zwar als ganzer String. Alle anderen Events werden ohne
+    Dekodierung übersprungen.
+    """
+
+    def __init__(self, sock, handler, events=None, bufsize=65536):
+        self._sock = sock
+        self._handler = handler
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self._names = None
+        if events is not None:
+            self._names = {name.encode(): name for name in events}
+        self.events_read = 0
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def read(self):
+        """
+        Liest einmal vom Socket und ruft den Handler für jede vollständige
+        Zeile auf. Rückgabe: False bei EOF, sonst True.
+        """
+        if self._end == len(self._buf):
+            self._make_room()
+        try:
+            n = self._sock.recv_into(self._view[self._end:])
+        except (BlockingIOError, InterruptedError):
+            return True
+        if n == 0:
+            return False
+        self._end += n
+        self._parse()
+        return True
+
+    def feed(self, data):
+        """Verarbeitet Bytes ohne Socket (z.B. für Tests und Benchmarks)."""
+        data = memoryview(data)
+        while data:
+            if self._end == len(self._buf):
+                self._make_room()
+            n = min(len(data), len(self._buf) - self._end)
+            self._view[self._end:self._end + n] = data[:n]
+            self._end += n
+            data = data[n:]
+            self._parse()
+
+    def _parse(self):
+        end = self._buf.rfind(b"\n", self._start, self._end)
+        if end < 0:
+            return
+        # Nur der Bereich mit vollständigen Zeilen wird zerlegt, der Rest
+        # bleibt im Puffer stehen
+        lines = bytes(self._view[self._start:end]).split(b"\n")
+        names = self._names
+        handler = self._handler
+        count = 0
+        for line in lines:
+            name, sep, args = line.partition(b">>")
+            if not sep:
+                continue
+            if names is None:
+                name = name.decode("utf-8", "replace")
+            else:
+                name = names.get(name)
+                if name is None:
+                    continue
+            handler(name, args.decode("utf-8", "replace"))
+            count += 1
+        self.events_read += count
+        if end + 1 == self._end:
+            self._start = self._end = 0
+        else:
+            self._start = end + 1
+
+    def _make_room(self):
+        """Schiebt den Rest nach vorne oder vergrößert den Puffer für lange Zeilen."""
+        rest = self._end - self._start
+        if self._start > 0:
+            self._buf[0:rest] = self._buf[self._start:self._end]
+        else:
+            self._view.release()
+            self._buf.extend(bytes(len(self._buf)))
+            self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = rest
@@ -0,0 +1,216 @@
+"""
+Prozessweiter Icon-Cache.
+
+Schlüssel ist (Icon-Name oder Pfad, Größe, Skalierung), Werte sind fertig
+dekodierte Gdk.Texture-Objekte. Nicht gefundene Icons werden als negativer
+Eintrag gemerkt, damit z.B. ``icon_theme.has_icon`` nicht bei jedem Button
+erneut geprüft wird. Bei einem Wechsel des Icon-Themes wird alles verworfen.
+
+Pfade aus dem Warmstart-Snapshot können per ``add_hints`` für (Name, Größe)
+vorgegeben werden; sie ersetzen genau eine Theme-Suche und verfallen danach
+bzw. beim Theme-Wechsel.
+
+Mit ``lookup_async`` wird nur die Pfadauflösung im Main-Loop gemacht, das
+Dekodieren läuft in einem Thread-Pool. Fertige Icons werden gebündelt per
+Idle-Callback mit Zeitbudget übernommen, damit kein Frame blockiert.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gtk, Gdk, GLib
+
+# Marker für „Icon existiert nicht"
+_MISSING = object()
+
+# Maximale Zeit pro Idle-Durchlauf für fertige Icons (Sekunden)
+FRAME_BUDGET = 0.004
+
+
+class IconCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._theme = None
+        # (Icon-Name, Größe) -> Pfad aus dem Snapshot, einmalig gültig
+        self._hints = {}
+        self.hits = 0
+        self.misses = 0
+        # Asynchrones Laden
+        self._generation = 0
+        self._pending = {}
+        self._done = deque()
+        self._done_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._executor = None
+
+    @property
+    def icon_theme(self):
+        if self._theme is None:
+            display = Gdk.Display.get_default()
+            self._theme = Gtk.IconTheme.get_for_display(display)
+            self._theme.connect("changed", lambda *_: self.invalidate())
+        return self._theme
+
+    def invalidate(self):
+        """Verwirft alle Einträge (z.B. nach Theme-Wechsel)."""
+        self._entries.clear()
+        self._hints.clear()
+        self._generation += 1
+
+    def add_hints(self, paths, size):
+        """Gibt für den ersten Frame Pfade vor: {Icon-Name: Pfad} in ``size``."""
+        for name, path in paths.items():
+            self._hints[(name, size)] = path
+
+    def lookup(self, name, size, scale=1):
+        """
+        Liefert das Icon als Gdk.Paintable (in der Regel Gdk.Texture) oder
+        None, wenn es weder als Datei noch im Icon-Theme existiert.
+        """
+        if not name:
+            return None
+        key = (name, size, scale)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return None if entry is _MISSING else entry
+
+        self.misses += 1
+        paintable = self._load(name, size, scale)
+        self._store(key, _MISSING if paintable is None else paintable)
+        return paintable
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def resolve_path(self, name, size, scale=1):
+        """
+        Löst einen Icon-Namen oder Pfad zu einer Datei auf.
+        Rückgabe: (Pfad, Theme-Paintable); beide None, wenn nicht gefunden.
+        """
+        if os.path.isabs(name):
+            return (name, None) if os.path.isfile(name) else (None, None)
+        hint = self._hints.pop((name, size), None)
+        if hint is not None and scale == 1 and os.path.isfile(hint):
+            # Pfad aus dem Snapshot: Theme-Suche sparen
+            return hint, None
+        theme = self.icon_theme
+        if theme is None or not theme.has_icon(name):
+            return None, None
+        paintable = theme.lookup_icon(name, None, size, scale,
+                                      Gtk.TextDirection.NONE, Gtk.IconLookupFlags(0))
+        icon_file = paintable.get_file()
+        path = icon_file.get_path() if icon_file else None
+        return path, paintable
+
+    def _load(self, name, size, scale):
+        path, paintable = self.resolve_path(name, size, scale)
+        if path is None:
+            # Themes aus GResources haben keinen Dateipfad
+            return paintable
+        pixbuf = _decode(path, size * scale)
+        return Gdk.Texture.new_for_pixbuf(pixbuf) if pixbuf else None
+
+    def lookup_async(self, name, size, scale, callback):
+        """
+        Wie ``lookup``, ruft aber ``callback(paintable_or_None)`` auf, sobald
+        das Icon bereit ist. Bei einem Cache-Treffer geschieht das sofort.
+        """
+        if not name:
+            callback(None)
+            return
+        key = (name, size, scale)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            callback(None if entry is _MISSING else entry)
+            return
+
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append(callback)
+            return
+
+        self.misses += 1
+        path, paintable = self.resolve_path(name, size, scale)
+        if path is None:
+            self._store(key, _MISSING if paintable is None else paintable)
+            callback(paintable)
+            return
+
+        self._pending[key] = [callback]
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                thread_name_prefix="karpbar-icons")
+        generation = self._generation
+        future = self._executor.submit(_decode, path, size * scale)
+        future.add_done_callback(
+            lambda f: self._on_decoded(key, generation, f.result()))
+
+    def _on_decoded(self, key, generation, pixbuf):
+        # Läuft im Worker-Thread: nur einreihen, GTK erst im Main-Loop anfassen
+        with self._done_lock:
+            self._done.append((key, generation, pixbuf))
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        GLib.idle_add(self._drain)
+
+    def _drain(self):
+        deadline = time.perf_counter() + FRAME_BUDGET
+        while True:
+            with self._done_lock:
+                if not self._done:
+                    self._drain_scheduled = False
+                    return GLib.SOURCE_REMOVE
+                key, generation, pixbuf = self._done.popleft()
+            callbacks = self._pending.pop(key, [])
+            if generation != self._generation:
+                # Theme wurde inzwischen gewechselt: neu auflösen
+                for callback in callbacks:
+                    self.lookup_async(*key, callback)
+            else:
+                texture = Gdk.Texture.new_for_pixbuf(pixbuf) if pixbuf else None
+                self._store(key, _MISSING if texture is None else texture)
+                for callback in callbacks:
+                    callback(texture)
+            if time.perf_counter() >= deadline:
+                return GLib.SOURCE_CONTINUE
+
+
+def _decode(path, pixel_size):
+    """Dekodiert eine Icon-Datei; threadsicher, fasst kein GTK an."""
+    from gi.repository import GdkPixbuf
+    try:
+        return GdkPixbuf.Pixbuf.new_from_file_at_scale(
+            filename=path,
+            width=pixel_size,
+            height=pixel_size,
+            preserve_aspect_ratio=True
+        )
+    except Exception as e:
+        print(f"Warnung: Konnte Icon nicht laden: {e}")
+        return None
+
+
+_cache = None
+
+
+def get_icon_cache():
+    """Liefert den prozessweiten Icon-Cache."""
+    global _cache
+    if _cache is None:
+        _cache = IconCache()
+    return _cache
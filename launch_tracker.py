@@ -0,0 +1,231 @@
+"""
+Misst, wie lange eine App vom Start aus der Leiste bis zu ihrem ersten
+Fenster braucht.
+
+Ein Start wird mit Klasse und PID vermerkt und gilt als abgeschlossen, sobald
+ein ``openwindow``-Event passt: zuerst über die erwartete Klasse (steht im
+Event), sonst über die PID des Fensters, die erst beim Compositor erfragt
+werden muss (der Launcher startet jede App als Session-Leader, daher haben
+auch Kindprozesse eines Wrappers ``getsid() == pid``). Die Latenzen landen
+je App in einem Histogramm mit festen, logarithmisch verteilten Buckets –
+der Speicherbedarf bleibt unabhängig von der Anzahl der Starts konstant.
+Die Histogramme werden im Cache-Verzeichnis gespeichert.
+"""
+import bisect
+import json
+import os
+import time
+
+STATS_VERSION = 1
+
+# Ohne passendes Fenster gilt ein Start nach dieser Zeit als verloren (s)
+LAUNCH_TIMEOUT = 30
+
+# Bucket-Obergrenzen in ms: 10 ms … ~60 s, Faktor 1.25
+BUCKET_BOUNDS = tuple(round(10 * 1.25 ** i, 1) for i in range(40))
+
+
+def stats_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "karpbar", "launch_stats.json")
+
+
+class LatencyHistogram:
+    """Histogramm über BUCKET_BOUNDS (letzter Bucket: alles darüber)."""
+    __slots__ = ("counts", "total", "max_ms")
+
+    def __init__(self, counts=None, max_ms=0.0):
+        self.counts = list(counts or ()) or [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = sum(self.counts)
+        self.max_ms = max_ms
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """
+        Obergrenze des Buckets, in den das p-Quantil fällt (0 < p ≤ 1),
+        für den letzten Bucket das Maximum. None ohne Messwerte.
+        """
+        if not self.total:
+            return None
+        rank = max(1, round(self.total * p))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(BUCKET_BOUNDS):
+                    return min(BUCKET_BOUNDS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+
+class _Launch:
+    __slots__ = ("app_class", "pid", "started")
+
+    def __init__(self, app_class, pid, started):
+        self.app_class = app_class
+        self.pid = pid
+        self.started = started
+
+
+class LaunchTracker:
+    def __init__(self, path=None):
+        self.path = path or stats_path()
+        # Klasse -> laufender Start; pro Klasse ist höchstens einer offen
+        self.pending = {}
+        # Klasse -> LatencyHistogram
+        self.histograms = {}
+        self.timeouts = 0
+        self._dirty = False
+
+    def start(self, app_class, pid, started=None):
+        if started is None:
+            started = time.perf_counter()
+        self.pending[app_class] = _Launch(app_class, pid, started)
+
+    def cancel(self, app_class, pid=None):
+        """
+        Verwirft einen offenen Start (Prozess beendet, Zeitlimit). Mit ``pid``
+        nur, wenn der offene Start zu genau diesem Prozess gehört.
+        """
+        launch = self.pending.get(app_class)
+        if launch is None or (pid is not None and launch.pid != pid):
+            return False
+        del self.pending[app_class]
+        return True
+
+    def expire(self, app_class):
+        """Zeitlimit erreicht: Start ohne Messwert verwerfen."""
+        if self.cancel(app_class):
+            self.timeouts += 1
+            return True
+        return False
+
+    def match_class(self, app_class, now=None):
+        """
+        Ordnet ein neues Fenster der Klasse einem offenen Start zu.
+        Rückgabe: Klasse des abgeschlossenen Starts oder None.
+        """
+        launch = self.pending.get(app_class)
+        if launch is None:
+            return None
+        return self._complete(launch, now)
+
+    def match_pid(self, pid, now=None):
+        """
+        Ordnet ein Fenster über die PID seines Prozesses zu (direkt oder über
+        die Session). Für Apps, deren Fensterklasse nicht der Klasse in der
+        Leiste entspricht.
+        """
+        if not self.pending or pid is None or pid <= 0:
+            return None
+        try:
+            sid = os.getsid(pid)
+        except OSError:
+            sid = None
+        for launch in self.pending.values():
+            if launch.pid in (pid, sid):
+                return self._complete(launch, now)
+        return None
+
+    def _complete(self, launch, now):
+        del self.pending[launch.app_class]
+        if now is None:
+            now = time.perf_counter()
+        ms = (now - launch.started) * 1000
+        histogram = self.histograms.get(launch.app_class)
+        if histogram is None:
+            histogram = self.histograms[launch.app_class] = LatencyHistogram()
+        histogram.add(ms)
+        self._dirty = True
+        return launch.app_class
+
+    # ─── Abfragen ─────────────────────────────────────────────────────────────
+
+    def percentiles(self, app_class, ps=(0.5, 0.9, 0.99)):
+        """{p: ms} für eine App, leer ohne Messwerte."""
+        histogram = self.histograms.get(app_class)
+        if histogram is None or not histogram.total:
+            return {}
+        return {p: histogram.percentile(p) for p in ps}
+
+    def slowest(self, limit=5, p=0.9):
+        """Apps mit der höchsten Startlatenz (p-Quantil), absteigend."""
+        ranked = [(h.percentile(p), cls) for cls, h in self.histograms.items() if h.total]
+        ranked.sort(reverse=True)
+        return [(cls, ms) for ms, cls in ranked[:limit]]
+
+    def stats(self):
+        return {
+            "launching": len(self.pending),
+            "timeouts": self.timeouts,
+            "apps": {
+                cls: {"n": h.total,
+                      "p50": h.percentile(0.5),
+                      "p90": h.percentile(0.9),
+                      "max": round(h.max_ms, 1)}
+                for cls, h in sorted(self.histograms.items())
+            },
+        }
+
+    # ─── Persistenz ───────────────────────────────────────────────────────────
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if not isinstance(data, dict) or data.get("v") != STATS_VERSION:
+            return self
+        if data.get("bounds") != list(BUCKET_BOUNDS):
+            # Andere Bucket-Aufteilung: alte Werte sind nicht vergleichbar
+            return self
+        for cls, entry in data.get("apps", {}).items():
+            counts = entry.get("counts", [])
+            if len(counts) == len(BUCKET_BOUNDS) + 1:
+                self.histograms[cls] = LatencyHistogram(counts, entry.get("max", 0.0))
+        return self
+
+    def save(self, force=False):
+        """Schreibt die Histogramme atomar, ohne ``force`` nur nach Änderungen."""
+        if not (self._dirty or force):
+            return
+        data = {
+            "v": STATS_VERSION,
+            "bounds": list(BUCKET_BOUNDS),
+            "apps": {cls: {"counts": h.counts, "max": round(h.max_ms, 1)}
+                     for cls, h in self.histograms.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Fehler beim Speichern der Startzeiten: {e}")
+
+
+_tracker = None
+
+
+def get_launch_tracker():
+    """Liefert den prozessweiten LaunchTracker (beim ersten Aufruf geladen)."""
+    global _tracker
+    if _tracker is None:
+        _tracker = LaunchTracker().load()
+    return _tracker
+
+
+if __name__ == "__main__":
+    # Langsamste Apps aus den gespeicherten Startzeiten anzeigen
+    tracker = LaunchTracker().load()
+    for cls, ms in tracker.slowest(limit=20):
+        h = tracker.histograms[cls]
+        print(f"{cls:24s} n={h.total:4d}  p50 {h.percentile(0.5):8.1f} ms  "
+              f"p90 {ms:8.1f} ms  max {h.max_ms:8.1f} ms")
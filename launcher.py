@@ -0,0 +1,150 @@
+"""
+Startet Apps aus der Leiste, ohne den GTK-Prozess zu forken.
+
+``os.posix_spawnp`` läuft unter glibc über ``clone(CLONE_VM | CLONE_VFORK)``:
+die Seitentabellen des (großen) GTK-Prozesses werden nicht kopiert. Jedes
+Kind wird über einen pidfd im GLib-Main-Loop beobachtet; sobald es endet,
+wird es per ``waitpid`` eingesammelt – ohne Polling und ohne Zombies.
+Ohne pidfd (Kernel < 5.3) übernimmt ``GLib.child_watch_add``.
+"""
+import os
+import shlex
+import signal
+import time
+
+# Signale, die Python im eigenen Prozess ignoriert und die ein gestartetes
+# Programm wieder mit Standardverhalten erben soll (wie restore_signals bei Popen)
+_RESET_SIGNALS = tuple(getattr(signal, name) for name in ("SIGPIPE", "SIGXFSZ")
+                       if hasattr(signal, name))
+
+
+def split_command(exec_cmd):
+    """Zerlegt einen Exec-Befehl in argv (Anführungszeichen wie in der Shell)."""
+    try:
+        return shlex.split(exec_cmd)
+    except ValueError:
+        return exec_cmd.split()
+
+
+def spawn_process(argv):
+    """
+    Startet argv per posix_spawnp in einer eigenen Session, stdin auf
+    /dev/null. Liefert die PID; Fehler (z.B. Programm nicht gefunden) als OSError.
+    """
+    return os.posix_spawnp(
+        argv[0], argv, os.environ,
+        file_actions=[(os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0)],
+        setsid=True,
+        setsigmask=(),
+        setsigdef=_RESET_SIGNALS,
+    )
+
+
+class _Child:
+    __slots__ = ("pid", "key", "started", "pidfd", "source_id", "on_exit")
+
+    def __init__(self, pid, key, on_exit):
+        self.pid = pid
+        self.key = key
+        self.started = time.monotonic()
+        self.pidfd = None
+        self.source_id = 0
+        self.on_exit = on_exit
+
+
+class Launcher:
+    def __init__(self):
+        # pid -> _Child
+        self.children = {}
+        self.launched = 0
+        self.reaped = 0
+        self.failed = 0
+        # Dauer von posix_spawnp je Start (ms), zuletzt gemessen
+        self.last_spawn_ms = 0.0
+
+    def spawn(self, exec_cmd, key=None, on_exit=None):
+        """
+        Startet exec_cmd (String oder argv-Liste). ``key`` ordnet das Kind
+        einer App zu (siehe is_running), ``on_exit(pid, exit_code)`` wird nach
+        dem Einsammeln im Main-Loop aufgerufen. Rückgabe: PID oder None.
+        """
+        argv = split_command(exec_cmd) if isinstance(exec_cmd, str) else list(exec_cmd)
+        if not argv:
+            return None
+        key = key or argv[0].lower()
+        t0 = time.perf_counter()
+        try:
+            pid = spawn_process(argv)
+        except OSError as e:
+            self.failed += 1
+            print(f"❌ Fehler beim Start von {key}: {e}")
+            return None
+        self.last_spawn_ms = (time.perf_counter() - t0) * 1000
+        self.launched += 1
+        child = _Child(pid, key, on_exit)
+        self.children[pid] = child
+        self._watch(child)
+        return pid
+
+    def is_running(self, key):
+        """True, wenn ein von hier gestartetes Kind mit diesem key noch läuft."""
+        return any(child.key == key for child in self.children.values())
+
+    def _watch(self, child):
+        from gi.repository import GLib
+        try:
+            child.pidfd = os.pidfd_open(child.pid)
+        except (AttributeError, OSError):
+            # Kein pidfd: GLib sammelt das Kind selbst ein
+            child.source_id = GLib.child_watch_add(
+                GLib.PRIORITY_DEFAULT, child.pid, self._on_child_watch)
+            return
+        # Ein pidfd wird lesbar, sobald der Prozess beendet ist
+        child.source_id = GLib.io_add_watch(
+            child.pidfd, GLib.PRIORITY_DEFAULT, GLib.IO_IN | GLib.IO_HUP,
+            self._on_pidfd, child.pid)
+
+    def _on_pidfd(self, fd, condition, pid):
+        child = self.children.get(pid)
+        try:
+            _pid, status = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            # Schon anderweitig eingesammelt
+            _pid, status = pid, 0
+        if _pid == 0:
+            # Noch nicht beendet (sollte nicht vorkommen): weiter beobachten
+            return True
+        if child is not None:
+            os.close(child.pidfd)
+            child.pidfd = None
+        self._finish(pid, os.waitstatus_to_exitcode(status))
+        return False
+
+    def _on_child_watch(self, pid, status):
+        self._finish(pid, os.waitstatus_to_exitcode(status))
+
+    def _finish(self, pid, exit_code):
+        child = self.children.pop(pid, None)
+        self.reaped += 1
+        if child is not None and child.on_exit is not None:
+            child.on_exit(pid, exit_code)
+
+    def stats(self):
+        return {
+            "launched": self.launched,
+            "running": len(self.children),
+            "reaped": self.reaped,
+            "failed": self.failed,
+            "last_spawn_ms": round(self.last_spawn_ms, 3),
+        }
+
+
+_launcher = None
+
+
+def get_launcher():
+    """Liefert den prozessweiten Launcher."""
+    global _launcher
+    if _launcher is None:
+        _launcher = Launcher()
+    return _launcher
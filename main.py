@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import time
+# Referenzzeitpunkt für die Messung bis zum ersten Frame
+_T0 = time.perf_counter()
 from ctypes import CDLL
 import sys
 try:
@@ -16,27 +19,60 @@ except ValueError as e:
     sys.exit(1)
 from gi.repository import Gtk, Gdk, GLib, Gtk4LayerShell as GtkLayerShell
 # Lokale Modul-Imports
-from config_loader import load_config
+from config_loader import load_config, flush_config, watch_config
 from widgets.taskbar import Taskbar
+from state_engine import StateEngine
+from desktop_index import get_desktop_index
+from launch_tracker import get_launch_tracker
 
 def main():
     # Konfigurationsdatei laden
     config = load_config()
     # GTK Application initialisieren
     app = Gtk.Application(application_id="de.example.karpbar")
-    # Callback zur App-Aktivierung definieren
-    def on_activate(app):
+    # Eine Leiste pro Monitor: Gdk.Monitor -> (Fenster, Taskbar)
+    bars = {}
+    engine = None
+    def create_bar(monitor):
         # Hauptfenster erzeugen (Layer-Shell Panel-Fenster)
         window = Gtk.ApplicationWindow(application=app)
         window.set_title("Karpbar")
         window.set_decorated(False)  # Kein eigenes Fensterdekor, da Panel
         # GtkLayerShell-Einstellungen für Panel: am unteren Bildschirmrand, ganze Breite, oberste Ebene
         GtkLayerShell.init_for_window(window)
+        GtkLayerShell.set_monitor(window, monitor)  # genau auf diesem Ausgang
         GtkLayerShell.set_layer(window, GtkLayerShell.Layer.TOP)  # oberste Layer, über normalen Fenstern
         GtkLayerShell.set_anchor(window, GtkLayerShell.Edge.BOTTOM, True)  # unten verankern
         GtkLayerShell.set_anchor(window, GtkLayerShell.Edge.LEFT, True)    # links verankern (Panel erstreckt sich)
         GtkLayerShell.set_anchor(window, GtkLayerShell.Edge.RIGHT, True)   # rechts verankern (über gesamte Breite)
         GtkLayerShell.auto_exclusive_zone_enable(window)  # Panel reserviert Platz entsprechend seiner Höhe
+        # Taskbar-Widget erstellen; Fensterzustand und Icons teilen sich alle Leisten
+        taskbar = Taskbar(engine, config, monitor)
+        window.set_child(taskbar.widget)
+        # Fenster anzeigen
+        window.present()
+        bars[monitor] = (window, taskbar)
+        return window
+    def remove_bar(monitor):
+        window, taskbar = bars.pop(monitor)
+        taskbar.release()
+        window.destroy()
+    def sync_monitors(monitors, *_args):
+        # Hotplug: Leisten für neue Monitore anlegen, für entfernte schließen
+        current = [monitors.get_item(i) for i in range(monitors.get_n_items())]
+        for monitor in list(bars):
+            if monitor not in current:
+                remove_bar(monitor)
+        for monitor in current:
+            if monitor not in bars:
+                create_bar(monitor)
+    # Callback zur App-Aktivierung definieren
+    def on_activate(app):
+        nonlocal engine
+        if engine is not None:
+            return
+        # Ohne Monitore (z.B. Laptop zugeklappt) nicht beenden
+        app.hold()
         # CSS-Stylesheet laden
         css_provider = Gtk.CssProvider()
         css_path = os.path.join(os.path.dirname(__file__), "styles", "style.css")
@@ -48,19 +84,53 @@ def main():
         display = Gdk.Display.get_default()
         if display is not None:
             Gtk.StyleContext.add_provider_for_display(display, css_provider, Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION)
-        # Taskbar-Widget erstellen und dem Fenster hinzufügen
-        taskbar = Taskbar(config)
-        # Das Taskbar-Hauptwidget in das Fenster einsetzen
-        # Hinweis: Taskbar ist ein eigenes Widget oder Container, den wir hier hinzufügen
-        if isinstance(taskbar.widget, Gtk.Widget):
-            window.set_child(taskbar.widget)
-        else:
-            # Falls Taskbar selbst ein Gtk.Widget ist (z.B. falls als Unterklasse implementiert)
-            window.set_child(taskbar)
-        # Fenster anzeigen
-        window.present()
+        # Eine Compositor-Verbindung und ein Fensterzustand für alle Leisten
+        engine = StateEngine()
+        monitors = display.get_monitors()
+        sync_monitors(monitors)
+        monitors.connect("items-changed", sync_monitors)
+        if os.environ.get("KARPBAR_TIMING"):
+            ms = (time.perf_counter() - _T0) * 1000
+            print(f"Karpbar: present() nach {ms:.1f} ms", file=sys.stderr)
+        # Desktop-Einträge zur Laufzeit aktuell halten
+        get_desktop_index().watch()
+        # Änderungen an config.json ohne Neustart übernehmen
+        watch_config(on_config_changed)
+        if os.environ.get("KARPBAR_TIMING") and bars:
+            window, _taskbar = next(iter(bars.values()))
+            report_first_frame(window)
+    def report_first_frame(window):
+        # Mit KARPBAR_TIMING=1 die Zeit bis zum ersten gemalten Frame ausgeben
+        clock = window.get_frame_clock()
+        if clock is None:
+            return
+        handler_id = None
+        def on_after_paint(clock):
+            clock.disconnect(handler_id)
+            ms = (time.perf_counter() - _T0) * 1000
+            print(f"Karpbar: erster Frame nach {ms:.1f} ms", file=sys.stderr)
+            # Für bench/bench_startup.py: nach dem ersten Frame beenden
+            if os.environ.get("KARPBAR_EXIT_AFTER_FIRST_FRAME"):
+                GLib.idle_add(app.quit)
+        handler_id = clock.connect("after-paint", on_after_paint)
+    def on_config_changed(old, diff):
+        for _window, taskbar in bars.values():
+            taskbar.apply_config(old, diff)
+    def on_shutdown(app):
+        # Der Snapshot beschreibt die erste Leiste (Warmstart)
+        for _window, taskbar in list(bars.values())[:1]:
+            taskbar.save_snapshot()
+        # Gemessene Startzeiten für spätere Auswertung behalten
+        get_launch_tracker().save()
+        # Verzögerte Konfigurations-Änderungen noch schreiben
+        flush_config()
+        # Mit KARPBAR_STATS=1 Event-/Update-Zähler beim Beenden ausgeben
+        if os.environ.get("KARPBAR_STATS"):
+            for _window, taskbar in bars.values():
+                print(f"Karpbar-Statistik: {taskbar.stats()}", file=sys.stderr)
     # on_activate verbinden und App starten
     app.connect("activate", on_activate)
+    app.connect("shutdown", on_shutdown)
     app.run(None)
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+"""
+Warmstart-Snapshot der Taskbar.
+
+Speichert Reihenfolge, laufende Apps und aufgelöste Icon-Pfade, damit der
+erste Frame beim nächsten Start ohne Compositor-Abfrage gemalt werden kann.
+Die Icon-Pfade sind nach Icon-Name und Größe abgelegt und dienen nur als
+Hinweis für den Icon-Cache; die Items behalten ihren Theme-Namen.
+"""
+import json
+import os
+
+SNAPSHOT_VERSION = 2
+
+
+def snapshot_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "karpbar", "snapshot.json")
+
+
+def load_snapshot(path=None):
+    """
+    Lädt den letzten Snapshot.
+    Rückgabe: Dict mit 'order', 'running', 'icon_size', 'icons'
+    (Icon-Name -> Pfad) oder None.
+    """
+    try:
+        with open(path or snapshot_path(), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("v") != SNAPSHOT_VERSION:
+        return None
+    return {
+        "order": list(data.get("order", [])),
+        "running": set(data.get("running", [])),
+        "icon_size": data.get("icon_size"),
+        "icons": dict(data.get("icons", {})),
+    }
+
+
+def save_snapshot(order, running, icon_size, icons, path=None):
+    """
+    Schreibt den Snapshot atomar (temporäre Datei + rename). ``icons`` bildet
+    Icon-Namen auf die in ``icon_size`` aufgelösten Pfade ab.
+    """
+    path = path or snapshot_path()
+    data = {
+        "v": SNAPSHOT_VERSION,
+        "order": list(order),
+        "running": sorted(running),
+        "icon_size": icon_size,
+        "icons": icons,
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Fehler beim Speichern des Snapshots: {e}")
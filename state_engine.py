@@ -0,0 +1,233 @@
+"""
+Gemeinsamer Zustand aller Leisten.
+
+Es gibt genau eine Verbindung zum Event-Socket, einen WindowStore und eine
+Start-Verfolgung (LaunchTracker), egal wie viele Leisten (eine pro Monitor)
+offen sind. Die Leisten melden sich mit add_bar() an und bekommen die vom
+Store gemeldeten Klassen über ihren eigenen UpdateCoalescer – jede Leiste
+aktualisiert sich im Takt ihres eigenen Frame-Clocks. Ebenso gehen die
+geänderten Workspaces an die Workspace-Anzeigen der Leisten.
+"""
+import threading
+import time
+
+from gi.repository import GLib
+
+from hypr_ipc import HyprIPCError, EventReader, connect_event_socket
+from window_manager import get_windows_async, get_compositor_state, get_layout_async
+from window_state import WindowStore, normalize_address
+from launcher import get_launcher
+from launch_tracker import get_launch_tracker, LAUNCH_TIMEOUT
+from snapshot import load_snapshot
+
+# Intervall für periodische Snapshots (Sekunden)
+SNAPSHOT_INTERVAL = 60
+
+
+class StateEngine:
+    def __init__(self):
+        self.bars = []
+
+        # Fensterzustand einmalig laden, danach nur noch per Event aktualisieren.
+        # Mit Snapshot wird sofort daraus gemalt und im Hintergrund abgeglichen.
+        self.store = WindowStore()
+        self.snapshot = load_snapshot()
+        self._pending_events = None
+        if self.snapshot is not None:
+            self._pending_events = []
+        else:
+            self.store.load(*get_compositor_state())
+            # Leisten lesen beim Anlegen den vollständigen Zustand
+            self.store.take_workspace_changes()
+
+        # Hyprland-IPC Socket für Fenster-Events
+        self.event_reader = None
+        try:
+            self.sock = connect_event_socket()
+            self.event_reader = EventReader(
+                self.sock, self._handle_event,
+                events=WindowStore.EVENTS | WindowStore.LAYOUT_EVENTS)
+            GLib.io_add_watch(self.sock, GLib.IO_IN, self._on_ipc_event)
+        except HyprIPCError as e:
+            print(e)
+
+        if self._pending_events is not None:
+            threading.Thread(target=self._fetch_live_windows, daemon=True).start()
+        GLib.timeout_add_seconds(SNAPSHOT_INTERVAL, self._on_snapshot_timer)
+
+        # Starts aus den Leisten: Klasse -> GLib-Source des Zeitlimits
+        self.launches = get_launch_tracker()
+        self._launch_timeouts = {}
+        # Neue Fenster, deren PID noch nachgefragt werden muss, und ob
+        # gerade eine Abfrage läuft
+        self._pid_lookups = set()
+        self._pid_query_running = False
+        self.pid_queries = 0
+
+    @property
+    def live(self):
+        """True, sobald der Store den Compositor-Zustand enthält."""
+        return self._pending_events is None
+
+    def add_bar(self, bar):
+        self.bars.append(bar)
+
+    def remove_bar(self, bar):
+        if bar in self.bars:
+            self.bars.remove(bar)
+
+    def _notify_bars(self, changed):
+        for bar in self.bars:
+            bar.coalescer.push(changed)
+        workspaces = self.store.take_workspace_changes()
+        if workspaces:
+            for bar in self.bars:
+                bar.workspaces_changed(workspaces)
+
+    # ─── Compositor-Zustand ──────────────────────────────────────────────────
+
+    def _fetch_live_windows(self):
+        # Läuft im Hintergrund-Thread; Ergebnis wird im Main-Loop übernommen
+        GLib.idle_add(self._on_live_windows, *get_compositor_state())
+
+    def _on_live_windows(self, windows, workspaces, monitors):
+        """
+        Gleicht den aus dem Snapshot gemalten Zustand mit dem Compositor ab
+        und spielt die in der Zwischenzeit eingetroffenen Events nach.
+        """
+        self.store.load(windows, workspaces, monitors)
+        pending, self._pending_events = self._pending_events, None
+        for event, args in pending:
+            self.store.apply_event(event, args)
+        self.store.take_workspace_changes()
+        for bar in self.bars:
+            bar.resync()
+        return GLib.SOURCE_REMOVE
+
+    def _on_ipc_event(self, source, condition):
+        return self.event_reader.read()
+
+    def _handle_event(self, event, args):
+        if event == "openwindow" and self.launches.pending:
+            self._on_window_opened(args)
+        if self._pending_events is not None:
+            # Live-Zustand wird noch geladen: Events zwischenspeichern
+            self._pending_events.append((event, args))
+            return
+        if event in ("monitoradded", "monitorremoved"):
+            # Workspaces wandern zwischen Monitoren: Zuordnung neu laden
+            get_layout_async(self._on_layout)
+        self._notify_bars(self.store.apply_event(event, args))
+
+    def _on_layout(self, workspaces, monitors):
+        changed = set()
+        if workspaces:
+            changed |= self.store.load_workspaces(workspaces)
+        if monitors:
+            changed |= self.store.load_monitors(monitors)
+        self._notify_bars(changed)
+
+    def _on_snapshot_timer(self):
+        if self.live and self.bars:
+            self.bars[0].save_snapshot(force=False)
+        self.launches.save()
+        return GLib.SOURCE_CONTINUE
+
+    # ─── App-Starts ──────────────────────────────────────────────────────────
+
+    def launch(self, cls, exec_cmd, key):
+        """
+        Startet eine App und markiert ihr Item in allen Leisten als startend,
+        bis das erste Fenster erscheint, der Prozess mit Fehler endet oder das
+        Zeitlimit abläuft.
+        """
+        pid = get_launcher().spawn(
+            exec_cmd, key=key,
+            on_exit=lambda pid, code: self._on_launch_exited(cls, pid, code))
+        if pid is None:
+            return
+        self.launches.start(cls, pid)
+        self._set_launching(cls, True)
+        old = self._launch_timeouts.pop(cls, None)
+        if old is not None:
+            GLib.source_remove(old)
+        self._launch_timeouts[cls] = GLib.timeout_add_seconds(
+            LAUNCH_TIMEOUT, self._on_launch_timeout, cls)
+
+    def _set_launching(self, cls, launching):
+        for bar in self.bars:
+            item = bar.tasks.get(cls)
+            if item is not None:
+                item.launching = launching
+
+    def _on_window_opened(self, args):
+        """
+        Ordnet ein neues Fenster einem offenen Start zu: zuerst über die
+        Klasse; passt keine, wird die PID des Fensters beim Compositor
+        nachgefragt (z.B. Wrapper-Skripte mit anderer Fensterklasse). Dafür
+        läuft höchstens eine Abfrage gleichzeitig; Fenster, die währenddessen
+        erscheinen, teilen sich die nächste.
+        """
+        now = time.perf_counter()
+        parts = args.split(",", 3)
+        if len(parts) < 4:
+            return
+        address, cls = normalize_address(parts[0]), parts[2].lower()
+        matched = self.launches.match_class(cls, now)
+        if matched is not None:
+            self._launch_finished(matched)
+            return
+
+        self._pid_lookups.add((address, now))
+        if not self._pid_query_running:
+            self._query_pids()
+
+    def _query_pids(self):
+        """Fragt die PIDs aller wartenden Fenster mit einem j/clients ab."""
+        self._pid_query_running = True
+        lookups, self._pid_lookups = self._pid_lookups, set()
+        self.pid_queries += 1
+
+        def on_windows(windows):
+            pids = {window.address: window.pid for window in windows}
+            for address, opened in lookups:
+                if not self.launches.pending:
+                    break
+                matched = self.launches.match_pid(pids.get(address), opened)
+                if matched is not None:
+                    self._launch_finished(matched)
+            self._pid_query_running = False
+            # Inzwischen erschienene Fenster, solange noch Starts offen sind
+            if not self.launches.pending:
+                self._pid_lookups.clear()
+            elif self._pid_lookups:
+                self._query_pids()
+        get_windows_async(on_windows)
+
+    def _on_launch_exited(self, cls, pid, exit_code):
+        # Exit-Code 0 kann ein Wrapper sein, der die App weiterlaufen lässt.
+        # Ein älterer Prozess derselben Klasse bricht keinen neueren Start ab.
+        if exit_code != 0 and self.launches.cancel(cls, pid):
+            self._launch_finished(cls)
+
+    def _on_launch_timeout(self, cls):
+        self._launch_timeouts.pop(cls, None)
+        if self.launches.expire(cls):
+            print(f"⚠️ {cls}: kein Fenster nach {LAUNCH_TIMEOUT} s")
+            self._launch_finished(cls)
+        return GLib.SOURCE_REMOVE
+
+    def _launch_finished(self, cls):
+        source = self._launch_timeouts.pop(cls, None)
+        if source is not None:
+            GLib.source_remove(source)
+        self._set_launching(cls, False)
+
+    def stats(self):
+        return {
+            "events_read": self.event_reader.events_read if self.event_reader else 0,
+            "bars": len(self.bars),
+            "launcher": get_launcher().stats(),
+            "launch_to_window_ms": self.launches.stats(),
+            "launch_pid_queries": self.pid_queries,
+        }
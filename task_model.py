@@ -0,0 +1,103 @@
+"""
+Modell der Task-Leiste.
+
+Jede App in der Leiste ist ein TaskItem in einem Gio.ListStore. Die
+Reihenfolge im Store ist die Reihenfolge in der Leiste; die Widgets
+(Gtk.ListView mit recycelten AppButtons oder die TaskStrip) binden sich nur
+an die Items und reagieren auf deren notify-Signale.
+"""
+from gi.repository import Gio, GObject
+
+
+class TaskItem(GObject.Object):
+    __gtype_name__ = "KarpbarTaskItem"
+
+    app_class = GObject.Property(type=str, default="")
+    exec_cmd = GObject.Property(type=str, default="")
+    icon_name = GObject.Property(type=str, default="")
+    pinned = GObject.Property(type=bool, default=False)
+    running = GObject.Property(type=bool, default=False)
+    focused = GObject.Property(type=bool, default=False)
+    # Offene Fenster der Klasse (Zähler-Badge ab 2)
+    window_count = GObject.Property(type=int, default=0)
+    # Im Workspace-Filter sichtbar (gepinnt oder Fenster auf dem aktiven Workspace)
+    shown = GObject.Property(type=bool, default=True)
+    # Aus der Leiste gestartet, erstes Fenster steht noch aus
+    launching = GObject.Property(type=bool, default=False)
+
+
+class TaskModel:
+    """
+    Geordnete App-Liste: Gio.ListStore für die Views plus Index
+    Klasse → TaskItem für die Zugriffe aus der Event-Verarbeitung.
+
+    Der ListStore liegt auf einer GSequence: Einfügen und Entfernen an einer
+    bekannten Position kosten O(log n) und lösen nur ein items-changed für
+    genau diese Position aus – es werden keine Widgets umgehängt. Die
+    Position eines Items sucht ``Gio.ListStore.find`` allerdings linear,
+    ``position``, ``remove`` und ``move`` sind damit O(n) (ein Zeigervergleich
+    pro Item in C, bei einigen Dutzend Apps vernachlässigbar).
+    """
+
+    def __init__(self):
+        self.store = Gio.ListStore(item_type=TaskItem)
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, cls):
+        return cls in self._items
+
+    def __iter__(self):
+        """Items in Leisten-Reihenfolge."""
+        return iter(self.store)
+
+    def get(self, cls):
+        return self._items.get(cls)
+
+    def classes(self):
+        """App-Klassen in Leisten-Reihenfolge."""
+        return [item.app_class for item in self.store]
+
+    def add(self, cls, exec_cmd, icon_name, pinned=False, running=False, focused=False,
+            window_count=0, shown=True):
+        """Hängt eine App hinten an. Rückgabe: das neue TaskItem."""
+        item = TaskItem(app_class=cls, exec_cmd=exec_cmd or "", icon_name=icon_name or cls,
+                        pinned=pinned, running=running, focused=focused,
+                        window_count=window_count, shown=shown)
+        self._items[cls] = item
+        self.store.append(item)
+        return item
+
+    def position(self, cls):
+        """Position einer App in der Leiste oder -1."""
+        item = self._items.get(cls)
+        if item is None:
+            return -1
+        found, position = self.store.find(item)
+        return position if found else -1
+
+    def remove(self, cls):
+        item = self._items.pop(cls, None)
+        if item is None:
+            return None
+        found, position = self.store.find(item)
+        if found:
+            self.store.remove(position)
+        return item
+
+    def move(self, cls, new_idx):
+        """Verschiebt eine App an Position ``new_idx`` (nach dem Entfernen gezählt)."""
+        item = self._items.get(cls)
+        if item is None:
+            return False
+        found, old_idx = self.store.find(item)
+        if not found:
+            return False
+        new_idx = max(0, min(new_idx, len(self._items) - 1))
+        if new_idx == old_idx:
+            return False
+        self.store.remove(old_idx)
+        self.store.insert(new_idx, item)
+        return True
@@ -1,9 +1,26 @@
 #!/usr/bin/env python3
-from config import PINNED_APPS, APP_CONFIG
+from config_loader import get_config_model
 from window_manager import get_windows
 
 
-def generate_taskbar_data():
+def build_class_index(windows):
+    """
+    Ein Durchlauf über alle Fenster (Window-Datensätze).
+    Rückgabe: {klasse (klein): [focused, count]}; laufend heißt count > 0.
+    """
+    index = {}
+    for w in windows:
+        cls = w.app_class
+        entry = index.get(cls)
+        if entry is None:
+            entry = index[cls] = [False, 0]
+        entry[1] += 1
+        if w.focus_history == 0:
+            entry[0] = True
+    return index
+
+
+def generate_taskbar_data(windows=None, model=None):
     """
     Erstellt eine Liste von Tasks für die gepinnten Apps:
     - name: App-Name
@@ -11,29 +28,27 @@ def generate_taskbar_data():
     - exec: Befehl zum Starten
     - running: bool
     - focused: bool
+    - count: Anzahl offener Fenster
+
+    Laufzeit O(gepinnte Apps + Fenster).
     """
-    windows = get_windows()
-    running_classes = {w["class"].lower() for w in windows}
+    if windows is None:
+        windows = get_windows()
+    if model is None:
+        model = get_config_model()
+    index = build_class_index(windows)
 
     tasks = []
-    for name in PINNED_APPS:
-        lower = name.lower()
-        cfg = APP_CONFIG.get(lower, {})
-        icon = cfg.get("icon", "")
-        exec_cmd = cfg.get("exec", lower)
-
-        is_running = lower in running_classes
-        focused = any(
-            w for w in windows
-            if w["class"].lower() == lower and w["focused"]
-        )
-
+    for app in model.pinned:
+        ovr = model.override_for(app.app_class)
+        focused, count = index.get(app.app_class, (False, 0))
         tasks.append({
-            "name": name,
-            "icon": icon,
-            "exec": exec_cmd,
-            "running": is_running,
-            "focused": focused
+            "name": app.name,
+            "icon": (ovr.icon if ovr else None) or "",
+            "exec": (ovr.exec if ovr else None) or app.app_class,
+            "running": count > 0,
+            "focused": focused,
+            "count": count,
         })
 
     return tasks
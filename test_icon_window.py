@@ -1,6 +1,4 @@
 #!/usr/bin/env python3
-import os
-import subprocess
 from ctypes import CDLL
 import gi
 
@@ -15,10 +13,12 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Gdk', '4.0')
 gi.require_version('Gio', '2.0')
 gi.require_version('Gtk4LayerShell', '1.0')
-from gi.repository import Gtk, Gdk, Gio, GLib, Gtk4LayerShell as LayerShell
+from gi.repository import Gtk, Gdk, GLib, Gtk4LayerShell as LayerShell
 
 from config import PINNED_APPS, APP_CONFIG
 from window_manager import get_windows
+from icon_cache import get_icon_cache
+from launcher import get_launcher
 
 # ─── Konfigurierbare Größen ────────────────────────────────────────────────────
 ICON_SIZE               = 20    # Breite/Höhe des Icons oder Fallback-Labels
@@ -30,26 +30,41 @@ INDICATOR_HEIGHT        = 3     # Höhe des Indikators
 INDICATOR_WIDTH         = 14    # Breite des Indikators
 # ────────────────────────────────────────────────────────────────────────────────
 
-display    = Gdk.Display.get_default()
-icon_theme = Gtk.IconTheme.get_for_display(display)
-running_procs: dict[str, subprocess.Popen] = {}
+icon_cache = get_icon_cache()
+launcher = get_launcher()
 
 
 def on_app_button_clicked(button, exec_cmd: str):
     key = exec_cmd.split()[0].lower()
-    proc = running_procs.get(key)
-    if proc and proc.poll() is None:
+    if launcher.is_running(key):
         return
-    try:
-        running_procs[key] = subprocess.Popen(exec_cmd.split())
-    except Exception as e:
-        print(f"❌ Fehler beim Start von {key}: {e}")
+    launcher.spawn(exec_cmd, key=key)
 
 
 def on_shutdown_clicked(button):
     Gtk.Application.get_default().quit()
 
 
+def _load_icon_async(vbox: Gtk.Box, placeholder: Gtk.Widget, keys: list[str]):
+    """Probiert die Icon-Kandidaten der Reihe nach und ersetzt den Platzhalter."""
+    if not keys:
+        return
+
+    def on_ready(paintable):
+        if paintable is None:
+            _load_icon_async(vbox, placeholder, keys[1:])
+            return
+        image = Gtk.Image.new_from_paintable(paintable)
+        image.set_pixel_size(ICON_SIZE)
+        image.set_size_request(ICON_SIZE, ICON_SIZE)
+        image.set_halign(Gtk.Align.CENTER)
+        image.set_valign(Gtk.Align.CENTER)
+        vbox.remove(placeholder)
+        vbox.prepend(image)
+
+    icon_cache.lookup_async(keys[0], ICON_SIZE, 1, on_ready)
+
+
 def create_app_button(app_name: str, is_running: bool = False) -> Gtk.Widget:
     """Variant 1: kein Spacer, Abstand via spacing und margin_top."""
     name     = app_name.lower()
@@ -71,25 +86,13 @@ def create_app_button(app_name: str, is_running: bool = False) -> Gtk.Widget:
     vbox.set_hexpand(False)
     vbox.set_vexpand(False)
 
-    # Icon oder Fallback-Label
-    icon_path = cfg.get("icon", "")
-    if icon_path and os.path.isfile(icon_path):
-        icon_widget = Gtk.Image.new_from_file(icon_path)
-        icon_widget.set_pixel_size(ICON_SIZE)
-    else:
-        icon_widget = None
-        for key in (name, exec_cmd.split()[0].lower()):
-            if icon_theme.has_icon(key):
-                icon_widget = Gtk.Image.new_from_gicon(Gio.ThemedIcon.new(key))
-                icon_widget.set_pixel_size(ICON_SIZE)
-                break
-        if icon_widget is None:
-            icon_widget = Gtk.Label(label=name[:2].upper())
-
+    # Fallback-Label sofort, Icon wird asynchron nachgeladen
+    icon_widget = Gtk.Label(label=name[:2].upper())
     icon_widget.set_size_request(ICON_SIZE, ICON_SIZE)
     icon_widget.set_halign(Gtk.Align.CENTER)
     icon_widget.set_valign(Gtk.Align.CENTER)
     vbox.append(icon_widget)
+    _load_icon_async(vbox, icon_widget, [cfg.get("icon", ""), name, exec_cmd.split()[0].lower()])
 
     # Indikator direkt nach Icon mit margin_top
     indicator = Gtk.Box()
@@ -108,7 +111,7 @@ def create_app_button(app_name: str, is_running: bool = False) -> Gtk.Widget:
 
 def build_taskbar_box() -> Gtk.Box:
     hbox    = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-    running = {w['class'].lower() for w in get_windows()}
+    running = {w.app_class for w in get_windows()}
 
     for name in PINNED_APPS:
         btn = create_app_button(name, name.lower() in running)
@@ -117,7 +120,7 @@ def build_taskbar_box() -> Gtk.Box:
     pinned = {n.lower() for n in PINNED_APPS}
     seen   = set()
     for w in get_windows():
-        cls = w.get('class', '').lower()
+        cls = w.app_class
         if cls and cls not in pinned and cls not in seen:
             seen.add(cls)
             hbox.append(create_app_button(cls, True))
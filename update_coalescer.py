@@ -0,0 +1,54 @@
+from gi.repository import GLib
+
+
+class UpdateCoalescer:
+    """
+    Sammelt Zustandsänderungen (betroffene App-Klassen) aus dem Event-Stream
+    und reicht sie höchstens einmal pro GTK-Frame gebündelt weiter.
+
+    Ist das Widget gemappt, wird über den Frame-Clock (Tick-Callback)
+    ausgelöst, sonst über einen Idle-Callback.
+    """
+
+    def __init__(self, apply_cb, widget=None):
+        self._apply = apply_cb
+        self._widget = widget
+        self._dirty = set()
+        self._scheduled = False
+        # Zähler für Diagnose
+        self.events_received = 0
+        self.flushes = 0
+
+    def push(self, changed):
+        """Nimmt die vom Store gemeldeten Klassen eines Events entgegen."""
+        self.events_received += 1
+        if not changed:
+            return
+        self._dirty |= changed
+        if not self._scheduled:
+            self._schedule()
+
+    def _schedule(self):
+        self._scheduled = True
+        widget = self._widget
+        if widget is not None and widget.get_mapped():
+            widget.add_tick_callback(self._on_tick)
+        else:
+            GLib.idle_add(self._on_idle)
+
+    def _on_tick(self, widget, frame_clock):
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def _on_idle(self):
+        self.flush()
+        return GLib.SOURCE_REMOVE
+
+    def flush(self):
+        """Wendet alle gesammelten Änderungen sofort an."""
+        self._scheduled = False
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        self.flushes += 1
+        self._apply(dirty)
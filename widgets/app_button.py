@@ -1,58 +1,219 @@
 import gi
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk, Gdk, GdkPixbuf, GObject
+from gi.repository import Gtk, Gdk, Gio, GObject
 
-import subprocess
 import os
+import time
+from collections import deque
+
+from window_manager import (focus_window_async, close_window_async, dispatch_batch_async,
+                            focus_window_by_class_async, close_window_by_class_async)
+from icon_cache import get_icon_cache
+from launcher import get_launcher, split_command
+
+# Zeit (ms) vom Klick bis zur Antwort des Compositors auf den Dispatch,
+# für die letzten Klicks (siehe Taskbar.stats)
+CLICK_LATENCY_SAMPLES = 256
+click_latencies = deque(maxlen=CLICK_LATENCY_SAMPLES)
+
+
+class AppActions:
+    """
+    Gemeinsame Aktionen für alles, was eine App in der Leiste darstellt
+    (AppButton, Einträge der TaskStrip). Die Daten kommen aus dem
+    gebundenen TaskItem (``item``), dazu wird ``taskbar`` erwartet.
+    """
+    item = None
+    # Gio.Cancellable des laufenden Compositor-Requests eines Klicks
+    _pending_request = None
+    # Fensteradressen (MRU-Stand zu Beginn) beim Durchschalten per Klick
+    _cycle = None
+
+    @property
+    def app_class(self):
+        return self.item.app_class
+
+    @property
+    def exec_cmd(self):
+        return self.item.exec_cmd
+
+    @property
+    def icon_name(self):
+        return self.item.icon_name
+
+    @property
+    def pinned(self):
+        return self.item.pinned
+
+    @pinned.setter
+    def pinned(self, value):
+        self.item.pinned = value
+
+    @property
+    def is_running(self):
+        return self.item.running
+
+    @property
+    def is_focused(self):
+        return self.item.focused
 
-from window_manager import get_windows, focus_window_by_class, close_window_by_class
-from config_loader import config_data, save_config
+    def on_left_click(self, button):
+        """
+        Fokussiert das zuletzt benutzte Fenster der App oder startet sie. Hat
+        die App schon den Fokus, schalten weitere Klicks in MRU-Reihenfolge
+        durch ihre Fenster. Alle Compositor-Anfragen laufen asynchron; der
+        Main-Loop wartet nie.
+        """
+        started = time.perf_counter()
+        argv = split_command(self.exec_cmd)
+        key = (argv[0] if argv else self.app_class).lower()
+        # Ein neuer Klick ersetzt einen noch laufenden
+        self.cancel_pending_request()
+        cancellable = Gio.Cancellable()
+
+        def on_dispatched(ok):
+            # Abgebrochen oder von einem neueren Klick ersetzt: dessen Handle
+            # bleibt stehen, hier wird weder gemessen noch gestartet
+            if cancellable is not self._pending_request:
+                return
+            self._pending_request = None
+            # Zeitüberschreitung bricht über dasselbe Cancellable ab
+            if cancellable.is_cancelled():
+                return
+            click_latencies.append((time.perf_counter() - started) * 1000)
+            if not ok and windows is None:
+                self._launch(key)
+
+        windows = self._windows()
+        if windows is None:
+            # Kein Fensterzustand: Fenster beim Compositor suchen
+            self._pending_request = cancellable
+            focus_window_by_class_async(key, on_dispatched, cancellable)
+        elif windows:
+            self._pending_request = cancellable
+            focus_window_async(self._next_window(windows), on_dispatched, cancellable)
+        else:
+            self._launch(key)
 
-running_procs: dict[str, subprocess.Popen] = {}
+    def _next_window(self, windows):
+        """
+        Adresse des Fensters, das ein Klick fokussieren soll. ``windows`` ist
+        MRU-sortiert. Während des Durchschaltens bleibt die Reihenfolge vom
+        Beginn des Durchlaufs fest, sonst würde der Fokuswechsel selbst sie
+        umsortieren und nur zwischen zwei Fenstern hin- und herspringen.
+        """
+        addresses = [w.address for w in windows]
+        focused = self.taskbar.store.focused_address
+        if len(addresses) < 2 or focused not in addresses:
+            self._cycle = None
+            return addresses[0]
+        cycle = self._cycle
+        if cycle is None or focused not in cycle or set(cycle) != set(addresses):
+            cycle = self._cycle = addresses
+        return cycle[(cycle.index(focused) + 1) % len(cycle)]
+
+    def _launch(self, key):
+        # Start läuft schon: wiederholte Klicks starten keine Duplikate
+        if self.item.launching:
+            return
+        if self.taskbar is not None:
+            self.taskbar.launch(self.app_class, self.exec_cmd, key)
+        else:
+            get_launcher().spawn(self.exec_cmd, key=key)
 
+    def cancel_pending_request(self):
+        """Bricht einen noch laufenden Compositor-Request dieses Eintrags ab."""
+        if self._pending_request is not None:
+            self._pending_request.cancel()
+            self._pending_request = None
+
+    def _windows(self):
+        """
+        Fenster dieser App-Klasse aus dem Fensterzustand der Taskbar.
+        None, wenn kein Store verfügbar ist.
+        """
+        if getattr(self.taskbar, "store", None) is None:
+            return None
+        # Bei monitor_only nur die Fenster auf dem Monitor dieser Leiste
+        return self.taskbar.windows_for_class(self.app_class)
+
+    def on_open_new_instance(self, button):
+        """Startet unabhängig vom Fokus eine weitere Instanz der App."""
+        get_launcher().spawn(self.exec_cmd, key=self.app_class)
+
+    def detach_menu(self):
+        """Gibt das gemeinsame Kontextmenü frei, wenn der Button entfernt wird."""
+        from widgets.context_menu import detach_context_menu
+        detach_context_menu(self)
+
+    def on_menu_pin_toggled(self, button):
+        """
+        Toggle Pin/Unpin mit 10er-Limit und sofortigem Speichern.
+        """
+        # Zur Laufzeit holen: load_config bindet config_data neu
+        from config_loader import config_data, save_config, pinned_class
+        if not self.pinned:
+            pinned_list = config_data.get("pinned_apps", [])
+            if len(pinned_list) >= 10:
+                print("⚠️ Maximal 10 Apps können angepinnt werden.")
+                return
+            self.pinned = True
+            new_entry = {"class": self.app_class, "exec": self.exec_cmd, "icon": None}
+            config_data.setdefault("pinned_apps", []).append(new_entry)
+            save_config()
+        else:
+            self.pinned = False
+            config_data["pinned_apps"] = [
+                app for app in config_data.get("pinned_apps", [])
+                if pinned_class(app) != self.app_class
+            ]
+            save_config()
+            if not self.is_running and self.taskbar:
+                self.taskbar.remove_app(self.app_class)
 
-class AppButton(Gtk.Button):
-    def __init__(self, app_class, icon_path=None, exec_cmd=None, pinned=False, config=None, taskbar=None):
+    def on_menu_close(self, button):
+        """Schließt das zuletzt benutzte Fenster der App."""
+        windows = self._windows()
+        if windows is None:
+            close_window_by_class_async(self.app_class)
+        elif windows:
+            close_window_async(windows[0].address)
+
+    def on_menu_close_all(self, button):
+        """Schließt alle Fenster der App in einem Round-Trip."""
+        windows = self._windows()
+        if windows:
+            dispatch_batch_async([f"closewindow address:{w.address}" for w in windows])
+
+    def on_menu_focus_window(self, address):
+        """Fokussiert ein bestimmtes Fenster aus der Fensterliste im Menü."""
+        self._cycle = None
+        focus_window_async(address)
+
+
+class AppButton(AppActions, Gtk.Button):
+    """
+    Button für eine App. Wird einmal aufgebaut und von der Gtk.ListView
+    der Taskbar per bind()/unbind() an wechselnde TaskItems gehängt.
+    """
+
+    def __init__(self, config=None, taskbar=None):
         super().__init__()
-        self.app_class = app_class
-        self.exec_cmd = exec_cmd or app_class
-        self.pinned = pinned
-        self.is_running = False
-        self.is_focused = False
         self.config = config or {}
         self.taskbar = taskbar
-
-        self.icon_size = self.config.get("icon_size", 32)
-        indicator_width = self.config.get("indicator_width", 8)
-        indicator_height = self.config.get("indicator_height", 3)
+        self._notify_handler = None
 
         self.add_css_class("app-button")
 
-        # Icon laden oder Fallback erzeugen
-        if icon_path:
-            try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    filename=icon_path,
-                    width=self.icon_size,
-                    height=self.icon_size,
-                    preserve_aspect_ratio=True
-                )
-                image = Gtk.Image.new_from_pixbuf(pixbuf)
-                image.set_pixel_size(self.icon_size)
-                icon_widget = self._wrap_icon_widget(image)
-            except Exception as e:
-                print(f"Warnung: Konnte Icon nicht laden: {e}")
-                icon_widget = self._build_fallback_icon()
-        else:
-            icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
-            if icon_theme and icon_theme.has_icon(self.app_class):
-                image = Gtk.Image.new_from_icon_name(self.app_class)
-                image.set_pixel_size(self.icon_size)
-                icon_widget = self._wrap_icon_widget(image)
-            else:
-                icon_widget = self._build_fallback_icon()
+        # Icon-Container: zeigt das Fallback-Label, bis das Icon geladen ist
+        self.icon_texture = None
+        self._icon_request = None
+        self.icon_image = Gtk.Image()
+        self.icon_image.set_valign(Gtk.Align.CENTER)
+        self.icon_image.set_halign(Gtk.Align.CENTER)
+        icon_widget = self._build_fallback_icon()
+        self.icon_widget = icon_widget
 
-        self.set_size_request(self.icon_size, self.icon_size)
         self.set_valign(Gtk.Align.FILL)
         self.set_halign(Gtk.Align.CENTER)
 
@@ -61,20 +222,28 @@ class AppButton(Gtk.Button):
         self.indicator.set_visible(False)
         self.indicator.set_halign(Gtk.Align.CENTER)
         self.indicator.set_valign(Gtk.Align.END)
-        self.indicator.set_size_request(indicator_width, indicator_height)
 
-        vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        vbox.set_halign(Gtk.Align.CENTER)
-        vbox.set_valign(Gtk.Align.END)
-        extra_padding = 2
-        total_height = self.icon_size + indicator_height + extra_padding
-        vbox.set_size_request(self.icon_size + 4, total_height)
-        vbox.append(icon_widget)
-        vbox.append(self.indicator)
-        self.set_child(vbox)
+        # Zähler-Badge oben rechts über dem Icon, ab zwei Fenstern sichtbar
+        self.count_badge = Gtk.Label()
+        self.count_badge.add_css_class("window-count")
+        self.count_badge.set_halign(Gtk.Align.END)
+        self.count_badge.set_valign(Gtk.Align.START)
+        self.count_badge.set_can_target(False)
+        self.count_badge.set_visible(False)
+        icon_overlay = Gtk.Overlay()
+        icon_overlay.set_child(icon_widget)
+        icon_overlay.add_overlay(self.count_badge)
+
+        self.vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        self.vbox.set_halign(Gtk.Align.CENTER)
+        self.vbox.set_valign(Gtk.Align.END)
+        self.vbox.append(icon_overlay)
+        self.vbox.append(self.indicator)
+        self.set_child(self.vbox)
+        self.set_sizes(self.config)
 
         # Klick-Handler
-        self.connect("clicked", self.on_left_click)
+        self._clicked_handler = self.connect("clicked", self.on_left_click)
 
         # Rechtsklick-Geste
         self.right_click = Gtk.GestureClick()
@@ -83,160 +252,168 @@ class AppButton(Gtk.Button):
         self.add_controller(self.right_click)
 
         # Drag & Drop
-        drag_source = Gtk.DragSource()
-        drag_source.set_actions(Gdk.DragAction.MOVE)
-        drag_source.connect("prepare", self.on_drag_prepare)
-        drag_source.connect("drag-begin", self.on_drag_begin)
-        self.add_controller(drag_source)
+        self.drag_source = Gtk.DragSource()
+        self.drag_source.set_actions(Gdk.DragAction.MOVE)
+        self.drag_source.connect("prepare", self.on_drag_prepare)
+        self.drag_source.connect("drag-begin", self.on_drag_begin)
+        self.add_controller(self.drag_source)
+
+        # Drop auf einen Button = Einfügen davor bzw. dahinter
+        self.drop_target = Gtk.DropTarget.new(GObject.TYPE_STRING, Gdk.DragAction.MOVE)
+        self.drop_target.connect("drop", self.on_drop)
+        self.add_controller(self.drop_target)
+
+    def set_sizes(self, config):
+        """
+        Übernimmt icon_size / indicator_width / indicator_height aus der
+        Konfiguration, ohne den Button neu aufzubauen.
+        """
+        self.icon_size = config.get("icon_size", 32)
+        indicator_width = config.get("indicator_width", 8)
+        indicator_height = config.get("indicator_height", 3)
+        extra_padding = 2
 
-        self.icon_widget = icon_widget
-        self._build_context_menu()
+        self.icon_image.set_pixel_size(self.icon_size)
+        self.icon_widget.set_size_request(self.icon_size, self.icon_size)
+        self.set_size_request(self.icon_size, self.icon_size)
+        self.indicator.set_size_request(indicator_width, indicator_height)
+        total_height = self.icon_size + indicator_height + extra_padding
+        self.vbox.set_size_request(self.icon_size + 4, total_height)
+        # Icon in der neuen Größe nachladen
+        if self.item is not None:
+            self._request_icon(self.item.icon_name)
 
-    def _wrap_icon_widget(self, widget):
-        box = Gtk.Box()
-        box.set_size_request(self.icon_size, self.icon_size)
-        box.set_valign(Gtk.Align.CENTER)
-        box.set_halign(Gtk.Align.CENTER)
-        widget.set_valign(Gtk.Align.CENTER)
-        widget.set_halign(Gtk.Align.CENTER)
-        if isinstance(widget, Gtk.Image):
-            widget.set_pixel_size(self.icon_size)
-        box.append(widget)
-        return box
+    def bind(self, item):
+        """
+        Belegt den Button mit einem TaskItem.
+        Die Widget-Struktur bleibt erhalten, nur der Inhalt wird getauscht.
+        """
+        self.item = item
+        self._notify_handler = item.connect("notify", self._on_item_notify)
+        self._set_running(item.running)
+        self._set_focused(item.focused)
+        self._set_launching(item.launching)
+        self._set_window_count(item.window_count)
+
+        self.icon_texture = None
+        self.fallback_label.set_label(item.app_class[:2])
+        self._show_icon_child(self.fallback_label)
+        self._request_icon(item.icon_name)
+
+    def unbind(self):
+        """
+        Löst den Button vom TaskItem, bevor die ListView ihn recycelt:
+        Kontextmenü lösen und ausstehende Icon-Anfragen verwerfen.
+        """
+        if self.item is None:
+            return
+        self.detach_menu()
+        self.cancel_pending_request()
+        self._icon_request = None
+        self._cycle = None
+        self.item.disconnect(self._notify_handler)
+        self._notify_handler = None
+        self.item = None
+
+    def teardown(self):
+        """
+        Endgültiges Aufräumen: Controller und Signal-Handler entfernen, damit
+        keine Referenzzyklen zwischen Widget und Python-Objekt bleiben.
+        """
+        self.unbind()
+        self.disconnect(self._clicked_handler)
+        self.right_click.disconnect_by_func(self.on_right_click)
+        self.drag_source.disconnect_by_func(self.on_drag_prepare)
+        self.drag_source.disconnect_by_func(self.on_drag_begin)
+        self.drop_target.disconnect_by_func(self.on_drop)
+        self.remove_controller(self.right_click)
+        self.remove_controller(self.drag_source)
+        self.remove_controller(self.drop_target)
+        self.right_click = None
+        self.drag_source = None
+        self.drop_target = None
+        self.taskbar = None
+
+    def _on_item_notify(self, item, pspec):
+        if pspec.name == "running":
+            self._set_running(item.running)
+        elif pspec.name == "focused":
+            self._set_focused(item.focused)
+        elif pspec.name == "launching":
+            self._set_launching(item.launching)
+        elif pspec.name == "window_count":
+            self._set_window_count(item.window_count)
+        elif pspec.name == "icon_name":
+            # Override geändert: Fallback zeigen, neues Icon anfordern
+            self.icon_texture = None
+            self._show_icon_child(self.fallback_label)
+            self._request_icon(item.icon_name)
+
+    def _request_icon(self, name):
+        """Fordert das Icon beim Cache an; bei einem Treffer sofort."""
+        request = (name, self.icon_size)
+        self._icon_request = request
+        get_icon_cache().lookup_async(
+            name, self.icon_size, self.get_scale_factor(),
+            lambda paintable: self._on_icon_ready(request, paintable))
+
+    def _on_icon_ready(self, request, paintable):
+        # Veraltete Antworten (Button inzwischen umkonfiguriert) ignorieren
+        if request != self._icon_request or paintable is None:
+            return
+        self.icon_texture = paintable
+        self.icon_image.set_from_paintable(paintable)
+        self._show_icon_child(self.icon_image)
+
+    def _show_icon_child(self, widget):
+        child = self.icon_widget.get_first_child()
+        if child is widget:
+            return
+        if child is not None:
+            self.icon_widget.remove(child)
+        self.icon_widget.append(widget)
 
     def _build_fallback_icon(self):
-        label_text = self.app_class[:2]
-        label = Gtk.Label(label=label_text)
+        label = Gtk.Label()
         label.set_halign(Gtk.Align.CENTER)
         label.set_valign(Gtk.Align.CENTER)
         label.set_xalign(0.5)
         label.set_yalign(0.5)
         label.set_justify(Gtk.Justification.CENTER)
         label.add_css_class("fallback-label")
+        self.fallback_label = label
 
         box = Gtk.Box()
-        box.set_size_request(self.icon_size, self.icon_size)
         box.set_valign(Gtk.Align.CENTER)
         box.set_halign(Gtk.Align.CENTER)
-        box.append(label)
         return box
 
-    def _build_context_menu(self):
-        self.popover = Gtk.Popover.new()
-        menu_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-
-        # „App öffnen“-Eintrag
-        self.open_menu_item = Gtk.Button(label="App öffnen")
-        self.open_menu_item.connect("clicked", self.on_left_click)
-
-        # „Neue Instanz öffnen“-Eintrag (initial versteckt)
-        self.new_instance_item = Gtk.Button(label="Neue Instanz öffnen")
-        self.new_instance_item.connect("clicked", self.on_open_new_instance)
-        self.new_instance_item.set_visible(False)
-
-        # Pinnen/Entpinnen
-        pin_label = "Entpinnen" if self.pinned else "Pinnen"
-        self.pin_menu_item = Gtk.Button(label=pin_label)
-        self.pin_menu_item.connect("clicked", self.on_menu_pin_toggled)
-
-        # „App schließen“-Eintrag
-        self.close_menu_item = Gtk.Button(label="App schließen")
-        self.close_menu_item.connect("clicked", self.on_menu_close)
-
-        # Menü zusammenstellen
-        menu_box.append(self.open_menu_item)
-        menu_box.append(self.new_instance_item)
-        menu_box.append(self.pin_menu_item)
-        menu_box.append(self.close_menu_item)
-
-        self.popover.set_child(menu_box)
-        self.popover.set_parent(self)
-        self.popover.set_autohide(True)
-
-        # Anfangszustand: je nach Laufstatus sichtbar/unsichtbar
-        self.open_menu_item.set_visible(False)
-        self.close_menu_item.set_visible(False)
-        # new_instance_item bleibt initial False
-
-    def on_left_click(self, button):
-        exec_cmd = self.exec_cmd
-        key = exec_cmd.split()[0].lower()
-
-        windows = get_windows()
-        if any(w.get("class", "").lower() == key for w in windows):
-            focus_window_by_class(key)
-            return
-
-        try:
-            new_proc = subprocess.Popen(self.exec_cmd.split())
-            running_procs[key] = new_proc
-        except Exception as e:
-            print(f"❌ Fehler beim Start von {key}: {e}")
-
-    def on_open_new_instance(self, button):
-        """Startet unabhängig vom Fokus eine weitere Instanz der App."""
-        try:
-            subprocess.Popen(self.exec_cmd.split())
-        except Exception as e:
-            print(f"❌ Fehler beim Start einer neuen Instanz von {self.app_class}: {e}")
-
     def on_right_click(self, gesture, n_press, x, y):
-        if self.popover:
-            self.popover.popup()
+        # Gemeinsames Kontextmenü, erst beim ersten Rechtsklick geladen
+        from widgets.context_menu import get_context_menu
+        get_context_menu().popup_for(self)
 
-    def on_menu_pin_toggled(self, button):
-        """
-        Toggle Pin/Unpin mit 10er-Limit und sofortigem Speichern.
-        """
-        if not self.pinned:
-            pinned_list = config_data.get("pinned_apps", [])
-            if len(pinned_list) >= 10:
-                print("⚠️ Maximal 10 Apps können angepinnt werden.")
-                return
-            self.pinned = True
-            self.pin_menu_item.set_label("Entpinnen")
-            new_entry = {"class": self.app_class, "exec": self.exec_cmd, "icon": None}
-            config_data.setdefault("pinned_apps", []).append(new_entry)
-            save_config()
-        else:
-            self.pinned = False
-            self.pin_menu_item.set_label("Pinnen")
-            config_data["pinned_apps"] = [
-                app for app in config_data.get("pinned_apps", [])
-                if app.get("class") != self.app_class
-            ]
-            save_config()
-            if not self.is_running and self.taskbar:
-                self.taskbar.remove_app(self.app_class)
-
-    def on_menu_close(self, button):
-        close_window_by_class(self.app_class)
-        if self.popover:
-            self.popover.popdown()
-
-    def set_running(self, running: bool):
-        """
-        Wird von außen aufgerufen, wenn sich der Laufstatus ändert.
-        Zeigt oder verbirgt Menüeinträge entsprechend.
-        """
-        self.is_running = running
+    def _set_running(self, running: bool):
         self.indicator.set_visible(running)
 
-        # Wenn nicht läuft: „App öffnen“ zeigen
-        self.open_menu_item.set_visible(not running)
-        # Wenn läuft: „App schließen“ und „Neue Instanz öffnen“ zeigen
-        self.close_menu_item.set_visible(running)
-        self.close_menu_item.set_sensitive(running)
-        self.new_instance_item.set_visible(running)
-
-    def set_focused(self, focused: bool):
-        self.is_focused = focused
+    def _set_focused(self, focused: bool):
         css = self.get_style_context()
         if focused:
             css.add_class("focused")
         else:
             css.remove_class("focused")
 
+    def _set_window_count(self, count: int):
+        self.count_badge.set_visible(count > 1)
+        if count > 1:
+            self.count_badge.set_label(str(count) if count < 10 else "9+")
+
+    def _set_launching(self, launching: bool):
+        if launching:
+            self.add_css_class("launching")
+        else:
+            self.remove_css_class("launching")
+
     def on_drag_prepare(self, drag_source, x, y):
         val = GObject.Value()
         val.init(GObject.TYPE_STRING)
@@ -246,9 +423,8 @@ class AppButton(Gtk.Button):
 
     def on_drag_begin(self, drag_source, drag):
         drag_icon = Gtk.DragIcon.get_for_drag(drag)
-        first = self.icon_widget.get_first_child()
-        if isinstance(first, Gtk.Image):
-            image_copy = Gtk.Image.new_from_icon_name(self.app_class)
+        if self.icon_texture is not None:
+            image_copy = Gtk.Image.new_from_paintable(self.icon_texture)
             image_copy.set_pixel_size(self.icon_size)
             drag_icon.set_child(image_copy)
         else:
@@ -258,3 +434,12 @@ class AppButton(Gtk.Button):
             label_copy.set_valign(Gtk.Align.CENTER)
             label_copy.add_css_class("fallback-label")
             drag_icon.set_child(label_copy)
+
+    def on_drop(self, drop_target, value, x, y):
+        class_name = (value.get_string()
+                      if isinstance(value, GObject.Value)
+                      else str(value))
+        if self.taskbar is None or self.item is None:
+            return False
+        after = x >= self.get_width() / 2
+        return self.taskbar.drop_next_to(class_name, self.app_class, after)
@@ -0,0 +1,144 @@
+# widgets/context_menu.py
+
+from gi.repository import Gtk, Gio, GLib
+
+# Präfix der Aktionen im Menümodell, z.B. "karpbar.close"
+ACTION_GROUP = "karpbar"
+
+# Maximale Länge eines Fenstertitels in der Fensterliste
+TITLE_MAX = 48
+
+
+class AppContextMenu:
+    """
+    Ein einziges Kontextmenü für alle App-Buttons.
+
+    Das Gtk.PopoverMenu wird beim ersten Rechtsklick erzeugt und danach an
+    den jeweils angeklickten Button umgehängt. Die Einträge sind
+    Gio.SimpleActions mit der App-Klasse als Parameter; die Einträge der
+    Fensterliste bekommen zusätzlich die Fensteradresse.
+    """
+
+    def __init__(self):
+        self.popover = Gtk.PopoverMenu.new_from_model(None)
+        self._target = None
+
+        group = Gio.SimpleActionGroup()
+        for name, handler in (
+            ("open", lambda btn: btn.on_left_click(None)),
+            ("new-instance", lambda btn: btn.on_open_new_instance(None)),
+            ("toggle-pin", lambda btn: btn.on_menu_pin_toggled(None)),
+            ("close", lambda btn: btn.on_menu_close(None)),
+            ("close-all", lambda btn: btn.on_menu_close_all(None)),
+        ):
+            action = Gio.SimpleAction.new(name, GLib.VariantType.new("s"))
+            action.connect("activate", self._on_action, handler)
+            group.add_action(action)
+        action = Gio.SimpleAction.new("focus-window", GLib.VariantType.new("(ss)"))
+        action.connect("activate", self._on_window_action)
+        group.add_action(action)
+        self.popover.insert_action_group(ACTION_GROUP, group)
+
+    def popup_for(self, button, widget=None, rect=None):
+        """
+        Zeigt das Menü passend zum Zustand von ``button`` an. Ist ``button``
+        selbst kein Widget (Eintrag der TaskStrip), wird das Menü an
+        ``widget`` gehängt und zeigt auf ``rect``.
+        """
+        self._target = button
+        self.popover.set_menu_model(self._build_model(button))
+        widget = widget or button
+        parent = self.popover.get_parent()
+        if parent is not widget:
+            if parent is not None:
+                self.popover.unparent()
+            self.popover.set_parent(widget)
+        self.popover.set_pointing_to(rect)
+        self.popover.popup()
+
+    def detach(self, button):
+        """Löst das Menü von einem Eintrag, der entfernt oder recycelt wird."""
+        parent = self.popover.get_parent()
+        if self._target is not button and parent is not button:
+            return
+        self._target = None
+        if parent is not None:
+            self.popover.popdown()
+            self.popover.unparent()
+
+    def _build_model(self, button):
+        root = Gio.Menu()
+        menu = Gio.Menu()
+        target = GLib.Variant.new_string(button.app_class)
+
+        def add(label, action):
+            item = Gio.MenuItem.new(label, None)
+            item.set_action_and_target_value(f"{ACTION_GROUP}.{action}", target)
+            menu.append_item(item)
+
+        windows = button._windows() if button.is_running else None
+        if windows and len(windows) > 1:
+            # Fensterliste in MRU-Reihenfolge, Klick fokussiert genau dieses Fenster
+            section = Gio.Menu()
+            for window in windows:
+                item = Gio.MenuItem.new(_menu_label(window.title or button.app_class), None)
+                item.set_action_and_target_value(
+                    f"{ACTION_GROUP}.focus-window",
+                    GLib.Variant("(ss)", (button.app_class, window.address)))
+                section.append_item(item)
+            root.append_section(None, section)
+
+        if button.is_running:
+            add("Neue Instanz öffnen", "new-instance")
+        else:
+            add("App öffnen", "open")
+        add("Entpinnen" if button.pinned else "Pinnen", "toggle-pin")
+        if windows and len(windows) > 1:
+            add("Fenster schließen", "close")
+            add("Alle Fenster schließen", "close-all")
+        elif button.is_running:
+            add("App schließen", "close")
+        root.append_section(None, menu)
+        return root
+
+    def _on_action(self, action, parameter, handler):
+        app_class = parameter.get_string()
+        button = self._target
+        # Eintrag wurde inzwischen neu gebunden: Aktion verwerfen
+        if button is None or button.item is None or button.app_class != app_class:
+            return
+        handler(button)
+
+    def _on_window_action(self, action, parameter):
+        app_class, address = parameter.unpack()
+        button = self._target
+        if button is None or button.item is None or button.app_class != app_class:
+            return
+        windows = button._windows() or ()
+        # Fenster inzwischen geschlossen: nichts tun
+        if any(w.address == address for w in windows):
+            button.on_menu_focus_window(address)
+
+
+def _menu_label(title):
+    """Fenstertitel gekürzt; Unterstriche escapen (sonst Mnemonics)."""
+    if len(title) > TITLE_MAX:
+        title = title[:TITLE_MAX - 1] + "…"
+    return title.replace("_", "__")
+
+
+_menu = None
+
+
+def get_context_menu():
+    """Liefert das gemeinsame Kontextmenü (beim ersten Aufruf erzeugt)."""
+    global _menu
+    if _menu is None:
+        _menu = AppContextMenu()
+    return _menu
+
+
+def detach_context_menu(button):
+    """Löst das Menü von ``button``, falls es schon existiert."""
+    if _menu is not None:
+        _menu.detach(button)
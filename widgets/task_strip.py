@@ -0,0 +1,342 @@
+# widgets/task_strip.py
+
+import math
+
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Graphene", "1.0")
+from gi.repository import Gtk, Gdk, GObject, Graphene
+
+from widgets.app_button import AppActions
+from icon_cache import get_icon_cache
+
+
+class StripTask(AppActions):
+    """
+    Ein TaskItem in der TaskStrip. Bietet dieselben Aktionen wie ein
+    AppButton, ist aber kein Widget.
+    """
+
+    def __init__(self, strip, item, taskbar=None):
+        self.strip = strip
+        self.taskbar = taskbar
+        self.item = item
+        self.icon_size = strip.icon_size
+        self.icon_texture = None
+        self.layout = strip.create_label_layout(item.app_class[:2])
+        self.count_layout = None
+        self._update_count()
+        self._notify_handler = item.connect("notify", self._on_item_notify)
+        self.request_icon()
+
+    def request_icon(self):
+        """Fordert das Icon in der aktuellen Größe beim Cache an."""
+        self.icon_size = self.strip.icon_size
+        request = (self.item.icon_name, self.icon_size)
+        self._icon_request = request
+        get_icon_cache().lookup_async(
+            self.item.icon_name, self.icon_size, self.strip.get_scale_factor(),
+            lambda paintable: self._on_icon_ready(request, paintable))
+
+    def _on_icon_ready(self, request, paintable):
+        if request != self._icon_request or paintable is None:
+            return
+        self.icon_texture = paintable
+        self.strip.queue_draw()
+
+    def _update_count(self):
+        count = self.item.window_count
+        if count > 1:
+            self.count_layout = self.strip.create_badge_layout(
+                str(count) if count < 10 else "9+")
+        else:
+            self.count_layout = None
+
+    def _on_item_notify(self, item, pspec):
+        if pspec.name in ("running", "focused", "launching"):
+            self.strip.queue_draw()
+        elif pspec.name == "window_count":
+            self._update_count()
+            self.strip.queue_draw()
+        elif pspec.name == "icon_name":
+            self.icon_texture = None
+            self.request_icon()
+            self.strip.queue_draw()
+
+    def release(self):
+        """Löst den Eintrag vom TaskItem, wenn er aus dem Modell verschwindet."""
+        self.detach_menu()
+        self.cancel_pending_request()
+        self._icon_request = None
+        self._cycle = None
+        self.item.disconnect(self._notify_handler)
+        self.taskbar = None
+
+
+class TaskStrip(Gtk.Widget):
+    """
+    Zeichnet alle Task-Icons, Indikatoren und Fokus-Hervorhebungen selbst
+    per Gtk.Snapshot und macht das Hit-Testing für Klick, Rechtsklick und
+    Drag & Drop selbst.
+
+    Das Aussehen kommt weiterhin aus styles/style.css: Für jede Stilart
+    (Hover, Fokus, Start läuft, Indikator, Fallback-Label, Fenster-Zähler)
+    gibt es genau ein unsichtbares Proxy-Kind mit den bekannten CSS-Klassen,
+    das pro Eintrag an die passende Stelle gezeichnet wird. Die Widget-Anzahl ist damit konstant, egal wie
+    viele Apps angezeigt werden.
+    """
+    __gtype_name__ = "KarpbarTaskStrip"
+
+    def __init__(self, taskbar, config, spacing=6):
+        super().__init__(css_name="taskstrip")
+        self.taskbar = taskbar
+        self.spacing = spacing
+        self._apply_sizes(config)
+        self.tasks = []
+        self._model = None
+        self._hover = -1
+
+        self._hover_proxy = self._add_proxy(Gtk.Box(), "app-button")
+        self._hover_proxy.set_state_flags(Gtk.StateFlags.PRELIGHT, False)
+        self._focus_proxy = self._add_proxy(Gtk.Box(), "app-button", "focused")
+        self._launching_proxy = self._add_proxy(Gtk.Box(), "app-button", "launching")
+        self._indicator_proxy = self._add_proxy(Gtk.Box(), "indicator")
+        self._fallback_proxy = self._add_proxy(Gtk.Box(), "fallback-label")
+        self._badge_proxy = self._add_proxy(Gtk.Box(), "window-count")
+
+        # Klick (links) und Rechtsklick
+        click = Gtk.GestureClick()
+        click.set_button(0)
+        click.connect("released", self._on_click_released)
+        self.add_controller(click)
+
+        motion = Gtk.EventControllerMotion()
+        motion.connect("motion", self._on_motion)
+        motion.connect("leave", self._on_leave)
+        self.add_controller(motion)
+
+        # Drag & Drop innerhalb der Leiste
+        drag_source = Gtk.DragSource()
+        drag_source.set_actions(Gdk.DragAction.MOVE)
+        drag_source.connect("prepare", self._on_drag_prepare)
+        drag_source.connect("drag-begin", self._on_drag_begin)
+        self.add_controller(drag_source)
+
+        drop_target = Gtk.DropTarget.new(GObject.TYPE_STRING, Gdk.DragAction.MOVE)
+        drop_target.connect("drop", self._on_drop)
+        self.add_controller(drop_target)
+
+    def _add_proxy(self, widget, *css_classes):
+        for css_class in css_classes:
+            widget.add_css_class(css_class)
+        widget.set_can_target(False)
+        widget.set_parent(self)
+        return widget
+
+    def do_dispose(self):
+        for proxy in (self._hover_proxy, self._focus_proxy, self._launching_proxy,
+                      self._indicator_proxy, self._fallback_proxy, self._badge_proxy):
+            proxy.unparent()
+        super().do_dispose()
+
+    def _apply_sizes(self, config):
+        self.icon_size = config.get("icon_size", 32)
+        self.indicator_width = config.get("indicator_width", 8)
+        self.indicator_height = config.get("indicator_height", 3)
+        # Gleiche Maße wie ein AppButton (Icon + Indikator + Rand)
+        self.slot_width = self.icon_size + 4
+        self.slot_height = self.icon_size + self.indicator_height + 2
+        self.badge_size = max(12, self.icon_size // 2)
+
+    def set_sizes(self, config):
+        """Übernimmt geänderte Größen aus der Konfiguration und lädt Icons nach."""
+        self._apply_sizes(config)
+        for task in self.tasks:
+            task.icon_texture = None
+            task.request_icon()
+        self.queue_resize()
+
+    def create_badge_layout(self, text):
+        """Pango-Layout mit der Schrift aus der .window-count-Regel."""
+        return self._badge_proxy.create_pango_layout(text)
+
+    def create_label_layout(self, text):
+        """Pango-Layout mit der Schrift aus der .fallback-label-Regel."""
+        return self._fallback_proxy.create_pango_layout(text)
+
+    # ─── Inhalt ───────────────────────────────────────────────────────────────
+
+    def set_model(self, model):
+        """
+        Bindet die Strip an einen Gio.ListModel mit TaskItems. Änderungen
+        werden über items-changed nur an der betroffenen Stelle übernommen.
+        """
+        self._model = model
+        model.connect("items-changed", self._on_items_changed)
+        self._on_items_changed(model, 0, len(self.tasks), model.get_n_items())
+
+    def _on_items_changed(self, model, position, removed, added):
+        for task in self.tasks[position:position + removed]:
+            task.release()
+        self.tasks[position:position + removed] = [
+            StripTask(self, model.get_item(position + i), self.taskbar)
+            for i in range(added)
+        ]
+        if self._hover >= len(self.tasks):
+            self._hover = -1
+        self.queue_resize()
+
+    def slot_rect(self, index):
+        rect = Gdk.Rectangle()
+        rect.x = index * (self.slot_width + self.spacing)
+        rect.y = 0
+        rect.width = self.slot_width
+        rect.height = self.slot_height
+        return rect
+
+    def index_at(self, x):
+        """Index des Eintrags unter x oder -1."""
+        if x < 0:
+            return -1
+        step = self.slot_width + self.spacing
+        index = int(x // step)
+        if index >= len(self.tasks) or x - index * step > self.slot_width:
+            return -1
+        return index
+
+    def insert_index_at(self, x):
+        """Einfügeposition für einen Drop an x (vor dem Eintrag, dessen Mitte rechts liegt)."""
+        step = self.slot_width + self.spacing
+        index = math.ceil((x - self.slot_width / 2) / step)
+        return max(0, min(index, len(self.tasks)))
+
+    # ─── Layout & Zeichnen ────────────────────────────────────────────────────
+
+    def do_get_request_mode(self):
+        return Gtk.SizeRequestMode.CONSTANT_SIZE
+
+    def do_measure(self, orientation, for_size):
+        if orientation == Gtk.Orientation.HORIZONTAL:
+            n = len(self.tasks)
+            size = n * self.slot_width + max(0, n - 1) * self.spacing
+        else:
+            size = self.slot_height
+        return size, size, -1, -1
+
+    def do_size_allocate(self, width, height, baseline):
+        for proxy, w, h in (
+            (self._hover_proxy, self.slot_width, self.slot_height),
+            (self._focus_proxy, self.slot_width, self.slot_height),
+            (self._launching_proxy, self.slot_width, self.slot_height),
+            (self._indicator_proxy, self.indicator_width, self.indicator_height),
+            (self._fallback_proxy, self.icon_size, self.icon_size),
+            (self._badge_proxy, self.badge_size, self.badge_size),
+        ):
+            # GTK verlangt ein measure() vor jedem allocate()
+            proxy.measure(Gtk.Orientation.HORIZONTAL, -1)
+            proxy.measure(Gtk.Orientation.VERTICAL, -1)
+            proxy.allocate(w, h, -1, None)
+
+    def do_snapshot(self, snapshot):
+        icon_x = (self.slot_width - self.icon_size) / 2
+        icon_y = 1
+        ind_x = (self.slot_width - self.indicator_width) / 2
+        ind_y = self.slot_height - self.indicator_height
+        color = self._label_color()
+        badge_color = self._proxy_color(self._badge_proxy)
+        badge_x = self.slot_width - self.badge_size
+
+        for index, task in enumerate(self.tasks):
+            rect = self.slot_rect(index)
+            snapshot.save()
+            snapshot.translate(Graphene.Point().init(rect.x, rect.y))
+
+            if task.is_focused:
+                self.snapshot_child(self._focus_proxy, snapshot)
+            elif task.item.launching:
+                self.snapshot_child(self._launching_proxy, snapshot)
+            if index == self._hover:
+                self.snapshot_child(self._hover_proxy, snapshot)
+
+            snapshot.save()
+            snapshot.translate(Graphene.Point().init(icon_x, icon_y))
+            if task.icon_texture is not None:
+                task.icon_texture.snapshot(snapshot, self.icon_size, self.icon_size)
+            else:
+                self.snapshot_child(self._fallback_proxy, snapshot)
+                text_w, text_h = task.layout.get_pixel_size()
+                snapshot.translate(Graphene.Point().init(
+                    (self.icon_size - text_w) / 2, (self.icon_size - text_h) / 2))
+                snapshot.append_layout(task.layout, color)
+            snapshot.restore()
+
+            if task.count_layout is not None:
+                snapshot.save()
+                snapshot.translate(Graphene.Point().init(badge_x, 0))
+                self.snapshot_child(self._badge_proxy, snapshot)
+                text_w, text_h = task.count_layout.get_pixel_size()
+                snapshot.translate(Graphene.Point().init(
+                    (self.badge_size - text_w) / 2, (self.badge_size - text_h) / 2))
+                snapshot.append_layout(task.count_layout, badge_color)
+                snapshot.restore()
+
+            if task.is_running:
+                snapshot.translate(Graphene.Point().init(ind_x, ind_y))
+                self.snapshot_child(self._indicator_proxy, snapshot)
+            snapshot.restore()
+
+    def _label_color(self):
+        return self._proxy_color(self._fallback_proxy)
+
+    @staticmethod
+    def _proxy_color(proxy):
+        if hasattr(proxy, "get_color"):
+            return proxy.get_color()
+        return proxy.get_style_context().get_color()
+
+    # ─── Eingabe ──────────────────────────────────────────────────────────────
+
+    def _on_motion(self, controller, x, y):
+        index = self.index_at(x)
+        if index != self._hover:
+            self._hover = index
+            self.queue_draw()
+
+    def _on_leave(self, controller):
+        if self._hover != -1:
+            self._hover = -1
+            self.queue_draw()
+
+    def _on_click_released(self, gesture, n_press, x, y):
+        index = self.index_at(x)
+        if index < 0:
+            return
+        task = self.tasks[index]
+        button = gesture.get_current_button()
+        if button == Gdk.BUTTON_PRIMARY:
+            task.on_left_click(None)
+        elif button == Gdk.BUTTON_SECONDARY:
+            from widgets.context_menu import get_context_menu
+            get_context_menu().popup_for(task, widget=self, rect=self.slot_rect(index))
+
+    def _on_drag_prepare(self, drag_source, x, y):
+        index = self.index_at(x)
+        if index < 0:
+            return None
+        self._drag_task = self.tasks[index]
+        val = GObject.Value()
+        val.init(GObject.TYPE_STRING)
+        val.set_string(self._drag_task.app_class)
+        return Gdk.ContentProvider.new_for_value(val)
+
+    def _on_drag_begin(self, drag_source, drag):
+        task = self._drag_task
+        if task.icon_texture is not None:
+            drag_source.set_icon(task.icon_texture, self.icon_size // 2, self.icon_size // 2)
+
+    def _on_drop(self, drop_target, value, x, y):
+        class_name = (value.get_string()
+                      if isinstance(value, GObject.Value)
+                      else str(value))
+        index = self.taskbar.model_index(self.insert_index_at(x))
+        return self.taskbar.move_task(class_name, index)
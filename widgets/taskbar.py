@@ -1,20 +1,62 @@
 # widgets/taskbar.py
 
-import os
-import socket
-import math
-from gi.repository import Gtk, Gdk, GLib, GObject
-from widgets.app_button import AppButton
-from window_manager import get_windows
+from gi.repository import Gtk, Gdk
+from widgets.app_button import AppButton, click_latencies
+from widgets.task_strip import TaskStrip
+from widgets.workspaces import WorkspaceIndicator
+from task_model import TaskModel, TaskItem
+from update_coalescer import UpdateCoalescer
+from desktop_index import resolve_app
+from icon_cache import get_icon_cache
+from snapshot import save_snapshot
+from config_loader import ConfigModel
+
+# Platz rechts neben der Task-Liste (Power-Button)
+RIGHT_RESERVE = 48
+# Pixel pro Mausrad-Raste, falls die Adjustment keinen Schritt vorgibt
+SCROLL_STEP = 40
 
-class Taskbar:
-    PAGE_SIZE = 10
 
-    def __init__(self, config):
+class Taskbar:
+    """
+    Eine Leiste auf einem Monitor. Fensterzustand, Event-Socket und
+    Start-Verfolgung kommen aus der gemeinsamen StateEngine; jede Leiste hat
+    nur ihr eigenes TaskModel und ihre Widgets. Mit ``monitor_only`` in der
+    Konfiguration zeigt sie nur die Fenster auf ihrem Monitor.
+
+    Mit ``workspace_only`` zeigt sie nur gepinnte Apps und Apps mit Fenstern
+    auf dem aktiven Workspace ihres Monitors. Die übrigen Items bleiben im
+    TaskModel und werden nur per Gtk.FilterListModel ausgeblendet (Property
+    ``shown``); ein Workspace-Wechsel ändert damit nur die Items der Klassen
+    auf dem alten und neuen Workspace. Die Zeilen-Widgets bleiben dabei
+    nicht stehen: Das FilterListModel meldet ausgeblendete Items per
+    items-changed als entfernt, die ListView löst deren AppButtons (unbind)
+    und bindet sie beim Einblenden neu – erhalten bleiben nur die TaskItems.
+
+    Links neben den Tasks sitzt die Workspace-Anzeige (``show_workspaces``);
+    sie bekommt von der Engine nur die geänderten Workspaces.
+    """
+
+    def __init__(self, engine, config, monitor=None):
+        self.engine = engine
         self.config = config
-        self.buttons_map = {}
-        self.task_order = []
-        self.current_page = 1
+        self.monitor = monitor
+        # Typisierte Sicht mit klein geschriebenen Nachschlage-Tabellen
+        self.model = ConfigModel.from_dict(config)
+        # Monitor-Name für den Filter oder None (alle Fenster)
+        self.output = self._output_filter()
+        # Geordnete App-Liste; die Views binden sich nur an dieses Modell
+        self.tasks = TaskModel()
+        # Aktuell von der ListView erzeugte AppButtons (für Größenänderungen)
+        self._buttons = set()
+        # Sicht der Views auf das TaskModel; filtert nur bei workspace_only
+        self._shown_filter = Gtk.BoolFilter.new(
+            Gtk.PropertyExpression.new(TaskItem, None, "shown"))
+        self.view_model = Gtk.FilterListModel.new(self.tasks.store, None)
+        if self.model.workspace_only:
+            self.view_model.set_filter(self._shown_filter)
+        # Seit dem letzten Refiltern ein-/ausgeblendete Items
+        self._shown_delta = set()
 
         # Haupt-Container als horizontale Box
         self.container = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
@@ -24,47 +66,54 @@ class Taskbar:
         # Linker Spacer: verschiebt Buttons ab Bildschirmmitte nach linksbündig
         self.left_spacer = Gtk.Box()
         display = Gdk.Display.get_default()
-        half_width = 0
-        if display:
+        if monitor is None and display:
             monitors = display.get_monitors()
             if monitors.get_n_items() > 0:
-                primary = monitors.get_item(0)
-                geom = primary.get_geometry()
-                half_width = geom.width // 2
+                monitor = monitors.get_item(0)
+        half_width = monitor.get_geometry().width // 2 if monitor is not None else 0
         self.left_spacer.set_size_request(half_width, -1)
         self.container.append(self.left_spacer)
 
-        # Box für App-Buttons
-        self.tasks_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
-        self.container.append(self.tasks_box)
-
-        # Vertikale Box für Paging-Pfeile
-        arrow_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-        arrow_box.set_valign(Gtk.Align.END)
-
-        # Page-Up Button
-        up_icon = Gtk.Image.new_from_icon_name("go-up-symbolic")
-        up_icon.set_pixel_size(18)
-        self.page_up_button = Gtk.Button()
-        self.page_up_button.add_css_class("page-arrow")
-        self.page_up_button.set_child(up_icon)
-        self.page_up_button.connect("clicked", lambda _: self.on_page_up())
-        arrow_box.append(self.page_up_button)
-
-        # Page-Down Button
-        down_icon = Gtk.Image.new_from_icon_name("go-down-symbolic")
-        down_icon.set_pixel_size(18)
-        self.page_down_button = Gtk.Button()
-        self.page_down_button.add_css_class("page-arrow")
-        self.page_down_button.set_child(down_icon)
-        self.page_down_button.connect("clicked", lambda _: self.on_page_down())
-        arrow_box.append(self.page_down_button)
-
-        # Anfangs ausblenden
-        self.page_up_button.set_visible(False)
-        self.page_down_button.set_visible(False)
-
-        self.container.append(arrow_box)
+        # Workspace-Anzeige links im Spacer, die Tasks bleiben ab der Mitte
+        self.workspaces = WorkspaceIndicator(
+            self.store, monitor.get_connector() if self.monitor is not None else None)
+        self.workspaces.set_halign(Gtk.Align.START)
+        self.workspaces.set_visible(self.model.show_workspaces)
+        self.left_spacer.append(self.workspaces)
+        if engine.live:
+            self.workspaces.resync()
+
+        # Task-Liste: Gtk.ListView mit recycelten AppButtons oder
+        # (task_view = "strip") ein einziges selbstgezeichnetes Widget.
+        # Passt nicht alles hinein, wird horizontal gescrollt statt geblättert.
+        self.strip = None
+        if config.get("task_view", "buttons") == "strip":
+            self.strip = TaskStrip(self, config, spacing=6)
+            self.strip.set_model(self.view_model)
+            self.task_view = self.strip
+        else:
+            factory = Gtk.SignalListItemFactory()
+            factory.connect("setup", self._on_factory_setup)
+            factory.connect("bind", self._on_factory_bind)
+            factory.connect("unbind", self._on_factory_unbind)
+            factory.connect("teardown", self._on_factory_teardown)
+            self.task_view = Gtk.ListView(model=Gtk.NoSelection(model=self.view_model),
+                                          factory=factory)
+            self.task_view.set_orientation(Gtk.Orientation.HORIZONTAL)
+            self.task_view.add_css_class("task-list")
+
+        self.scroller = Gtk.ScrolledWindow()
+        self.scroller.set_policy(Gtk.PolicyType.EXTERNAL, Gtk.PolicyType.NEVER)
+        self.scroller.set_propagate_natural_width(True)
+        self.scroller.set_propagate_natural_height(True)
+        if half_width > RIGHT_RESERVE:
+            self.scroller.set_max_content_width(half_width - RIGHT_RESERVE)
+        self.scroller.set_child(self.task_view)
+        # Mausrad (vertikal) scrollt die Leiste horizontal
+        wheel = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL)
+        wheel.connect("scroll", self._on_scroll)
+        self.scroller.add_controller(wheel)
+        self.container.append(self.scroller)
 
         # Rechter Spacer + Power-Button
         right_spacer = Gtk.Box()
@@ -83,210 +132,362 @@ class Taskbar:
         self.container.add_css_class("taskbar")
         self.widget = self.container
 
-        # Initialbefüllung: gepinnte + laufende Apps
-        windows = get_windows()
-        running_classes = {w.get("class", "").lower() for w in windows if w.get("class")}
-
-        pinned = [cls.lower() for cls in config.get("pinned_apps", [])]
-        others = [cls for cls in running_classes if cls not in pinned]
+        # Solange die Engine noch den Compositor abfragt, aus dem Snapshot malen
+        snapshot = None if engine.live else engine.snapshot
+        if snapshot is not None:
+            running_classes = snapshot["running"]
+            # Aufgelöste Pfade nur als Hinweis für den ersten Frame; die
+            # Items behalten ihren Theme-Namen
+            if snapshot["icon_size"] == self.config.get("icon_size", 32):
+                get_icon_cache().add_hints(snapshot["icons"], snapshot["icon_size"])
+            focused_class = None
+        else:
+            running_classes = self.store.classes(self.output)
+            focused_class = self.store.focused_class(self.output)
 
-        overrides = config.get("app_overrides", {})
+        # Initialbefüllung: gepinnte + laufende Apps
+        pinned = self.model.pinned_classes
+        order = snapshot["order"] if snapshot else sorted(running_classes)
+        others = [cls for cls in order
+                  if cls in running_classes and not self.model.is_pinned(cls)]
+        overrides = self.model.overrides
 
         for cls in pinned + others:
-            ovr = overrides.get(cls, {})
-            exec_cmd  = ovr.get("exec", cls)
-            icon_path = ovr.get("icon")
-
-            btn = AppButton(
-                app_class=cls,
-                icon_path=icon_path,
-                exec_cmd=exec_cmd,
-                pinned=(cls in pinned),
-                config=config,
-                taskbar=self
-            )
-            btn.set_running(cls in running_classes)
-            btn.set_focused(any(
-                w.get("class", "").lower() == cls and w.get("focused")
-                for w in windows
-            ))
-            self.tasks_box.append(btn)
-            self.buttons_map[cls] = btn
-            self.task_order.append(cls)
-
-        # Drag & Drop zum Umordnen
-        drop_target = Gtk.DropTarget.new(GObject.TYPE_STRING, Gdk.DragAction.MOVE)
-        drop_target.connect("drop", self.on_drop)
-        self.tasks_box.add_controller(drop_target)
-
-        # Hyprland-IPC Socket für Fenster-Events
-        try:
-            runtime = os.environ.get("XDG_RUNTIME_DIR", "")
-            hypr_root = os.path.join(runtime, "hypr")
-            sig_dirs = [d for d in os.listdir(hypr_root)
-                        if os.path.isdir(os.path.join(hypr_root, d))]
-            his = sig_dirs[0]
-            socket_path = os.path.join(hypr_root, his, ".socket2.sock")
-            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            self.sock.setblocking(False)
-            self.sock.connect(socket_path)
-            GLib.io_add_watch(self.sock, GLib.IO_IN, self._on_ipc_event)
-        except Exception:
-            pass
-
-        self._update_page_display()
-
-    def on_page_up(self):
-        if self.current_page > 1:
-            self.current_page -= 1
-            self._update_page_display()
-
-    def on_page_down(self):
-        total = len(self.task_order)
-        pages = max(1, math.ceil(total / self.PAGE_SIZE))
-        if self.current_page < pages:
-            self.current_page += 1
-            self._update_page_display()
-
-    def _update_page_display(self):
-        total = len(self.task_order)
-        pages = max(1, math.ceil(total / self.PAGE_SIZE))
-        if self.current_page > pages:
-            self.current_page = pages
-
-        start   = (self.current_page - 1) * self.PAGE_SIZE
-        visible = self.task_order[start:start + self.PAGE_SIZE]
-
-        # Buttons außerhalb des Sichtbereichs entfernen
-        for child in list(self.tasks_box):
-            if isinstance(child, AppButton) and child.app_class not in visible:
-                self.tasks_box.remove(child)
-
-        # Sichtbare Buttons in richtiger Reihenfolge (prepend/insert)
-        for idx, cls in enumerate(visible):
-            btn = self.buttons_map[cls]
-            if btn.get_parent() is None:
-                if idx == 0:
-                    self.tasks_box.prepend(btn)
-                else:
-                    prev = visible[idx - 1]
-                    self.tasks_box.insert_child_after(btn, self.buttons_map[prev])
-
-        # Paging-Pfeile zeigen/sensitiv setzen
-        if pages > 1:
-            self.page_up_button.set_visible(True)
-            self.page_down_button.set_visible(True)
-            self.page_up_button.set_sensitive(self.current_page > 1)
-            self.page_down_button.set_sensitive(self.current_page < pages)
+            if cls in self.tasks:
+                continue
+            exec_cmd, icon_path = resolve_app(cls, overrides)
+            pinned_app = self.model.is_pinned(cls)
+            self.tasks.add(cls, exec_cmd, icon_path, pinned=pinned_app,
+                           running=cls in running_classes,
+                           focused=cls == focused_class,
+                           window_count=self.window_count(cls),
+                           shown=self._is_shown(cls, pinned_app))
+
+        # Events werden gesammelt und einmal pro Frame angewendet
+        self.ui_updates = 0
+        self.coalescer = UpdateCoalescer(self._apply_changes, self.container)
+
+        self._last_snapshot = None
+        engine.add_bar(self)
+
+    @property
+    def store(self):
+        """Gemeinsamer WindowStore aller Leisten."""
+        return self.engine.store
+
+    def _output_filter(self):
+        if not self.model.monitor_only or self.monitor is None:
+            return None
+        return self.monitor.get_connector()
+
+    def windows_for_class(self, cls):
+        """Fenster einer Klasse (MRU), bei monitor_only nur auf diesem Monitor."""
+        return self.store.windows_for_class(cls, self.output)
+
+    def window_count(self, cls):
+        """Anzahl der Fenster einer Klasse, ohne die MRU-Liste aufzubauen."""
+        return self.store.window_count(cls, self.output)
+
+    @property
+    def workspace(self):
+        """Aktiver Workspace für den Filter oder None (kein Filter)."""
+        if not self.model.workspace_only:
+            return None
+        monitor = self.monitor.get_connector() if self.monitor is not None else None
+        return self.store.active_workspace(monitor)
+
+    def _is_shown(self, cls, pinned):
+        workspace = self.workspace
+        return workspace is None or pinned or self.store.has_class_on_workspace(cls, workspace)
+
+    def _set_shown(self, item, shown):
+        if item.shown != shown:
+            item.shown = shown
+            self._shown_delta.add(shown)
+
+    def _refilter(self):
+        """
+        Lässt die FilterListModel die geänderten ``shown``-Werte übernehmen.
+        Nur ausgeblendet bzw. nur eingeblendet prüft GTK dabei nur die bisher
+        sichtbaren bzw. unsichtbaren Items.
+        """
+        delta, self._shown_delta = self._shown_delta, set()
+        if not delta or self.view_model.get_filter() is None:
+            return
+        if delta == {False}:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif delta == {True}:
+            change = Gtk.FilterChange.LESS_STRICT
         else:
-            self.page_up_button.set_visible(False)
-            self.page_down_button.set_visible(False)
+            change = Gtk.FilterChange.DIFFERENT
+        self._shown_filter.changed(change)
+
+    def model_index(self, view_index):
+        """
+        Rechnet eine Einfügeposition in der (gefilterten) Ansicht in eine
+        Position im TaskModel um.
+        """
+        if self.view_model.get_filter() is None:
+            return view_index
+        if view_index >= self.view_model.get_n_items():
+            return len(self.tasks)
+        return self.tasks.position(self.view_model.get_item(view_index).app_class)
+
+    def resync(self):
+        """Gleicht alle Items mit dem Store ab (Live-Zustand da, Filter geändert)."""
+        self._apply_changes(set(self.tasks.classes()) | self.store.classes(self.output))
+        self.workspaces.resync()
+
+    def workspaces_changed(self, names):
+        """Von der Engine: diese Workspaces haben sich geändert."""
+        self.workspaces.push(names)
+
+    def release(self):
+        """Meldet die Leiste bei der Engine ab (Monitor entfernt)."""
+        self.engine.remove_bar(self)
+
+    def save_snapshot(self, force=True):
+        """
+        Schreibt Reihenfolge, laufende Apps und Icon-Pfade für den nächsten
+        Warmstart. Ohne ``force`` nur, wenn sich seitdem etwas geändert hat;
+        die Icon-Pfade werden erst danach aufgelöst.
+        """
+        icon_size = self.config.get("icon_size", 32)
+        order = []
+        names = []
+        running = set()
+        for item in self.tasks:
+            order.append(item.app_class)
+            names.append(item.icon_name)
+            if item.running:
+                running.add(item.app_class)
+        state = (tuple(order), frozenset(running), tuple(names), icon_size)
+        if not force and state == self._last_snapshot:
+            return
+        self._last_snapshot = state
+        cache = get_icon_cache()
+        icons = {}
+        for name in names:
+            path, _ = cache.resolve_path(name, icon_size)
+            if path and path != name:
+                icons[name] = path
+        save_snapshot(order, running, icon_size, icons)
+
+    def _on_scroll(self, controller, dx, dy):
+        adj = self.scroller.get_hadjustment()
+        step = adj.get_step_increment() or SCROLL_STEP
+        adj.set_value(adj.get_value() + dy * step)
+        return True
 
-    def _on_ipc_event(self, source, condition):
-        try:
-            raw = source.recv(4096).decode().splitlines()
-        except BlockingIOError:
-            return True
+    # ─── ListView-Factory: AppButtons werden recycelt ────────────────────────
+
+    def _on_factory_setup(self, factory, list_item):
+        list_item.set_activatable(False)
+        list_item.set_selectable(False)
+        button = AppButton(config=self.config, taskbar=self)
+        self._buttons.add(button)
+        list_item.set_child(button)
+
+    def _on_factory_bind(self, factory, list_item):
+        list_item.get_child().bind(list_item.get_item())
+
+    def _on_factory_unbind(self, factory, list_item):
+        list_item.get_child().unbind()
+
+    def _on_factory_teardown(self, factory, list_item):
+        button = list_item.get_child()
+        if button is not None:
+            self._buttons.discard(button)
+            button.teardown()
+            list_item.set_child(None)
+
+    # ─── App-Starts (über die gemeinsame Engine) ────────────────────────────
+
+    def launch(self, cls, exec_cmd, key):
+        self.engine.launch(cls, exec_cmd, key)
+
+    def _apply_changes(self, changed):
+        """
+        Wird einmal pro Frame mit allen seit dem letzten Frame betroffenen
+        Klassen aufgerufen und setzt nur die tatsächlich nötigen Änderungen um.
+        """
+        for cls in changed:
+            self._sync_class(cls)
+        self._refilter()
+
+    def _sync_class(self, cls):
+        """
+        Gleicht das TaskItem einer Klasse mit dem Fensterzustand im Store ab:
+        Item anlegen, aktualisieren oder (falls nicht gepinnt) entfernen.
+        Die Views folgen über items-changed bzw. notify.
+        """
+        window_count = self.window_count(cls)
+        running = window_count > 0
+        focused = cls == self.store.focused_class(self.output)
+        item = self.tasks.get(cls)
+
+        if item is None:
+            if not running:
+                return
+            exec_cmd, icon_path = resolve_app(cls, self.model.overrides)
+            self.tasks.add(cls, exec_cmd, icon_path, running=True, focused=focused,
+                           window_count=window_count, shown=self._is_shown(cls, False))
+            self.ui_updates += 1
+            return
+        if not running and not item.pinned:
+            self.tasks.remove(cls)
+            self.ui_updates += 1
+            return
 
-        for line in raw:
-            if ">>" not in line:
+        if item.running != running:
+            item.running = running
+            self.ui_updates += 1
+        if item.focused != focused:
+            item.focused = focused
+            self.ui_updates += 1
+        if item.window_count != window_count:
+            item.window_count = window_count
+            self.ui_updates += 1
+        self._set_shown(item, self._is_shown(cls, item.pinned))
+
+    def apply_config(self, old, diff):
+        """
+        Übernimmt eine neu geladene Konfiguration (self.config ist bereits
+        aktualisiert). Es werden nur die betroffenen Items und Buttons
+        angefasst, siehe config_loader.diff_config.
+        """
+        self.model = ConfigModel.from_dict(self.config)
+        overrides = self.model.overrides
+        focused_class = self.store.focused_class(self.output)
+
+        for cls in diff["pins_removed"]:
+            item = self.tasks.get(cls)
+            if item is None:
                 continue
-            event, args = line.split(">>", 1)
-            self._handle_event(event, args.strip())
-        return True
+            item.pinned = False
+            if not item.running:
+                self.tasks.remove(cls)
+        for cls in diff["pins_added"]:
+            item = self.tasks.get(cls)
+            if item is not None:
+                item.pinned = True
+                continue
+            exec_cmd, icon_path = resolve_app(cls, overrides)
+            window_count = self.window_count(cls)
+            self.tasks.add(cls, exec_cmd, icon_path, pinned=True,
+                           running=window_count > 0,
+                           focused=cls == focused_class,
+                           window_count=window_count)
+        # Entpinnte Apps ohne Fenster auf dem Workspace ausblenden
+        for cls in diff["pins_removed"] + diff["pins_added"]:
+            item = self.tasks.get(cls)
+            if item is not None:
+                self._set_shown(item, self._is_shown(cls, item.pinned))
+        self._refilter()
+        # Gepinnte Apps wie beim Start vorne, in Konfigurations-Reihenfolge.
+        # Stimmt die Reihenfolge schon (Änderung kam aus dieser Leiste), bleibt
+        # die Anordnung unverändert.
+        order = diff["pin_order"]
+        if order and [cls for cls in self.tasks.classes() if cls in order] != order:
+            for idx, cls in enumerate(order):
+                self.tasks.move(cls, idx)
+
+        for cls in diff["overrides"]:
+            item = self.tasks.get(cls)
+            if item is None:
+                continue
+            exec_cmd, icon_path = resolve_app(cls, overrides)
+            item.exec_cmd = exec_cmd
+            if (icon_path or cls) != item.icon_name:
+                item.icon_name = icon_path or cls
+
+        if diff["sizes"]:
+            if self.strip is not None:
+                self.strip.set_sizes(self.config)
+            for button in self._buttons:
+                button.set_sizes(self.config)
+
+        if "monitor_only" in diff["other"]:
+            output = self._output_filter()
+            if output != self.output:
+                self.output = output
+                self.resync()
+
+        if "workspace_only" in diff["other"]:
+            for item in self.tasks:
+                self._set_shown(item, self._is_shown(item.app_class, item.pinned))
+            self._shown_delta.clear()
+            self.view_model.set_filter(self._shown_filter if self.model.workspace_only
+                                       else None)
+
+        if "show_workspaces" in diff["other"]:
+            self.workspaces.set_visible(self.model.show_workspaces)
+
+        if "task_view" in diff["other"]:
+            print("ℹ️ task_view wird erst nach einem Neustart übernommen.")
+
+    def stats(self):
+        """
+        Zähler für empfangene Events und tatsächlich angewendete UI-Updates
+        sowie die Zeit vom Klick bis zur Dispatch-Antwort und vom Start
+        einer App bis zu ihrem ersten Fenster.
+        """
+        latencies = sorted(click_latencies)
+        stats = {
+            "events_received": self.coalescer.events_received,
+            "frames_flushed": self.coalescer.flushes,
+            "ui_updates": self.ui_updates,
+            "workspace_updates": self.workspaces.ui_updates,
+        }
+        if latencies:
+            # Klick bis Dispatch-Antwort in ms
+            stats["click_to_dispatch_ms"] = {
+                "n": len(latencies),
+                "p50": round(latencies[len(latencies) // 2], 2),
+                "max": round(latencies[-1], 2),
+            }
+        stats.update(self.engine.stats())
+        return stats
+
+    def drop_next_to(self, class_name, target_class, after):
+        """Drop eines AppButtons auf einen anderen: davor bzw. dahinter einfügen."""
+        position = self.tasks.position(target_class)
+        if position < 0:
+            return False
+        return self.move_task(class_name, position + 1 if after else position)
 
-    def _handle_event(self, event, args):
-        current = get_windows()
-        running = {w["class"].lower() for w in current if w.get("class")}
-
-        if event == "openwindow":
-            _, _, cls, _ = args.split(",", 3)
-            cls = cls.lower()
-            if cls not in self.buttons_map:
-                btn = AppButton(cls, exec_cmd=cls, pinned=False,
-                                config=self.config, taskbar=self)
-                self.buttons_map[cls] = btn
-                self.task_order.append(cls)
-            self.buttons_map[cls].set_running(True)
-
-        elif event == "closewindow":
-            for cls, btn in list(self.buttons_map.items()):
-                if cls not in running:
-                    pinned = any(p["class"].lower() == cls
-                                 for p in self.config.get("pinned_apps", []))
-                    if pinned:
-                        btn.set_running(False)
-                    else:
-                        self.tasks_box.remove(btn)
-                        del self.buttons_map[cls]
-                        self.task_order.remove(cls)
-
-        elif event in ("activewindow", "activewindowv2"):
-            cls = args.split(",", 1)[0].lower()
-            for c, btn in self.buttons_map.items():
-                btn.set_focused(c == cls)
-
-        self._update_page_display()
-
-    def on_drop(self, drop_target, value, x, y):
-        class_name = (value.get_string()
-                      if isinstance(value, GObject.Value)
-                      else str(value))
+    def move_task(self, class_name, new_idx):
+        """
+        Verschiebt eine App an die Einfügeposition ``new_idx``
+        (Index vor dem Entfernen des gezogenen Eintrags).
+        """
         class_name = class_name.lower()
-        if class_name not in self.buttons_map:
+        old_idx = self.tasks.position(class_name)
+        if old_idx < 0:
             return False
-
-        children = [c for c in self.tasks_box if isinstance(c, AppButton)]
-        dragged = self.buttons_map[class_name]
-        if dragged in children:
-            children.remove(dragged)
-
-        new_idx = len(children)
-        for idx, child in enumerate(children):
-            alloc = child.get_allocation()
-            if x < alloc.x + alloc.width / 2:
-                new_idx = idx
-                break
-
-        old_idx = self.task_order.index(class_name)
         if old_idx < new_idx:
             new_idx -= 1
-        self.task_order.remove(class_name)
-        self.task_order.insert(new_idx, class_name)
-
-        self.tasks_box.remove(dragged)
-        if new_idx == 0:
-            self.tasks_box.prepend(dragged)
-        else:
-            prev = self.task_order[new_idx - 1]
-            self.tasks_box.insert_child_after(dragged, self.buttons_map[prev])
-
-        self._update_pinned_config_order()
-        self._update_page_display()
+        if self.tasks.move(class_name, new_idx):
+            self._update_pinned_config_order()
         return True
 
     def _update_pinned_config_order(self):
+        # Zur Laufzeit holen: load_config bindet config_data neu
         from config_loader import config_data, save_config
-        pinned = [p["class"].lower() for p in config_data.get("pinned_apps", [])]
-        if not pinned:
+        entries = config_data.get("pinned_apps", [])
+        if not entries:
             return
+        # Einträge können Strings oder Dicts mit "class" sein
+        by_class = {}
+        for entry in entries:
+            cls = entry if isinstance(entry, str) else entry.get("class", "")
+            by_class.setdefault(cls.lower(), entry)
         # Nur die gepinnten Apps in Task-Reihenfolge übernehmen
-        ordered = [cls for cls in self.task_order if cls in pinned]
-        new_list = []
-        for cls in ordered:
-            for entry in config_data["pinned_apps"]:
-                if entry["class"].lower() == cls:
-                    new_list.append(entry)
-                    break
+        new_list = [by_class[cls] for cls in self.tasks.classes() if cls in by_class]
+        if new_list == entries:
+            return
         config_data["pinned_apps"] = new_list
         save_config()
 
     def remove_app(self, class_name):
-        class_name = class_name.lower()
-        btn = self.buttons_map.get(class_name)
-        if btn and btn.get_parent():
-            self.tasks_box.remove(btn)
-        self.buttons_map.pop(class_name, None)
-        if class_name in self.task_order:
-            self.task_order.remove(class_name)
-        self._update_page_display()
+        self.tasks.remove(class_name.lower())
@@ -0,0 +1,104 @@
+# widgets/workspaces.py
+
+import bisect
+
+from gi.repository import Gtk
+
+from update_coalescer import UpdateCoalescer
+from window_manager import dispatch_batch_async
+
+# CSS-Klassen je Feld von WindowStore.workspace_state()
+STATE_CLASSES = ("occupied", "active", "urgent")
+
+
+class WorkspaceIndicator(Gtk.Box):
+    """
+    Workspace-Anzeige einer Leiste: ein Button pro Workspace auf ihrem
+    Monitor, nach ID sortiert, mit den CSS-Klassen ``occupied``, ``active``
+    und ``urgent``.
+
+    Die Anzeige fragt den Compositor nie selbst ab. Die StateEngine reicht
+    nach jedem Event die vom WindowStore als geändert gemeldeten Workspaces
+    weiter; pro Frame werden nur deren Buttons angelegt, entfernt oder in
+    den geänderten CSS-Klassen angepasst. Ein Workspace-Wechsel fasst so
+    genau zwei Buttons an.
+    """
+
+    def __init__(self, store, monitor=None):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=2)
+        self.add_css_class("workspaces")
+        self.store = store
+        # Monitor-Name (Connector) oder None für alle Workspaces
+        self.monitor = monitor
+        # Workspace-Name -> (Button, Zustand)
+        self._buttons = {}
+        # Sortierschlüssel der Buttons in Anzeige-Reihenfolge
+        self._keys = []
+        self.ui_updates = 0
+        self.coalescer = UpdateCoalescer(self._apply, self)
+
+    def push(self, names):
+        """Nimmt die geänderten Workspaces eines Events entgegen."""
+        self.coalescer.push(names)
+
+    def resync(self):
+        """Gleicht alle Buttons mit dem Store ab (Live-Zustand geladen)."""
+        self._apply(set(self._buttons) | set(self.store.workspace_names(self.monitor)))
+
+    def _apply(self, names):
+        for name in names:
+            self._sync(name)
+
+    def _sync(self, name):
+        state = self.store.workspace_state(name, self.monitor)
+        entry = self._buttons.get(name)
+        if state is None:
+            if entry is not None:
+                self._remove(name, entry[0])
+            return
+        if entry is None:
+            button = self._add(name)
+            old = (False, False, False)
+        else:
+            button, old = entry
+            if old == state:
+                return
+        for css_class, was, now in zip(STATE_CLASSES, old, state):
+            if was != now:
+                if now:
+                    button.add_css_class(css_class)
+                else:
+                    button.remove_css_class(css_class)
+        self._buttons[name] = (button, state)
+        self.ui_updates += 1
+
+    def _sort_key(self, name):
+        ws_id = self.store.workspace_ids.get(name)
+        # Benannte Workspaces ohne bekannte ID ans Ende
+        return (ws_id is None, ws_id or 0, name)
+
+    def _add(self, name):
+        button = Gtk.Button(label=name)
+        button.add_css_class("workspace-button")
+        button.set_focus_on_click(False)
+        button.connect("clicked", self._on_clicked, name)
+        key = self._sort_key(name)
+        index = bisect.bisect(self._keys, key)
+        self._keys.insert(index, key)
+        previous = self._buttons[self._keys[index - 1][2]][0] if index else None
+        self.insert_child_after(button, previous)
+        self._buttons[name] = (button, (False, False, False))
+        return button
+
+    def _remove(self, name, button):
+        del self._buttons[name]
+        self._keys = [key for key in self._keys if key[2] != name]
+        self.remove(button)
+        self.ui_updates += 1
+
+    def _on_clicked(self, button, name):
+        ws_id = self.store.workspace_ids.get(name)
+        if ws_id is not None and ws_id > 0:
+            dispatch_batch_async([f"workspace {ws_id}"])
+        else:
+            dispatch_batch_async([f"workspace name:{name}"])
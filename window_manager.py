@@ -1,90 +1,194 @@
-import subprocess
-import json
+from hypr_ipc import HyprClient
+from window_state import Window, parse_clients
 
-def _run_hyprctl_json(command):
+_client = None
+
+
+def get_client():
     """
-    Führt den hyprctl-Befehl mit JSON-Ausgabe aus und gibt das geparste JSON zurück.
-    Bei Fehlern wird eine leere Struktur zurückgegeben.
+    Liefert den prozessweiten Hyprland-Client (Request-Socket).
     """
-    try:
-        result = subprocess.run(["hyprctl", "-j"] + command.split(), capture_output=True, text=True, check=True)
-    except subprocess.CalledProcessError:
-        return None
-    # JSON Ausgabe parsen
-    try:
-        data = json.loads(result.stdout)
-    except json.JSONDecodeError:
-        data = None
-    return data
+    global _client
+    if _client is None:
+        _client = HyprClient()
+    return _client
+
 
 def get_windows():
     """
     Ruft die Liste aller offenen Fenster (Clients) von Hyprland ab.
-    Rückgabe: Liste von Dictionaries mit Fensterinformationen.
+    Rückgabe: Liste von Window-Datensätzen.
+    """
+    return parse_clients(get_client().request_json("clients"))
+
+
+def get_compositor_state():
     """
-    data = _run_hyprctl_json("clients")
-    if data is None:
-        return []
-    return data
+    Fenster, Workspaces und Monitore in einem Round-Trip (``[[BATCH]]``).
+    Rückgabe: (Liste von Window, Workspace-Dicts, Monitor-Dicts).
+    """
+    clients, workspaces, monitors = get_client().request_json_batch(
+        ["clients", "workspaces", "monitors"])
+    return (parse_clients(clients),
+            workspaces if isinstance(workspaces, list) else [],
+            monitors if isinstance(monitors, list) else [])
+
 
 def get_active_window():
     """
     Ruft das aktuell fokussierte Fenster (active window) von Hyprland ab.
-    Rückgabe: Dictionary mit Informationen zum aktiven Fenster oder None.
+    Rückgabe: Window oder None.
     """
-    data = _run_hyprctl_json("activewindow")
-    return data
+    data = get_client().request_json("activewindow")
+    if not isinstance(data, dict) or not data.get("address"):
+        return None
+    return Window.from_client(data)
+
 
-def focus_window_by_class(class_name):
+def focus_window(address):
     """
-    Fokussiert ein Fenster anhand des Klassennamens (Application Class) via Hyprland.
-    Nutzt hyprctl dispatch focuswindow.
+    Fokussiert ein Fenster anhand seiner Adresse.
     """
-    try:
-        subprocess.run(["hyprctl", "dispatch", "focuswindow", f"class:{class_name}"], check=True)
-    except subprocess.CalledProcessError as e:
-        # Fehler ignorieren oder protokollieren
-        print(f"Fehler beim Fokussieren von {class_name}: {e}")
+    return get_client().dispatch("focuswindow", f"address:{address}")
 
-import subprocess
-import json
 
-def get_windows():
-    try:
-        result = subprocess.run(["hyprctl", "clients", "-j"], capture_output=True, text=True, check=True)
-        windows = json.loads(result.stdout)
-        return windows
-    except subprocess.CalledProcessError as e:
-        print(f"Fehler beim Abrufen der Fensterliste: {e}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Fehler beim Parsen der Fensterliste: {e}")
-        return []
+def close_window(address):
+    """
+    Schließt ein Fenster anhand seiner Adresse.
+    """
+    return get_client().dispatch("closewindow", f"address:{address}")
+
+
+def dispatch_batch(dispatches):
+    """
+    Führt mehrere Dispatcher (z.B. ``"closewindow address:0x..."``) in einem
+    Round-Trip aus. Rückgabe: Liste von bools.
+    """
+    return get_client().dispatch_batch(dispatches)
+
+
+def _most_recent_window(windows, app_class):
+    """Zuletzt fokussiertes Fenster der Klasse (kleinste focusHistoryID)."""
+    app_class = app_class.lower()
+    candidates = [w for w in windows if w.app_class == app_class and w.address]
+    if not candidates:
+        return None
+    # -1 (unbekannt) hinter alle bekannten Einträge
+    return min(candidates, key=lambda w: (w.focus_history < 0, w.focus_history))
+
+
+def _find_window_by_class(app_class):
+    return _most_recent_window(get_windows(), app_class)
+
 
 def focus_window_by_class(app_class):
-    windows = get_windows()
-    for window in windows:
-        if window.get('class', '').lower() == app_class.lower():
-            window_id = window.get('address')
-            if window_id:
-                subprocess.run(["hyprctl", "dispatch", "focuswindow", f"address:{window_id}"])
-                print(f"[Debug] Fenster fokussiert: {app_class} (ID: {window_id})")
-                return
-    print(f"[Debug] Kein passendes Fenster zum Fokussieren gefunden für {app_class}.")
+    """
+    Fokussiert das zuletzt benutzte Fenster mit passender Klasse.
+    """
+    window = _find_window_by_class(app_class)
+    if window is None:
+        print(f"[Debug] Kein passendes Fenster zum Fokussieren gefunden für {app_class}.")
+        return False
+    return focus_window(window.address)
+
 
 def close_window_by_class(app_class):
-    windows = get_windows()
-    
-    print(f"[Debug] Offene Fenster beim Versuch, {app_class} zu schließen:")
-    for window in windows:
-        print(f" - CLASS: {window.get('class', '')} | TITLE: {window.get('title', '')}")
-
-    for window in windows:
-        window_class = window.get('class', '').lower()
-        if window_class == app_class.lower():
-            window_id = window.get('address')
-            if window_id:
-                subprocess.run(["hyprctl", "dispatch", "closewindow", f"address:{window_id}"])
-                print(f"[Debug] Fenster geschlossen: {window_class} (ID: {window_id})")
-                return
-    print(f"[Debug] Kein passendes Fenster für {app_class} gefunden.")
+    """
+    Schließt das zuletzt benutzte Fenster mit passender Klasse.
+    """
+    window = _find_window_by_class(app_class)
+    if window is None:
+        print(f"[Debug] Kein passendes Fenster für {app_class} gefunden.")
+        return False
+    return close_window(window.address)
+
+
+# ─── Asynchrone Varianten ────────────────────────────────────────────────────
+#
+# Gleiche Funktionen, aber über GIO im GLib-Main-Loop: Sie kehren sofort
+# zurück, das Ergebnis geht an ``callback``. ``cancellable`` (Gio.Cancellable)
+# bricht ab, ``timeout`` (Sekunden) überschreibt das Zeitlimit des Clients.
+# Rückgabe ist jeweils das Cancellable des laufenden Requests.
+
+
+def get_windows_async(callback, cancellable=None, timeout=None):
+    """Liste von Window-Datensätzen an ``callback`` (leer bei Fehler)."""
+    return get_client().request_json_async(
+        "clients", lambda data: callback(parse_clients(data)), cancellable, timeout)
+
+
+def get_layout_async(callback, cancellable=None, timeout=None):
+    """
+    Workspaces und Monitore in einem Round-Trip; (Workspace-Dicts,
+    Monitor-Dicts) an ``callback`` (leere Listen bei Fehler).
+    """
+    def on_replies(replies):
+        workspaces, monitors = replies
+        callback(workspaces if isinstance(workspaces, list) else [],
+                 monitors if isinstance(monitors, list) else [])
+    return get_client().request_json_batch_async(
+        ["workspaces", "monitors"], on_replies, cancellable, timeout)
+
+
+def get_active_window_async(callback, cancellable=None, timeout=None):
+    """Aktives Fenster (Window) oder None an ``callback``."""
+    def on_data(data):
+        if not isinstance(data, dict) or not data.get("address"):
+            callback(None)
+        else:
+            callback(Window.from_client(data))
+    return get_client().request_json_async("activewindow", on_data, cancellable, timeout)
+
+
+def dispatch_batch_async(dispatches, callback=None, cancellable=None, timeout=None):
+    """Liste von bools (Erfolg je Dispatcher) an ``callback``."""
+    return get_client().dispatch_batch_async(dispatches, callback, cancellable, timeout)
+
+
+def _dispatch_one_async(dispatch, callback, cancellable, timeout):
+    on_results = None
+    if callback is not None:
+        on_results = lambda results: callback(results[0])
+    return dispatch_batch_async([dispatch], on_results, cancellable, timeout)
+
+
+def focus_window_async(address, callback=None, cancellable=None, timeout=None):
+    """Fokussiert ein Fenster; Erfolg (bool) an ``callback``."""
+    return _dispatch_one_async(f"focuswindow address:{address}", callback, cancellable, timeout)
+
+
+def close_window_async(address, callback=None, cancellable=None, timeout=None):
+    """Schließt ein Fenster; Erfolg (bool) an ``callback``."""
+    return _dispatch_one_async(f"closewindow address:{address}", callback, cancellable, timeout)
+
+
+def _by_class_async(app_class, action, callback, cancellable, timeout):
+    from gi.repository import Gio
+    app_class = app_class.lower()
+    cancellable = cancellable or Gio.Cancellable()
+
+    def on_windows(windows):
+        # Abgebrochen: leere Liste heißt nicht "kein Fenster"
+        if cancellable.is_cancelled():
+            if callback is not None:
+                callback(False)
+            return
+        window = _most_recent_window(windows, app_class)
+        if window is not None:
+            action(window.address, callback, cancellable, timeout)
+            return
+        print(f"[Debug] Kein passendes Fenster für {app_class} gefunden.")
+        if callback is not None:
+            callback(False)
+    get_windows_async(on_windows, cancellable, timeout)
+    return cancellable
+
+
+def focus_window_by_class_async(app_class, callback=None, cancellable=None, timeout=None):
+    """Fokussiert das zuletzt benutzte Fenster der Klasse; Erfolg an ``callback``."""
+    return _by_class_async(app_class, focus_window_async, callback, cancellable, timeout)
+
+
+def close_window_by_class_async(app_class, callback=None, cancellable=None, timeout=None):
+    """Schließt das zuletzt benutzte Fenster der Klasse; Erfolg an ``callback``."""
+    return _by_class_async(app_class, close_window_async, callback, cancellable, timeout)
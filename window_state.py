@@ -0,0 +1,519 @@
+"""
+In-Memory-Zustand aller Hyprland-Fenster.
+
+Der Store wird einmalig mit der Ausgabe von ``clients`` gefüllt und danach
+ausschließlich über socket2-Events inkrementell aktualisiert. Abfragen wie
+„welche Fenster hat Klasse X" oder „welche Klasse hat den Fokus" kosten
+damit keinen Prozessstart mehr.
+
+Fenster werden als kompakte ``Window``-Datensätze gehalten, die nur die
+Felder enthalten, die Karpbar tatsächlich liest. Dazu kommen die
+Zuordnungen Workspace → Monitor, Workspace → Fenster und der aktive Workspace
+je Monitor, damit Leisten nur die Fenster ihres Monitors bzw. des aktiven
+Workspaces zeigen können. Geänderte Workspaces (Belegung, aktiv, dringend,
+angelegt/entfernt) werden gesammelt, damit die Workspace-Anzeige nur diese
+neu darstellt.
+"""
+import sys
+
+
+def normalize_address(address):
+    """
+    Bringt eine Fensteradresse in die Form ``0x...``.
+    socket2-Events liefern Adressen ohne Präfix, ``clients`` mit Präfix.
+    """
+    address = address.strip()
+    if not address:
+        return ""
+    if not address.startswith("0x"):
+        address = "0x" + address
+    return address
+
+
+class Window:
+    """
+    Ein Fenster mit den von Karpbar genutzten Feldern aus ``clients``.
+    ``app_class`` ist klein geschrieben und internalisiert, damit gleiche
+    Klassen denselben String teilen und Vergleiche billig sind.
+    """
+    __slots__ = ("address", "app_class", "title", "workspace_id", "workspace_name",
+                 "monitor", "pid", "focus_history")
+
+    def __init__(self, address, app_class, title="", workspace_id=None,
+                 workspace_name="", monitor=-1, pid=-1, focus_history=-1):
+        self.address = address
+        self.app_class = sys.intern(app_class.lower())
+        self.title = title
+        self.workspace_id = workspace_id
+        self.workspace_name = workspace_name
+        self.monitor = monitor
+        self.pid = pid
+        self.focus_history = focus_history
+
+    @classmethod
+    def from_client(cls, client):
+        """Baut einen Datensatz aus einem ``clients``-Dict."""
+        get = client.get
+        workspace = get("workspace") or {}
+        return cls(
+            normalize_address(get("address", "")),
+            get("class") or "",
+            get("title") or "",
+            workspace.get("id"),
+            workspace.get("name") or "",
+            get("monitor", -1),
+            get("pid", -1),
+            get("focusHistoryID", -1),
+        )
+
+    def __repr__(self):
+        return f"Window({self.address}, {self.app_class!r}, {self.title!r})"
+
+
+def parse_clients(clients):
+    """
+    Projiziert eine ``clients``-Antwort (Liste von Dicts) auf Window-Datensätze.
+    Die rohen Dicts mit allen übrigen Feldern (grouped, swallowing, ...) werden
+    danach nicht mehr referenziert.
+    """
+    if not isinstance(clients, list):
+        return []
+    from_client = Window.from_client
+    return [from_client(c) for c in clients if isinstance(c, dict)]
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _history_rank(window):
+    history = window.focus_history
+    return history if history is not None and history >= 0 else sys.maxsize
+
+
+class WindowStore:
+    # Events, die den Store verändern können
+    EVENTS = frozenset((
+        "openwindow",
+        "closewindow",
+        "movewindow",
+        "movewindowv2",
+        "windowtitle",
+        "windowtitlev2",
+        "activewindowv2",
+    ))
+    # Events zu Workspaces und Monitoren
+    LAYOUT_EVENTS = frozenset((
+        "workspacev2",
+        "focusedmon",
+        "createworkspacev2",
+        "destroyworkspacev2",
+        "renameworkspace",
+        "moveworkspacev2",
+        "urgent",
+        "monitoradded",
+        "monitorremoved",
+    ))
+
+    def __init__(self):
+        # Adresse -> Window
+        self.windows = {}
+        # Klasse (lowercase) -> {Adresse: None}, Dict als geordnete Menge in
+        # MRU-Reihenfolge: das zuletzt fokussierte Fenster steht am Ende
+        self._by_class = {}
+        self.focused_address = None
+        # Workspace-Name -> {Adresse: None}
+        self._by_workspace = {}
+        # Workspace-Name -> Monitor-Name (= Gdk.Monitor.get_connector())
+        self.workspace_monitors = {}
+        # Workspace-Name -> ID (Sortierung, Dispatch)
+        self.workspace_ids = {}
+        # Monitor-Name -> Name des dort aktiven Workspaces
+        self.active_workspaces = {}
+        self.focused_monitor = None
+        # Workspaces mit einem Fenster, das Aufmerksamkeit verlangt
+        self.urgent_workspaces = set()
+        # Seit take_workspace_changes() geänderte Workspaces
+        self._dirty_workspaces = set()
+
+    def load(self, clients, workspaces=None, monitors=None):
+        """
+        Ersetzt den kompletten Zustand durch eine ``clients``-Liste
+        (Window-Datensätze oder rohe Dicts) und optional die ``workspaces``-
+        und ``monitors``-Listen. Wird einmal beim Start aufgerufen.
+        """
+        self._dirty_workspaces.update(self._by_workspace)
+        self.windows = {}
+        self._by_class = {}
+        self._by_workspace = {}
+        self.focused_address = None
+        self.urgent_workspaces = set()
+        if workspaces is not None:
+            self.load_workspaces(workspaces)
+        if monitors is not None:
+            self.load_monitors(monitors)
+        windows = [w if isinstance(w, Window) else Window.from_client(w)
+                   for w in clients or []]
+        # Nach focusHistoryID absteigend einfügen, damit die MRU-Reihenfolge
+        # stimmt (0 = fokussiert, -1 = unbekannt und damit ganz vorne)
+        windows.sort(key=_history_rank, reverse=True)
+        for w in windows:
+            if not w.address:
+                continue
+            self._add(w)
+            if w.focus_history == 0:
+                self.focused_address = w.address
+        self._dirty_workspaces.update(self._by_workspace)
+
+    def load_workspaces(self, workspaces):
+        """
+        Ersetzt die Zuordnung Workspace → Monitor durch eine ``workspaces``-
+        Liste. Rückgabe: Klassen, deren Fenster dabei den Monitor wechseln.
+        """
+        old = self.workspace_monitors
+        workspaces = [ws for ws in workspaces if isinstance(ws, dict) and ws.get("name")]
+        self.workspace_monitors = {ws["name"]: ws.get("monitor") or None for ws in workspaces}
+        self.workspace_ids = {ws["name"]: ws.get("id") for ws in workspaces}
+        self._dirty_workspaces.update(old.keys() | self.workspace_monitors.keys())
+        return self._classes_on_workspaces(
+            name for name in old.keys() | self.workspace_monitors.keys()
+            if old.get(name) != self.workspace_monitors.get(name))
+
+    def load_monitors(self, monitors):
+        """
+        Übernimmt aktive Workspaces und den fokussierten Monitor aus einer
+        ``monitors``-Liste. Rückgabe: Klassen auf alten und neuen aktiven
+        Workspaces.
+        """
+        old = set(self.active_workspaces.values())
+        self.active_workspaces = {}
+        for mon in monitors:
+            if not isinstance(mon, dict) or not mon.get("name"):
+                continue
+            name = (mon.get("activeWorkspace") or {}).get("name")
+            if name:
+                self.active_workspaces[mon["name"]] = name
+            if mon.get("focused"):
+                self.focused_monitor = mon["name"]
+        changed = old ^ set(self.active_workspaces.values())
+        self._dirty_workspaces.update(changed)
+        return self._classes_on_workspaces(changed)
+
+    def _classes_on_workspaces(self, names):
+        """Klassen mit Fenstern auf den Workspaces, O(Fenster dort)."""
+        classes = set()
+        for name in names:
+            for address in self._by_workspace.get(name, ()):
+                cls = self.windows[address].app_class
+                if cls:
+                    classes.add(cls)
+        return classes
+
+    def _set_active_workspace(self, monitor, name):
+        old = self.active_workspaces.get(monitor)
+        if not monitor or not name or old == name:
+            return set()
+        self.active_workspaces[monitor] = name
+        # Besuchter Workspace ist nicht mehr dringend
+        self.urgent_workspaces.discard(name)
+        self._dirty_workspaces.update((old, name))
+        return self._classes_on_workspaces((old, name))
+
+    def take_workspace_changes(self):
+        """Liefert die seit dem letzten Aufruf geänderten Workspaces und leert sie."""
+        changed, self._dirty_workspaces = self._dirty_workspaces, set()
+        changed.discard(None)
+        return changed
+
+    def _add(self, window):
+        address = window.address
+        self.windows[address] = window
+        cls = window.app_class
+        if cls:
+            self._by_class.setdefault(cls, {})[address] = None
+        self._index_workspace(window)
+
+    def _index_workspace(self, window):
+        addresses = self._by_workspace.get(window.workspace_name)
+        if addresses is None:
+            # Workspace wird belegt
+            addresses = self._by_workspace[window.workspace_name] = {}
+            self._dirty_workspaces.add(window.workspace_name)
+        addresses[window.address] = None
+
+    def _unindex_workspace(self, window):
+        addresses = self._by_workspace.get(window.workspace_name)
+        if addresses is not None:
+            addresses.pop(window.address, None)
+            if not addresses:
+                # Workspace ist jetzt leer
+                del self._by_workspace[window.workspace_name]
+                self._dirty_workspaces.add(window.workspace_name)
+
+    def _remove(self, address):
+        window = self.windows.pop(address, None)
+        if window is None:
+            return None
+        self._unindex_workspace(window)
+        cls = window.app_class
+        addresses = self._by_class.get(cls)
+        if addresses is not None:
+            addresses.pop(address, None)
+            if not addresses:
+                del self._by_class[cls]
+        if self.focused_address == address:
+            self.focused_address = None
+        return cls
+
+    def apply_event(self, event, args):
+        """
+        Wendet ein socket2-Event an.
+        Rückgabe: Menge der betroffenen Klassen (lowercase), leer wenn nichts
+        Relevantes passiert ist.
+        """
+        if event in self.LAYOUT_EVENTS:
+            return self._apply_layout_event(event, args)
+        if event not in self.EVENTS:
+            return set()
+
+        if event == "openwindow":
+            parts = args.split(",", 3)
+            if len(parts) < 4:
+                return set()
+            address, ws_name, cls, title = parts
+            address = normalize_address(address)
+            changed = set()
+            old_cls = self._remove(address)
+            if old_cls:
+                changed.add(old_cls)
+            window = Window(address, cls, title, workspace_name=ws_name)
+            self._add(window)
+            if window.app_class:
+                changed.add(window.app_class)
+            return changed
+
+        if event == "closewindow":
+            cls = self._remove(normalize_address(args))
+            return {cls} if cls else set()
+
+        if event == "activewindowv2":
+            address = normalize_address(args)
+            changed = set()
+            for addr in (self.focused_address, address):
+                window = self.windows.get(addr) if addr else None
+                if window and window.app_class:
+                    changed.add(window.app_class)
+            window = self.windows.get(address)
+            if window is None:
+                self.focused_address = None
+                return changed
+            self.focused_address = address
+            # Fokussiertes Fenster ans Ende seiner Klasse (MRU), O(1)
+            addresses = self._by_class.get(window.app_class)
+            if addresses is not None and address in addresses:
+                del addresses[address]
+                addresses[address] = None
+            return changed
+
+        # Die restlichen Events betreffen genau ein vorhandenes Fenster
+        address, _, rest = args.partition(",")
+        window = self.windows.get(normalize_address(address))
+        if window is None:
+            return set()
+
+        if event == "movewindow":
+            self._unindex_workspace(window)
+            window.workspace_id = None
+            window.workspace_name = rest
+            self._index_workspace(window)
+        elif event == "movewindowv2":
+            ws_id, _, ws_name = rest.partition(",")
+            self._unindex_workspace(window)
+            try:
+                window.workspace_id = int(ws_id)
+            except ValueError:
+                window.workspace_id = None
+            window.workspace_name = ws_name
+            self._index_workspace(window)
+        elif event in ("windowtitle", "windowtitlev2"):
+            # windowtitle (v1) enthält nur die Adresse, der Titel kommt mit v2
+            if not rest:
+                return set()
+            window.title = rest
+
+        cls = window.app_class
+        return {cls} if cls else set()
+
+    def _apply_layout_event(self, event, args):
+        if event == "workspacev2":
+            # Aktiver Workspace auf dem fokussierten Monitor gewechselt
+            ws_id, _, name = args.partition(",")
+            self._learn_workspace(ws_id, name)
+            return self._set_active_workspace(self.focused_monitor, name)
+        if event == "focusedmon":
+            monitor, _, name = args.partition(",")
+            self.focused_monitor = monitor or None
+            return self._set_active_workspace(monitor, name)
+        if event == "createworkspacev2":
+            ws_id, _, name = args.partition(",")
+            self._learn_workspace(ws_id, name)
+            return set()
+        if event == "destroyworkspacev2":
+            name = args.partition(",")[2]
+            self.workspace_monitors.pop(name, None)
+            self.workspace_ids.pop(name, None)
+            self.urgent_workspaces.discard(name)
+            self._dirty_workspaces.add(name)
+            return set()
+        if event == "renameworkspace":
+            ws_id, _, new_name = args.partition(",")
+            return self._rename_workspace(_parse_id(ws_id), new_name)
+        if event == "urgent":
+            window = self.windows.get(normalize_address(args))
+            if window is None or not window.workspace_name:
+                return set()
+            name = window.workspace_name
+            if name not in self.active_workspaces.values() and name not in self.urgent_workspaces:
+                self.urgent_workspaces.add(name)
+                self._dirty_workspaces.add(name)
+            return set()
+        if event == "moveworkspacev2":
+            parts = args.split(",")
+            if len(parts) < 3:
+                return set()
+            # Workspace-Namen können Kommas enthalten, der Monitor steht am Ende
+            name, monitor = ",".join(parts[1:-1]), parts[-1]
+            self.workspace_ids.setdefault(name, _parse_id(parts[0]))
+            if self.workspace_monitors.get(name) == monitor:
+                return set()
+            self.workspace_monitors[name] = monitor
+            self._dirty_workspaces.add(name)
+            return self._classes_on_workspaces((name,))
+        # monitoradded/monitorremoved: Zuordnung wird vom Aufrufer per
+        # load_workspaces neu geladen (siehe StateEngine)
+        return set()
+
+    def _learn_workspace(self, ws_id, name):
+        """Vermerkt einen (neuen) Workspace; er entsteht auf dem fokussierten Monitor."""
+        if not name or name in self.workspace_monitors:
+            return
+        self.workspace_monitors[name] = self.focused_monitor
+        self.workspace_ids[name] = _parse_id(ws_id)
+        self._dirty_workspaces.add(name)
+
+    def _rename_workspace(self, ws_id, new_name):
+        old_name = next((n for n, i in self.workspace_ids.items() if i == ws_id), None)
+        if old_name is None or not new_name or old_name == new_name:
+            return set()
+        self.workspace_ids[new_name] = self.workspace_ids.pop(old_name)
+        self.workspace_monitors[new_name] = self.workspace_monitors.pop(old_name, None)
+        for monitor, name in self.active_workspaces.items():
+            if name == old_name:
+                self.active_workspaces[monitor] = new_name
+        if old_name in self.urgent_workspaces:
+            self.urgent_workspaces.discard(old_name)
+            self.urgent_workspaces.add(new_name)
+        addresses = self._by_workspace.pop(old_name, None)
+        if addresses is not None:
+            self._by_workspace[new_name] = addresses
+            for address in addresses:
+                self.windows[address].workspace_name = new_name
+        self._dirty_workspaces.update((old_name, new_name))
+        return self._classes_on_workspaces((new_name,))
+
+    # ─── Abfragen ─────────────────────────────────────────────────────────────
+
+    def classes(self, monitor=None):
+        """
+        Menge aller Klassen (lowercase) mit mindestens einem Fenster,
+        mit ``monitor`` nur auf diesem Monitor.
+        """
+        if monitor is None:
+            return set(self._by_class)
+        monitors = self.workspace_monitors
+        return {w.app_class for w in self.windows.values()
+                if w.app_class and monitors.get(w.workspace_name) == monitor}
+
+    def monitor_of(self, window):
+        """Monitor-Name eines Fensters oder None, wenn unbekannt."""
+        return self.workspace_monitors.get(window.workspace_name)
+
+    def windows_for_class(self, cls, monitor=None, workspace=None):
+        """
+        Liste der Fenster einer Klasse, zuletzt benutztes zuerst (MRU),
+        mit ``monitor`` nur die Fenster auf diesem Monitor, mit ``workspace``
+        nur die auf diesem Workspace.
+        """
+        addresses = self._by_class.get(cls.lower(), ())
+        windows = [self.windows[a] for a in reversed(addresses)]
+        if monitor is not None:
+            monitors = self.workspace_monitors
+            windows = [w for w in windows if monitors.get(w.workspace_name) == monitor]
+        if workspace is not None:
+            windows = [w for w in windows if w.workspace_name == workspace]
+        return windows
+
+    def active_workspace(self, monitor=None):
+        """Aktiver Workspace auf ``monitor`` (ohne: auf dem fokussierten Monitor)."""
+        return self.active_workspaces.get(monitor or self.focused_monitor)
+
+    def workspace_state(self, name, monitor=None):
+        """
+        (belegt, aktiv, dringend) eines Workspaces, mit ``monitor`` nur für
+        Workspaces auf diesem Monitor. None, wenn er dort nicht existiert
+        oder ein Spezial-Workspace ist.
+        """
+        if name not in self.workspace_monitors or name.startswith("special:"):
+            return None
+        if monitor is not None and self.workspace_monitors[name] != monitor:
+            return None
+        return (name in self._by_workspace,
+                self.active_workspace(monitor) == name,
+                name in self.urgent_workspaces)
+
+    def workspace_names(self, monitor=None):
+        """Namen aller Workspaces (mit ``monitor`` nur die dortigen)."""
+        return [name for name in self.workspace_monitors
+                if self.workspace_state(name, monitor) is not None]
+
+    def has_class_on_workspace(self, cls, workspace):
+        """True, wenn die Klasse ein Fenster auf dem Workspace hat."""
+        addresses = self._by_class.get(cls, ())
+        on_workspace = self._by_workspace.get(workspace, ())
+        # Über die kleinere der beiden Mengen laufen
+        if len(on_workspace) < len(addresses):
+            return any(self.windows[a].app_class == cls for a in on_workspace)
+        return any(a in on_workspace for a in addresses)
+
+    def window_count(self, cls, monitor=None):
+        """
+        Anzahl der Fenster einer Klasse: O(1), mit ``monitor`` nur die auf
+        diesem Monitor (zählt dann die Fenster der Klasse ab, ohne Liste).
+        """
+        addresses = self._by_class.get(cls.lower(), ())
+        if monitor is None:
+            return len(addresses)
+        monitors = self.workspace_monitors
+        windows = self.windows
+        return sum(1 for a in addresses
+                   if monitors.get(windows[a].workspace_name) == monitor)
+
+    def focused_window(self):
+        if self.focused_address is None:
+            return None
+        return self.windows.get(self.focused_address)
+
+    def focused_class(self, monitor=None):
+        """
+        Klasse des fokussierten Fensters; mit ``monitor`` nur, wenn das
+        Fenster auf diesem Monitor liegt.
+        """
+        window = self.focused_window()
+        if window is None:
+            return None
+        if monitor is not None and self.monitor_of(window) != monitor:
+            return None
+        return window.app_class or None